@@ -1,24 +1,127 @@
 #Author-Nico Schlueter
 #Description-Add-In for creating Luer Fittings
 
-import adsk.core, adsk.fusion, adsk.cam, traceback
-import math
+import adsk.core, adsk.fusion, traceback
+import math, os, struct, sys, threading, time
 
+from . import builders
+from .luer import cache, lod, parameters, profiling, spec, validate
 
-# Global set of event handlers to keep them referenced for the duration of the command
+
+# Event handlers have to stay referenced for as long as they're connected.
+# _handlers holds those of the add-in until stop(), _commandHandlers those of the open command
+# until it gets destroyed, so a long session doesn't pile up the handlers of every command.
 _handlers = []
+_commandHandlers = []
 
 COMMAND_ID = "luerFittings"
 COMMAND_NAME = "Luer Fitting"
 COMMAND_TOOLTIP = "Creates a luer fitting"
 
+# Largest deviation of the preview mesh from the fitting in pixels of the viewport, picks the level of luer.lod
+PREVIEW_PIXEL_ERROR = 1.0
+
+# A preview taking longer than this (in s) makes the next one PREVIEW_COARSENING times coarser, up to
+# PREVIEW_MAX_COARSENING times in a row, one taking less than a quarter of it goes back a step
+PREVIEW_LATENCY_BUDGET = 0.1
+PREVIEW_COARSENING = 4
+PREVIEW_MAX_COARSENING = 2
+
+# Value inputs changing faster than this (in s) are coalesced, only the last value gets previewed
+PREVIEW_COALESCE_INTERVAL = 0.15
+
+# Custom event that rebuilds the preview once the value inputs stopped changing
+PREVIEW_EVENT_ID = "luerFittingsPreview"
+
+# RGBA colors of the preview, material that gets added and material that gets removed
+PREVIEW_BODY_COLOR = (95, 145, 200, 255)
+PREVIEW_CUT_COLOR = (220, 80, 60, 255)
+
+# Custom graphics groups of the current preview
+_previewGraphics = []
+
+# State of the preview scheduling, see CommandExecutePreviewHandler
+_preview = {
+    "level": 0,         # Steps the preview tolerance got coarsened by, see PREVIEW_COARSENING
+    "lastChange": 0,    # time.perf_counter() of the last change of a value input
+    "timer": None,      # threading.Timer firing PREVIEW_EVENT_ID
+    "command": None     # The open command
+}
+
+# Custom event fired by the export workers, it updates the progress dialog on the main thread.
+# STEP files can only be written by Fusion on the main thread, one of them is written per event.
+EXPORT_EVENT_ID = "luerFittingsExport"
+
+# File formats the built fittings can be exported as, the mesh formats are written by luer.exportqueue
+EXPORT_FORMATS = ["None", "STL", "3MF", "PLY", "STEP"]
+
+# State of the running export, see startExport
+_export = {
+    "queue": None,      # luer.exportqueue.ExportQueue writing the mesh formats
+    "fittings": [],     # (path, transform) of the STEP files still to be written
+    "template": None,   # Transient fitting body at the origin the STEP files get copied from
+    "done": 0,          # STEP files written
+    "total": 0,         # Files to write
+    "folder": None,
+    "progress": None,   # ProgressDialog
+    "handler": None     # ExportEventHandler
+}
+
+# Number of parameter sets whose template bodies are kept, see builders.template
+TEMPLATE_CACHE_SIZE = 16
+
+# Transient (join, cut) bodies of fittings by (type, clearance, hole)
+_templates = cache.LRUCache(TEMPLATE_CACHE_SIZE)
+
+# Number of resolved selections, occurrence transforms and fitting transforms kept, see getPrimitiveFromSelection
+# Every preview looks them up in the same order, so with fewer entries than that every lookup would miss.
+SELECTION_CACHE_SIZE = 4096
+
+# Primitives of selected entities and world transforms of occurrences by entity token, and the transforms
+# of the fittings by (point token, plane token), emptied by designChanged
+_resolved = cache.LRUCache(SELECTION_CACHE_SIZE)
+
+# Setting this environment variable to a file path enables the stage timings of luer.profiling.
+# The timings get written to that file as JSON and to the Text Commands palette whenever the command closes.
+PROFILE_ENV = "LUER_FITTINGS_PROFILE"
+profiling.enabled = bool(os.environ.get(PROFILE_ENV))
+
 # Initial persistence Dict
 pers = {
     'DDType': "Male Slip",
-    "VIDiametralClearance": 0,
-    "VIHole": 0.225
+    "VIDiametralClearance": 0.0,
+    "VIHole": 0.225,
+    "BVCache": False,
+    "BVNodePerFitting": False,
+    "BVParameters": False,
+    "STParameterPrefix": "luer",
+    "DDExport": "None",
+    "STExportFolder": os.path.join(os.path.expanduser("~"), "Luer Fittings"),
+    "DDPattern": "None",
+    "ISPatternCount": 4,
+    "ISPatternRows": 1,
+    "VIPatternSpacing": 1.0,
+    "VIPatternRowSpacing": 1.0
 }
 
+# Ways to replicate the fittings at the selected points with a single pattern feature
+# Rectangular repeats them along the plane's u and v direction, Circular around the axis through
+# the pattern center normal to the plane, Path along a curve.
+PATTERNS = ["None", "Rectangular", "Circular", "Path"]
+
+# Value inputs of the patterns. They're saved to pers as they change, so the preview and the build
+# read the pattern from pers instead of asking Fusion for every input again.
+PATTERN_INPUTS = ["ISPatternCount", "ISPatternRows", "VIPatternSpacing", "VIPatternRowSpacing"]
+
+# Copies a pattern may make of the fittings at the selected points, every one of them gets previewed
+MAX_PATTERN_COPIES = 400
+
+# Settings, presets and preview meshes kept on disk across sessions, see getStore
+_store = None
+
+# Entry of the preset dropdown keeping the current values
+NO_PRESET = "(none)"
+
 # Fires when the CommandDefinition gets executed.
 # Responsible for adding commandInputs to the command &
 # registering the other command handlers.
@@ -32,20 +135,30 @@ class CommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
             # Get the command that was created.
             cmd = adsk.core.Command.cast(args.command)
             
+            # Drops the handlers of a command that never got destroyed
+            releaseCommandHandlers()
+
+            # The design may have been edited since the last command
+            designChanged()
+
             # Registers the CommandExecutePreviewHandler
-            onExecutePreview = CommandExecutePreviewHandler()
-            cmd.executePreview.add(onExecutePreview)
-            _handlers.append(onExecutePreview)
+            addCommandHandler(cmd.executePreview, CommandExecutePreviewHandler())
             
+            # Registers the CommandExecuteHandler
+            addCommandHandler(cmd.execute, CommandExecuteHandler())
+
+            # Registers the CommandDestroyHandler
+            addCommandHandler(cmd.destroy, CommandDestroyHandler())
+
             # Registers the CommandInputChangedHandler          
-            onInputChanged = CommandInputChangedHandler()
-            cmd.inputChanged.add(onInputChanged)
-            _handlers.append(onInputChanged)            
+            addCommandHandler(cmd.inputChanged, CommandInputChangedHandler())
             
             # Registers the CommandValidateInputsEventHandler
-            onValidate = CommandValidateInputsEventHandler()
-            cmd.validateInputs.add(onValidate)
-            _handlers.append(onValidate)
+            addCommandHandler(cmd.validateInputs, CommandValidateInputsEventHandler())
+
+            # Registers the PreviewEventHandler
+            _preview["command"] = cmd
+            addCommandHandler(adsk.core.Application.get().registerCustomEvent(PREVIEW_EVENT_ID), PreviewEventHandler())
 
                 
             # Get the CommandInputs collection associated with the command.
@@ -56,9 +169,9 @@ class CommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
             siOrigin.addSelectionFilter("SketchPoints")
             siOrigin.addSelectionFilter("Vertices")
             siOrigin.addSelectionFilter("CircularEdges")
-            siOrigin.setSelectionLimits(1, 1)
-            siOrigin.tooltip = "Fitting Center Point"
-            siOrigin.tooltipDescription = "Select the center point of the Fitting.\nWill be projected onto the plane.\n\nValid selections:\n    Sketch Points\n    Construction Points\n    BRep Vertices\n    Circular BRep Edges\n"
+            siOrigin.setSelectionLimits(1, 0)
+            siOrigin.tooltip = "Fitting Center Points"
+            siOrigin.tooltipDescription = "Select the center points of the Fittings.\nWill be projected onto the plane.\nAll fittings are built from one sketch and one set of features.\n\nValid selections:\n    Sketch Points\n    Construction Points\n    BRep Vertices\n    Circular BRep Edges\n"
 
             siPlane = inputs.addSelectionInput("SIPlane", "Plane", "Select Fitting Plane")
             siPlane.addSelectionFilter("ConstructionPlanes")
@@ -67,581 +180,267 @@ class CommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
             siPlane.tooltip = "Gear Plane"
             siPlane.tooltipDescription = "Select the plane the fitting will be placed on.\n\nValid selections are:\n    Construction Planes\n    BRep Faces\n\nNot needed if SketchPoint is selected."
             
+            # Presets saved from the dialog or with python -m luer.store
+            presets = getStore().presets() if getStore() else {}
+            ddPreset = inputs.addDropDownCommandInput("DDPreset", "Preset", 0)
+            ddPreset.listItems.add(NO_PRESET, True, "")
+            for name in presets:
+                ddPreset.listItems.add(name, False, "")
+            ddPreset.isVisible = bool(presets)
+
+            bvDeletePreset = inputs.addBoolValueInput("BVDeletePreset", "Delete preset", False, "", False)
+            bvDeletePreset.isVisible = False
+            stPresetName = inputs.addStringValueInput("STPresetName", "Save as preset", "")
+            stPresetName.isVisible = bool(getStore())
+            stPresetName.tooltip = "Save As Preset"
+            stPresetName.tooltipDescription = "Name to save the type, clearance and hole under, saved with the button below."
+            bvSavePreset = inputs.addBoolValueInput("BVSavePreset", "Save preset", False, "", False)
+            bvSavePreset.isVisible = bool(getStore())
+
             ddType = inputs.addDropDownCommandInput("DDType", "Type", 0)
-            ddType.listItems.add("Male Slip", pers["DDType"] == "Male Slip", "")
-            ddType.listItems.add("Male Lock", pers["DDType"] == "Male Lock", "")
-            ddType.listItems.add("Male Lock (internal)", pers["DDType"] == "Male Lock (internal)", "")
-            ddType.listItems.add("Female Slip", pers["DDType"] == "Female Slip", "")
-            ddType.listItems.add("Female Slip (internal)", pers["DDType"] == "Female Slip (internal)", "")
-            ddType.listItems.add("Female Lock", pers["DDType"] == "Female Lock", "")
+            for fittingType in spec.FITTING_TYPES:
+                ddType.listItems.add(fittingType, pers["DDType"] == fittingType, "")
 
             viHole = inputs.addValueInput("VIHole", "Hole diameter", "mm", adsk.core.ValueInput.createByReal(pers["VIHole"]))
             
             viDiametralClearance = inputs.addValueInput("VIDiametralClearance", "Clearance (diametral)", "mm", adsk.core.ValueInput.createByReal(pers["VIDiametralClearance"]))
 
+            bvCache = inputs.addBoolValueInput("BVCache", "Reuse cached bodies", True, "", pers["BVCache"])
+            bvCache.tooltip = "Reuse Cached Bodies"
+            bvCache.tooltipDescription = "Builds each fitting once and places copies of its body instead of sketches, extrudes and sweeps.\nFaster for many fittings, but the fittings are not parametric."
+
+            bvNodePerFitting = inputs.addBoolValueInput("BVNodePerFitting", "One timeline node per fitting", True, "", pers["BVNodePerFitting"])
+            bvNodePerFitting.isVisible = pers["BVCache"]
+            bvNodePerFitting.tooltip = "One Timeline Node Per Fitting"
+            bvNodePerFitting.tooltipDescription = "Captures each fitting in a base feature of its own, so it can be edited, suppressed or deleted on its own.\nThe timeline only recomputes one node per fitting and one combine per body the fittings attach to."
+
+            bvParameters = inputs.addBoolValueInput("BVParameters", "Drive by user parameters", True, "", pers["BVParameters"])
+            bvParameters.isVisible = not pers["BVCache"]
+            bvParameters.tooltip = "Drive By User Parameters"
+            bvParameters.tooltipDescription = "The clearance, hole diameter and taper length of the fittings reference user parameters named after the prefix.\nAll fittings built with the same prefix and values change with one edit of a parameter.\nExisting parameters are left as they are, fittings with other values get parameters of their own, <prefix>_2 and so on."
+
+            stParameterPrefix = inputs.addStringValueInput("STParameterPrefix", "Parameter prefix", pers["STParameterPrefix"])
+            stParameterPrefix.isVisible = pers["BVParameters"] and not pers["BVCache"]
+
+            # Direct designs always get the fittings inserted as bodies, see builders.direct
+            if(not adsk.core.Application.get().activeProduct.designType):
+                bvCache.isVisible = False
+                bvNodePerFitting.isVisible = False
+                bvParameters.isVisible = False
+                stParameterPrefix.isVisible = False
+
+            ddPattern = inputs.addDropDownCommandInput("DDPattern", "Pattern", 0)
+            for pattern in PATTERNS:
+                ddPattern.listItems.add(pattern, pers["DDPattern"] == pattern, "")
+            ddPattern.tooltip = "Pattern"
+            ddPattern.tooltipDescription = "Builds the fittings at the selected points once and replicates them with one pattern feature.\nMuch faster than selecting every point of a large array."
+
+            inputs.addIntegerSpinnerCommandInput("ISPatternCount", "Count", 1, MAX_PATTERN_COPIES, 1, pers["ISPatternCount"])
+            inputs.addValueInput("VIPatternSpacing", "Spacing", "mm", adsk.core.ValueInput.createByReal(pers["VIPatternSpacing"]))
+            inputs.addIntegerSpinnerCommandInput("ISPatternRows", "Rows", 1, MAX_PATTERN_COPIES, 1, pers["ISPatternRows"])
+            inputs.addValueInput("VIPatternRowSpacing", "Row spacing", "mm", adsk.core.ValueInput.createByReal(pers["VIPatternRowSpacing"]))
+
+            siPatternCenter = inputs.addSelectionInput("SIPatternCenter", "Center", "Select Pattern Center")
+            siPatternCenter.addSelectionFilter("ConstructionPoints")
+            siPatternCenter.addSelectionFilter("SketchPoints")
+            siPatternCenter.addSelectionFilter("Vertices")
+            siPatternCenter.addSelectionFilter("CircularEdges")
+            siPatternCenter.setSelectionLimits(0, 1)
+
+            siPatternPath = inputs.addSelectionInput("SIPatternPath", "Path", "Select Pattern Path")
+            siPatternPath.addSelectionFilter("SketchCurves")
+            siPatternPath.addSelectionFilter("Edges")
+            siPatternPath.setSelectionLimits(0, 1)
+
+            updatePatternInputs(inputs)
+
+            ddExport = inputs.addDropDownCommandInput("DDExport", "Export", 0)
+            for exportFormat in EXPORT_FORMATS:
+                ddExport.listItems.add(exportFormat, pers["DDExport"] == exportFormat, "")
+            ddExport.tooltip = "Export"
+            ddExport.tooltipDescription = "Writes every fitting to a file of its own after building them.\nThe files are written in the background, Fusion stays usable meanwhile."
+
+            stExportFolder = inputs.addStringValueInput("STExportFolder", "Export folder", pers["STExportFolder"])
+            stExportFolder.isVisible = pers["DDExport"] != "None"
+
+            # Tells why the parameters can't be built, see CommandValidateInputsEventHandler
+            tbError = inputs.addTextBoxCommandInput("TBError", "", "", 2, True)
+            tbError.isVisible = False
+
            
         except:
             print(traceback.format_exc())
 
 
-
 # Fires when the Command is being created or when Inputs are being changed
 # Responsible for generating a preview of the output.
-# Changes done here are temporary and will be cleaned up automatically.
+# The preview is drawn as custom graphics from a precomputed mesh, real features are only built on execute.
+# While a value input is still changing the rebuild is postponed, so only its last value gets previewed,
+# The level of detail of the mesh follows the zoom of the viewport, and it gets coarser while previews
+# take longer than PREVIEW_LATENCY_BUDGET.
 class CommandExecutePreviewHandler(adsk.core.CommandEventHandler):
     def __init__(self):
         super().__init__()
     def notify(self, args):
         try:
-            eventArgs = adsk.core.CommandEventArgs.cast(args)
-            
             app = adsk.core.Application.get()
             des = app.activeProduct
             root = des.rootComponent
-            comp = des.activeComponent
 
-            # Saves setting to persistance dictionary
-            global pers
-            pers["DDType"] = args.command.commandInputs.itemById("DDType").selectedItem.name
-            pers["VIDiametralClearance"] = args.command.commandInputs.itemById("VIDiametralClearance").value
-            pers["VIHole"] = args.command.commandInputs.itemById("VIHole").value
+            inputs = args.command.commandInputs
 
-            # Gets point object and calculates its Point3D
-            point = args.command.commandInputs.itemById("SIOrigin").selection(0).entity
-            pointPrim = getPrimitiveFromSelection(point)
+            # Keeps the last preview until the value inputs settle
+            settling = PREVIEW_COALESCE_INTERVAL - (time.perf_counter() - _preview["lastChange"])
+            if(settling > 0):
+                schedulePreview(settling)
+                return
 
-            # Gets plane object or derives it from selected sketchPoint
-            if(args.command.commandInputs.itemById("SIPlane").selectionCount == 1):
-                plane = args.command.commandInputs.itemById("SIPlane").selection(0).entity
-            else:
-                plane = point.parentSketch.referencePlane
-
-            # Calculates it Plane primitive
-            planePrim = getPrimitiveFromSelection(plane)
-            # Projects point primitive onto plane
-            pointPrim = projectPointOnPlane(pointPrim, planePrim)
-
-            # Creates a sketch on the plane object without including any geometry
-            sketch = comp.sketches.addWithoutEdges(plane)
-
-            # Gets inverse transform matrix of Sketch and transforms the point by it
-            it = sketch.transform.copy()
-            it.invert()
-            pointPrim.transformBy(it)
-
-            if(args.command.commandInputs.itemById("DDType").selectedItem.name == "Male Slip"):
-
-                # Creates circle for base diameter of taper
-                sketch.sketchCurves.sketchCircles.addByCenterRadius(
-                    pointPrim,
-                    (0.4 + math.tan(math.radians(3.44)) * 0.75 - args.command.commandInputs.itemById("VIDiametralClearance").value) / 2
-                )
-
-                # Creates circle for internal diameter
-                sketch.sketchCurves.sketchCircles.addByCenterRadius(
-                    pointPrim,
-                    args.command.commandInputs.itemById("VIHole").value / 2
-                )
-
-                # Creates Object collection of both profiles
-                oc = adsk.core.ObjectCollection.create()
-                oc.add(sketch.profiles[0])
-                oc.add(sketch.profiles[1])
-
-                # Creates first extude with taper
-                exturdeInput1 = comp.features.extrudeFeatures.createInput(oc, 0)
-                exturdeInput1.setOneSideExtent(
-                    adsk.fusion.DistanceExtentDefinition.create(adsk.core.ValueInput.createByString("7.5 mm")),
-                    0,
-                    adsk.core.ValueInput.createByString("-1.72 deg")
-                )
-                f1 = comp.features.extrudeFeatures.add(exturdeInput1)
-
-                # Creates second extrude to cut internal hole
-                exturdeInput2 = comp.features.extrudeFeatures.createInput(sketch.profiles[1], 1)
-                exturdeInput2.setOneSideExtent(
-                    adsk.fusion.DistanceExtentDefinition.create(adsk.core.ValueInput.createByString("7.5 mm")),
-                    0,
-                    adsk.core.ValueInput.createByString("0 deg")
-                )
-                f2 = comp.features.extrudeFeatures.add(exturdeInput2)
-
-                if(des.designType):
-                    des.timeline.timelineGroups.add(f1.timelineObject.index-1, f2.timelineObject.index)
-
-
-            elif(args.command.commandInputs.itemById("DDType").selectedItem.name == "Male Lock"):
-
-                # Creates circle for base diameter of taper
-                sketch.sketchCurves.sketchCircles.addByCenterRadius(
-                    pointPrim,
-                    (0.4 + math.tan(math.radians(3.44)) * 0.75 - args.command.commandInputs.itemById("VIDiametralClearance").value) / 2
-                )
-
-                # Creates circle for internal diameter
-                sketch.sketchCurves.sketchCircles.addByCenterRadius(
-                    pointPrim,
-                    args.command.commandInputs.itemById("VIHole").value / 2
-                )
-
-                # Vector maths! Yay!!!1!
-                offsetODArc = adsk.core.Vector3D.create(0.142, 0.3207, 0)
-                offsetCSA1 = adsk.core.Vector3D.create(0.1417, -0.0159, 0)
-                offsetCSA2 = adsk.core.Vector3D.create(-0.1332 , -0.0506, 0)
-                offsetLine = adsk.core.Vector3D.create(0,0,0.55)
-
-                posODArc = pointPrim.copy()
-                posODArc.translateBy(offsetODArc)
-
-                posCSA1 = pointPrim.copy()
-                posCSA1.translateBy(offsetCSA1)
-
-                posCSA2 = pointPrim.copy()
-                posCSA2.translateBy(offsetCSA2)
-
-                offsetODArc.scaleBy(-1)
-                offsetCSA1.scaleBy(-1)
-                offsetCSA2.scaleBy(-1)
-
-                posODArc2 = pointPrim.copy()
-                posODArc2.translateBy(offsetODArc)
-
-                posCSA3 = pointPrim.copy()
-                posCSA3.translateBy(offsetCSA1)
-
-                posCSA4 = pointPrim.copy()
-                posCSA4.translateBy(offsetCSA2)
-
-                posLine = pointPrim.copy()
-                posLine.translateBy(offsetLine)
+            start = time.perf_counter()
 
-                
-                # Creates Arcs for thread crosssection
-                odArc1 = sketch.sketchCurves.sketchArcs.addByCenterStartSweep(
-                    pointPrim,
-                    posODArc,
-                    math.radians(42.4)
-                )
-
-                sketch.sketchCurves.sketchArcs.addByCenterStartSweep(
-                    posCSA1,
-                    odArc1.startSketchPoint,
-                    math.radians(-23)
-                )
-
-                sketch.sketchCurves.sketchArcs.addByCenterStartSweep(
-                    posCSA2,
-                    odArc1.endSketchPoint,
-                    math.radians(23)
-                )
-
-
-                odArc2 = sketch.sketchCurves.sketchArcs.addByCenterStartSweep(
-                    pointPrim,
-                    posODArc2,
-                    math.radians(42.4)
-                )
-
-                sketch.sketchCurves.sketchArcs.addByCenterStartSweep(
-                    posCSA3,
-                    odArc2.startSketchPoint,
-                    math.radians(-23)
-                )
-
-                sketch.sketchCurves.sketchArcs.addByCenterStartSweep(
-                    posCSA4,
-                    odArc2.endSketchPoint,
-                    math.radians(23)
-                )
-
-                pathLine = sketch.sketchCurves.sketchLines.addByTwoPoints(
-                    pointPrim,
-                    posLine
-                )
-
-                # Creates circle for internal diameter of threaded tube
-                sketch.sketchCurves.sketchCircles.addByCenterRadius(
-                    pointPrim,
-                    0.4
-                )
-
-                # Creates circle for extrenal diameter of threaded tube
-                sketch.sketchCurves.sketchCircles.addByCenterRadius(
-                    pointPrim,
-                    0.5
-                )
-
-                # Creates Object collection of both profiles
-                oc1 = adsk.core.ObjectCollection.create()
-                oc1.add(sketch.profiles[0])
-                oc1.add(sketch.profiles[1])
-
-                # Creates first extude with taper
-                exturdeInput1 = comp.features.extrudeFeatures.createInput(oc1, 0)
-                exturdeInput1.setOneSideExtent(
-                    adsk.fusion.DistanceExtentDefinition.create(adsk.core.ValueInput.createByString("7.5 mm")),
-                    0,
-                    adsk.core.ValueInput.createByString("-1.72 deg")
-                )
-                f1 = comp.features.extrudeFeatures.add(exturdeInput1)
-
-                # Creates second extrude to cut internal hole
-                exturdeInput2 = comp.features.extrudeFeatures.createInput(sketch.profiles[1], 1)
-                exturdeInput2.setOneSideExtent(
-                    adsk.fusion.DistanceExtentDefinition.create(adsk.core.ValueInput.createByString("7.5 mm")),
-                    0,
-                    adsk.core.ValueInput.createByString("0 deg")
-                )
-                comp.features.extrudeFeatures.add(exturdeInput2)
-
-                # Creates third extrude to join threaded tube
-                exturdeInput3 = comp.features.extrudeFeatures.createInput(sketch.profiles[5], 0)
-                exturdeInput3.setOneSideExtent(
-                    adsk.fusion.DistanceExtentDefinition.create(adsk.core.ValueInput.createByString("5.5 mm")),
-                    0,
-                    adsk.core.ValueInput.createByString("0 deg")
-                )
-                comp.features.extrudeFeatures.add(exturdeInput3)
-
-                # Creates Object collection of thread wings
-                oc2 = adsk.core.ObjectCollection.create()
-                oc2.add(sketch.profiles[2])
-                oc2.add(sketch.profiles[4])
-
-                path = comp.features.createPath(pathLine)
-                sweepInput = comp.features.sweepFeatures.createInput(oc2, path, 0)
-                sweepInput.twistAngle = adsk.core.ValueInput.createByReal(math.radians(396))
-                f2 = comp.features.sweepFeatures.add(sweepInput)
-
-                if(des.designType):
-                    des.timeline.timelineGroups.add(f1.timelineObject.index-1, f2.timelineObject.index)
-
-
-            elif(args.command.commandInputs.itemById("DDType").selectedItem.name == "Male Lock (internal)"):
-
-                pointPrim.translateBy(adsk.core.Vector3D.create(0,0,-0.55))
-                
-
-                # Creates circle for base diameter of taper
-                sketch.sketchCurves.sketchCircles.addByCenterRadius(
-                    pointPrim,
-                    (0.4 + math.tan(math.radians(3.44)) * 0.75 - args.command.commandInputs.itemById("VIDiametralClearance").value) / 2
-                )
-
-                # Creates circle for internal diameter
-                sketch.sketchCurves.sketchCircles.addByCenterRadius(
-                    pointPrim,
-                    args.command.commandInputs.itemById("VIHole").value / 2
-                )
-
-                # Vector maths! Yay!!!1!
-                offsetODArc = adsk.core.Vector3D.create(0.142, 0.3207, 0)
-                offsetCSA1 = adsk.core.Vector3D.create(0.1417, -0.0159, 0)
-                offsetCSA2 = adsk.core.Vector3D.create(-0.1332 , -0.0506, 0)
-                offsetLine = adsk.core.Vector3D.create(0,0,0.55)
-
-                posODArc = pointPrim.copy()
-                posODArc.translateBy(offsetODArc)
-
-                posCSA1 = pointPrim.copy()
-                posCSA1.translateBy(offsetCSA1)
+            # Saves setting to persistance dictionary
+            global pers
+            pers["DDType"] = inputs.itemById("DDType").selectedItem.name
+            pers["VIDiametralClearance"] = inputs.itemById("VIDiametralClearance").value
+            pers["VIHole"] = inputs.itemById("VIHole").value
+            pers["BVCache"] = inputs.itemById("BVCache").value
+
+            # Previews fired by the PreviewEventHandler skip validateInputs,
+            # the preview of the last valid parameters goes away as well
+            clearPreviewGraphics()
+            if(validate.check(pers["DDType"], pers["VIDiametralClearance"], pers["VIHole"])):
+                return
+
+            # Picks the level of detail from the size of a pixel at the camera's target,
+            # the view extents are the radius of the sphere around it that's visible
+            viewport = app.activeViewport
+            pixel = 2 * viewport.camera.viewExtents / max(viewport.height, 1)
+            error = lod.levelError(PREVIEW_PIXEL_ERROR * pixel * PREVIEW_COARSENING ** _preview["level"])
+
+            # Tessellates the fitting once, every selected point reuses the same mesh
+            with profiling.stage("preview.mesh"):
+                body, cut = getPreviewMesh(pers["DDType"], pers["VIDiametralClearance"], pers["VIHole"], error)
+
+            with profiling.stage("preview.selections"):
+                transforms = getFittingTransforms(inputs)
+
+            with profiling.stage("preview.graphics"):
+                graphics = root.customGraphicsGroups.add()
+                _previewGraphics.append(graphics)
+
+                for fittingMesh, color in [(body, PREVIEW_BODY_COLOR), (cut, PREVIEW_CUT_COLOR)]:
+                    if(not fittingMesh.triangleCount):
+                        continue
+
+                    coords = adsk.fusion.CustomGraphicsCoordinates.create(fittingMesh.coords)
+                    normals = fittingMesh.faceNormals()
+                    normalIndices = [i // 3 for i in range(len(fittingMesh.indices))]
+                    colorEffect = adsk.fusion.CustomGraphicsSolidColorEffect.create(adsk.core.Color.create(*color))
+
+                    for transform in transforms:
+                        cgMesh = graphics.addMesh(coords, fittingMesh.indices, normals, normalIndices)
+                        cgMesh.transform = transform
+                        cgMesh.color = colorEffect
+
+                viewport.refresh()
+
+            # Picks the fidelity of the next preview
+            elapsed = time.perf_counter() - start
+            if(elapsed > PREVIEW_LATENCY_BUDGET):
+                _preview["level"] = min(_preview["level"] + 1, PREVIEW_MAX_COARSENING)
+            elif(elapsed < PREVIEW_LATENCY_BUDGET / 4):
+                _preview["level"] = max(_preview["level"] - 1, 0)
 
-                posCSA2 = pointPrim.copy()
-                posCSA2.translateBy(offsetCSA2)
+        except:
+            print(traceback.format_exc())
 
-                offsetODArc.scaleBy(-1)
-                offsetCSA1.scaleBy(-1)
-                offsetCSA2.scaleBy(-1)
 
-                posODArc2 = pointPrim.copy()
-                posODArc2.translateBy(offsetODArc)
+# Fires on the main thread when the timer of schedulePreview runs out
+# Responsible for rebuilding the preview postponed while the value inputs were changing.
+class PreviewEventHandler(adsk.core.CustomEventHandler):
+    def __init__(self):
+        super().__init__()
+    def notify(self, args):
+        try:
+            if(_preview["command"]):
+                _preview["command"].doExecutePreview()
+        except:
+            print(traceback.format_exc())
 
-                posCSA3 = pointPrim.copy()
-                posCSA3.translateBy(offsetCSA1)
 
-                posCSA4 = pointPrim.copy()
-                posCSA4.translateBy(offsetCSA2)
+# Fires when the OK button is pressed
+# Responsible for building the real features of the fittings.
+class CommandExecuteHandler(adsk.core.CommandEventHandler):
+    def __init__(self):
+        super().__init__()
+    def notify(self, args):
+        try:
+            clearPreviewGraphics()
+            with profiling.stage("execute"):
+                features = buildFittings(args.command.commandInputs)
+            designChanged()
+            if(pers["DDExport"] != "None"):
+                with profiling.stage("export.start"):
+                    startExport(args.command.commandInputs, features)
+        except:
+            print(traceback.format_exc())
 
-                posLine = pointPrim.copy()
-                posLine.translateBy(offsetLine)
 
-                
-                # Creates Arcs for thread crosssection
-                odArc1 = sketch.sketchCurves.sketchArcs.addByCenterStartSweep(
-                    pointPrim,
-                    posODArc,
-                    math.radians(42.4)
-                )
-
-                sketch.sketchCurves.sketchArcs.addByCenterStartSweep(
-                    posCSA1,
-                    odArc1.startSketchPoint,
-                    math.radians(-23)
-                )
-
-                sketch.sketchCurves.sketchArcs.addByCenterStartSweep(
-                    posCSA2,
-                    odArc1.endSketchPoint,
-                    math.radians(23)
-                )
-
-
-                odArc2 = sketch.sketchCurves.sketchArcs.addByCenterStartSweep(
-                    pointPrim,
-                    posODArc2,
-                    math.radians(42.4)
-                )
-
-                sketch.sketchCurves.sketchArcs.addByCenterStartSweep(
-                    posCSA3,
-                    odArc2.startSketchPoint,
-                    math.radians(-23)
-                )
-
-                sketch.sketchCurves.sketchArcs.addByCenterStartSweep(
-                    posCSA4,
-                    odArc2.endSketchPoint,
-                    math.radians(23)
-                )
-
-                pathLine = sketch.sketchCurves.sketchLines.addByTwoPoints(
-                    pointPrim,
-                    posLine
-                )
-
-                # Creates circle for internal diameter of threaded tube
-                sketch.sketchCurves.sketchCircles.addByCenterRadius(
-                    pointPrim,
-                    0.4
-                )
-
-                # Creates circle for extrenal diameter of threaded tube
-                sketch.sketchCurves.sketchCircles.addByCenterRadius(
-                    pointPrim,
-                    0.5
-                )
-
-                # Creates Object collection of thread wings
-                oc2 = adsk.core.ObjectCollection.create()
-                oc2.add(sketch.profiles[0])
-                oc2.add(sketch.profiles[1])
-                oc2.add(sketch.profiles[3])
-
-                path = comp.features.createPath(pathLine)
-                sweepInput = comp.features.sweepFeatures.createInput(oc2, path, 1)
-                sweepInput.twistAngle = adsk.core.ValueInput.createByReal(math.radians(396))
-                f1 = comp.features.sweepFeatures.add(sweepInput)
-
-
-
-
-                # Creates Object collection of both profiles
-                oc1 = adsk.core.ObjectCollection.create()
-                oc1.add(sketch.profiles[0])
-                oc1.add(sketch.profiles[1])
-
-                # Creates first extude with taper
-                exturdeInput1 = comp.features.extrudeFeatures.createInput(oc1, 0)
-                exturdeInput1.setOneSideExtent(
-                    adsk.fusion.DistanceExtentDefinition.create(adsk.core.ValueInput.createByString("7.5 mm")),
-                    0,
-                    adsk.core.ValueInput.createByString("-1.72 deg")
-                )
-                comp.features.extrudeFeatures.add(exturdeInput1)
-
-                # Creates second extrude to cut internal hole
-                exturdeInput2 = comp.features.extrudeFeatures.createInput(sketch.profiles[1], 1)
-                exturdeInput2.setOneSideExtent(
-                    adsk.fusion.DistanceExtentDefinition.create(adsk.core.ValueInput.createByString("7.5 mm")),
-                    0,
-                    adsk.core.ValueInput.createByString("0 deg")
-                )
-                f2 = comp.features.extrudeFeatures.add(exturdeInput2)
-
-                if(des.designType):
-                    des.timeline.timelineGroups.add(f1.timelineObject.index-1, f2.timelineObject.index)
+# Fires when the Command gets closed, no matter if it was executed or canceled
+# Responsible for removing the preview graphics and reporting the stage timings.
+class CommandDestroyHandler(adsk.core.CommandEventHandler):
+    def __init__(self):
+        super().__init__()
+    def notify(self, args):
+        try:
+            clearPreviewGraphics()
+            cancelPreview()
+            _preview["command"] = None
+            adsk.core.Application.get().unregisterCustomEvent(PREVIEW_EVENT_ID)
+            if(profiling.enabled):
+                reportTimings()
+            releaseCommandHandlers()
+            if(getStore()):
+                getStore().setLastSettings(pers)
+                getStore().flush()
+        except:
+            print(traceback.format_exc())
 
-            
-            elif(args.command.commandInputs.itemById("DDType").selectedItem.name == "Female Slip"):
-
-                # Creates circle for outside diameter
-                sketch.sketchCurves.sketchCircles.addByCenterRadius(
-                    pointPrim,
-                    0.65/2
-                )
-
-                # Creates circle for base diameter of taper
-                sketch.sketchCurves.sketchCircles.addByCenterRadius(
-                    pointPrim,
-                    (0.43 - math.tan(math.radians(3.44)) * 0.9 + args.command.commandInputs.itemById("VIDiametralClearance").value) / 2
-                )
-
-                # Creates extude cut with taper
-                exturdeInput1 = comp.features.extrudeFeatures.createInput(sketch.profiles[0], 0)
-                exturdeInput1.setOneSideExtent(
-                    adsk.fusion.DistanceExtentDefinition.create(adsk.core.ValueInput.createByString("9 mm")),
-                    0,
-                    adsk.core.ValueInput.createByString("0 deg")
-                )
-                f1 = comp.features.extrudeFeatures.add(exturdeInput1)
-
-                # Creates extude cut with taper
-                exturdeInput2 = comp.features.extrudeFeatures.createInput(sketch.profiles[1], 1)
-                exturdeInput2.setOneSideExtent(
-                    adsk.fusion.DistanceExtentDefinition.create(adsk.core.ValueInput.createByString("9 mm")),
-                    0,
-                    adsk.core.ValueInput.createByString("1.72 deg")
-                )
-                f2 = comp.features.extrudeFeatures.add(exturdeInput2)
-
-                if(des.designType):
-                    des.timeline.timelineGroups.add(f1.timelineObject.index-1, f2.timelineObject.index)
-
-
-            elif(args.command.commandInputs.itemById("DDType").selectedItem.name == "Female Slip (internal)"):
-
-                # Creates circle for base diameter of taper
-                sketch.sketchCurves.sketchCircles.addByCenterRadius(
-                    pointPrim,
-                    (0.43 + args.command.commandInputs.itemById("VIDiametralClearance").value) / 2
-                )
-
-                # Creates extude cut with taper
-                exturdeInput1 = comp.features.extrudeFeatures.createInput(sketch.profiles[0], 1)
-                exturdeInput1.setOneSideExtent(
-                    adsk.fusion.DistanceExtentDefinition.create(adsk.core.ValueInput.createByString("-9 mm")),
-                    0,
-                    adsk.core.ValueInput.createByString("-1.72 deg")
-                )
-                f1 = comp.features.extrudeFeatures.add(exturdeInput1)
-
-                if(des.designType):
-                    des.timeline.timelineGroups.add(f1.timelineObject.index-1, f1.timelineObject.index)
-
-
-            elif(args.command.commandInputs.itemById("DDType").selectedItem.name == "Female Lock"):
-
-                # Creates circle for outside diameter
-                sketch.sketchCurves.sketchCircles.addByCenterRadius(
-                    pointPrim,
-                    0.67/2
-                )
-
-                # Creates circle for base diameter of taper
-                sketch.sketchCurves.sketchCircles.addByCenterRadius(
-                    pointPrim,
-                    (0.43 - math.tan(math.radians(3.44)) * 0.9 + args.command.commandInputs.itemById("VIDiametralClearance").value) / 2
-                )
-
-                # Vector maths! Yay!!!1!
-                offsetODArc = adsk.core.Vector3D.create(-0.124, 0.3695, 0)
-                offsetCSA1 = adsk.core.Vector3D.create(-0.1487, 0.0435, 0)
-                offsetCSA2 = adsk.core.Vector3D.create(-0.0156 , 0.1534, 0)
-                offsetLine = adsk.core.Vector3D.create(0,0,0.9)
-
-                posODArc = pointPrim.copy()
-                posODArc.translateBy(offsetODArc)
-
-                posCSA1 = pointPrim.copy()
-                posCSA1.translateBy(offsetCSA1)
-
-                posCSA2 = pointPrim.copy()
-                posCSA2.translateBy(offsetCSA2)
-
-                offsetODArc.scaleBy(-1)
-                offsetCSA1.scaleBy(-1)
-                offsetCSA2.scaleBy(-1)
-
-                posODArc2 = pointPrim.copy()
-                posODArc2.translateBy(offsetODArc)
-
-                posCSA3 = pointPrim.copy()
-                posCSA3.translateBy(offsetCSA1)
-
-                posCSA4 = pointPrim.copy()
-                posCSA4.translateBy(offsetCSA2)
-
-                posLine = pointPrim.copy()
-                posLine.translateBy(offsetLine)
 
-                
-                # Creates Arcs for thread crosssection
-                odArc1 = sketch.sketchCurves.sketchArcs.addByCenterStartSweep(
-                    pointPrim,
-                    posODArc,
-                    math.radians(42.4)
-                )
-
-                sketch.sketchCurves.sketchArcs.addByCenterStartSweep(
-                    posCSA1,
-                    odArc1.startSketchPoint,
-                    math.radians(-22.8)
-                )
-
-                sketch.sketchCurves.sketchArcs.addByCenterStartSweep(
-                    posCSA2,
-                    odArc1.endSketchPoint,
-                    math.radians(22.8)
-                )
-
-
-                odArc2 = sketch.sketchCurves.sketchArcs.addByCenterStartSweep(
-                    pointPrim,
-                    posODArc2,
-                    math.radians(42.4)
-                )
-
-                sketch.sketchCurves.sketchArcs.addByCenterStartSweep(
-                    posCSA3,
-                    odArc2.startSketchPoint,
-                    math.radians(-22.8)
-                )
-
-                sketch.sketchCurves.sketchArcs.addByCenterStartSweep(
-                    posCSA4,
-                    odArc2.endSketchPoint,
-                    math.radians(22.8)
-                )
-
-                pathLine = sketch.sketchCurves.sketchLines.addByTwoPoints(
-                    pointPrim,
-                    posLine
-                )
-
-
-                # Creates extude cut with taper
-                exturdeInput1 = comp.features.extrudeFeatures.createInput(sketch.profiles[3], 0)
-                exturdeInput1.setOneSideExtent(
-                    adsk.fusion.DistanceExtentDefinition.create(adsk.core.ValueInput.createByString("9 mm")),
-                    0,
-                    adsk.core.ValueInput.createByString("0 deg")
-                )
-                f1 = comp.features.extrudeFeatures.add(exturdeInput1)
-                
-                # Creates extude cut with taper
-                exturdeInput2 = comp.features.extrudeFeatures.createInput(sketch.profiles[0], 1)
-                exturdeInput2.setOneSideExtent(
-                    adsk.fusion.DistanceExtentDefinition.create(adsk.core.ValueInput.createByString("9 mm")),
-                    0,
-                    adsk.core.ValueInput.createByString("1.72 deg")
-                )
-                comp.features.extrudeFeatures.add(exturdeInput2)
-
-                # Creates Object collection of both thread wings
-                oc = adsk.core.ObjectCollection.create()
-                oc.add(sketch.profiles[1])
-                oc.add(sketch.profiles[2])
-
-                path = comp.features.createPath(pathLine)
-                sweepInput = comp.features.sweepFeatures.createInput(oc, path, 0)
-                sweepInput.twistAngle = adsk.core.ValueInput.createByReal(math.radians(648))
-                f2 = comp.features.sweepFeatures.add(sweepInput)
-
-                if(des.designType):
-                    des.timeline.timelineGroups.add(f1.timelineObject.index-1, f2.timelineObject.index)
-
-            eventArgs.isValidResult = True                
-            
+# Fires on the main thread whenever an export worker finished a file, and once per STEP file
+# Responsible for the progress dialog, cancelling and writing the STEP files.
+class ExportEventHandler(adsk.core.CustomEventHandler):
+    def __init__(self):
+        super().__init__()
+    def notify(self, args):
+        try:
+            progress = _export["progress"]
+            # Events of the workers can still arrive after the export finished
+            if(progress is None):
+                return
+            if(progress.wasCancelled):
+                cancelExport()
+                return
+
+            if(_export["fittings"]):
+                path, transform = _export["fittings"].pop(0)
+                tbm = adsk.fusion.TemporaryBRepManager.get()
+                body = tbm.copy(_export["template"])
+                tbm.transform(body, transform)
+                with profiling.stage("temporaryBRepManager.exportToFile"):
+                    tbm.exportToFile([body], path)
+                _export["done"] += 1
+                # Gives the UI a turn before the next file
+                if(_export["fittings"]):
+                    adsk.core.Application.get().fireCustomEvent(EXPORT_EVENT_ID)
+
+            if(_export["queue"]):
+                finished, total = _export["queue"].progress()
+                complete = total is not None and finished >= total
+            else:
+                finished, complete = 0, not _export["fittings"]
+            progress.progressValue = _export["done"] + finished
+            if(complete):
+                finishExport()
         except:
             print(traceback.format_exc())
 
@@ -653,14 +452,45 @@ class CommandInputChangedHandler(adsk.core.InputChangedEventHandler):
         super().__init__()
     def notify(self, args):
         try:
-            if(args.input.id == "DDType"):
+            if(args.input.id == "DDPreset"):
+                applyPreset(args.inputs, args.input.selectedItem.name)
+                args.inputs.itemById("BVDeletePreset").isVisible = args.input.selectedItem.name != NO_PRESET
+            elif(args.input.id == "BVSavePreset"):
+                savePreset(args.inputs)
+            elif(args.input.id == "BVDeletePreset"):
+                deletePreset(args.inputs)
+            elif(args.input.id == "DDType"):
                 args.inputs.itemById("VIHole").isVisible = not args.input.selectedItem.name[0] == "F"
+            elif(args.input.id == "BVCache"):
+                args.inputs.itemById("BVNodePerFitting").isVisible = args.input.value
+                args.inputs.itemById("BVParameters").isVisible = not args.input.value
+                args.inputs.itemById("STParameterPrefix").isVisible = pers["BVParameters"] and not args.input.value
+            elif(args.input.id == "DDPattern"):
+                pers["DDPattern"] = args.input.selectedItem.name
+                updatePatternInputs(args.inputs)
+            elif(args.input.id == "BVNodePerFitting"):
+                pers["BVNodePerFitting"] = args.input.value
+            elif(args.input.id == "BVParameters"):
+                pers["BVParameters"] = args.input.value
+                args.inputs.itemById("STParameterPrefix").isVisible = args.input.value
+            elif(args.input.id == "STParameterPrefix"):
+                pers["STParameterPrefix"] = args.input.value
+            elif(args.input.id == "DDExport"):
+                pers["DDExport"] = args.input.selectedItem.name
+                args.inputs.itemById("STExportFolder").isVisible = pers["DDExport"] != "None"
+            elif(args.input.id == "STExportFolder"):
+                pers["STExportFolder"] = args.input.value
+            elif(args.input.id in PATTERN_INPUTS):
+                pers[args.input.id] = args.input.value
+            elif(args.input.id in ("VIDiametralClearance", "VIHole")):
+                _preview["lastChange"] = time.perf_counter()
         except:
             print(traceback.format_exc())
                 
                           
 # Fires when CommandInputs are changed or other parts of the UI are updated
 # Responsible for turning the ok button on or off and allowing preview
+# Parameters no fitting can be built from are rejected here, so no preview gets started for them.
 class CommandValidateInputsEventHandler(adsk.core.ValidateInputsEventHandler):
     def __init__(self):
         super().__init__()
@@ -675,21 +505,639 @@ class CommandValidateInputsEventHandler(adsk.core.ValidateInputsEventHandler):
             siOrigin = args.inputs.itemById("SIOrigin")
             siPlane = args.inputs.itemById("SIPlane")
             
-            if(siOrigin.selectionCount == 1 and siPlane.selectionCount == 0):
-                if(not ( siOrigin.selection(0).entity.objectType == "adsk::fusion::SketchPoint" ) or des.designType == 0):
-                    args.areInputsValid = False
+            if(siOrigin.selectionCount >= 1 and siPlane.selectionCount == 0):
+                for i in range(siOrigin.selectionCount):
+                    if(not ( siOrigin.selection(i).entity.objectType == "adsk::fusion::SketchPoint" )):
+                        args.areInputsValid = False
+
+            problem = validate.check(
+                args.inputs.itemById("DDType").selectedItem.name,
+                args.inputs.itemById("VIDiametralClearance").value,
+                args.inputs.itemById("VIHole").value
+            ) or checkPattern(args.inputs, des.designType) or checkParameters(args.inputs, des.designType)
+            tbError = args.inputs.itemById("TBError")
+            if(problem):
+                args.areInputsValid = False
+                tbError.formattedText = problem
+            if(tbError.isVisible != bool(problem)):
+                tbError.isVisible = bool(problem)
         except:
             print(traceback.format_exc())
 
 
+# Returns the selected point entities and the selected plane entity the fittings get placed on,
+# None if no plane is selected and the points are sketch points, see getPlane
+def getSelections(inputs):
+    siOrigin = inputs.itemById("SIOrigin")
+    points = [siOrigin.selection(i).entity for i in range(siOrigin.selectionCount)]
+
+    if(inputs.itemById("SIPlane").selectionCount == 1):
+        plane = inputs.itemById("SIPlane").selection(0).entity
+    else:
+        plane = None
+
+    return points, plane
+
+
+# Returns the Plane primitive of the selected plane or, without one, of the first point's sketch.
+# The sketch's own coordinate system is used as its reference plane may be a face, which has no
+# point picked on it, or gone altogether in a direct design.
+def getPlane(points, plane):
+    if(plane):
+        return getPrimitiveFromSelection(plane)
+    origin, xDirection, yDirection, _ = points[0].parentSketch.transform.getAsCoordinateSystem()
+    return adsk.core.Plane.createUsingDirections(origin, xDirection, yDirection)
+
+
+# Returns one world space Matrix3D per selected point, mapping the fitting's local
+# coordinate system (see luer.mesh) onto its place on the plane
+def getFittingTransforms(inputs):
+    points, plane = getSelections(inputs)
+    planePrim = getPlane(points, plane)
+
+    # Without a selected plane it's the one of the first point's sketch
+    planeKey = (plane or points[0]).entityToken
+    transforms = [getPointTransform(point, planePrim, planeKey).copy() for point in points]
+    return getPatternTransforms(inputs, planePrim, transforms)
+
+
+# Returns the Matrix3D placing a fitting at the point on the plane given by planePrim and identified by planeKey.
+# Like the primitives it's computed once per point and plane until the design changes, the transforms are shared.
+def getPointTransform(point, planePrim, planeKey):
+    key = (point.entityToken, planeKey)
+    transform = _resolved.get(key)
+    if(transform is None):
+        origin = projectPointOnPlane(getPrimitiveFromSelection(point), planePrim)
+        transform = adsk.core.Matrix3D.create()
+        transform.setWithCoordinateSystem(origin, planePrim.uDirection, planePrim.vDirection, planePrim.normal)
+        _resolved.put(key, transform)
+    return transform
+
+
+# Shows the inputs the selected pattern needs
+def updatePatternInputs(inputs):
+    pattern = pers["DDPattern"]
+    inputs.itemById("ISPatternCount").isVisible = pattern != "None"
+    inputs.itemById("VIPatternSpacing").isVisible = pattern in ["Rectangular", "Path"]
+    inputs.itemById("ISPatternRows").isVisible = pattern == "Rectangular"
+    inputs.itemById("VIPatternRowSpacing").isVisible = pattern == "Rectangular"
+    inputs.itemById("SIPatternCenter").isVisible = pattern == "Circular"
+    inputs.itemById("SIPatternPath").isVisible = pattern == "Path"
+
+
+# Returns the number of copies the selected pattern makes of the fittings at the selected points
+def patternCopies():
+    pattern = pers["DDPattern"]
+    if(pattern == "None"):
+        return 1
+    if(pattern == "Rectangular"):
+        return pers["ISPatternCount"] * pers["ISPatternRows"]
+    return pers["ISPatternCount"]
+
+
+# Returns None if the pattern can be built, otherwise the reason
+def checkPattern(inputs, designType):
+    pattern = pers["DDPattern"]
+    if(patternCopies() > MAX_PATTERN_COPIES):
+        return "Patterns make at most {} copies, count times rows".format(MAX_PATTERN_COPIES)
+    if(pattern == "Circular" and not inputs.itemById("SIPatternCenter").selectionCount):
+        return "Select the center of the pattern"
+    if(pattern == "Path"):
+        if(not inputs.itemById("SIPatternPath").selectionCount):
+            return "Select the path of the pattern"
+        if(inputs.itemById("BVCache").value):
+            return "Path patterns can't reuse cached bodies"
+        if(not designType):
+            return "Path patterns need a parametric design"
+    return None
+
+
+# Returns None if the fittings can be driven by user parameters or aren't, otherwise the reason
+def checkParameters(inputs, designType):
+    if(not pers["BVParameters"] or not designType or inputs.itemById("BVCache").value):
+        return None
+    if(not parameters.isValidPrefix(pers["STParameterPrefix"])):
+        return "The parameter prefix has to start with a letter and contain only letters, digits and _"
+    return None
+
+
+# Returns the pattern center projected onto the plane, the point the circular pattern rotates around
+def getPatternCenter(inputs, planePrim):
+    center = inputs.itemById("SIPatternCenter").selection(0).entity
+    return projectPointOnPlane(getPrimitiveFromSelection(center), planePrim)
+
+
+# Returns the transforms of every fitting of the pattern, the ones at the selected points first.
+# Path patterns follow a curve only Fusion evaluates, so only the fittings at the selected points are returned.
+def getPatternTransforms(inputs, planePrim, transforms):
+    pattern = pers["DDPattern"]
+    # Previews fired by the PreviewEventHandler skip validateInputs, see checkPattern
+    if(pattern not in ["Rectangular", "Circular"] or patternCopies() > MAX_PATTERN_COPIES):
+        return transforms
+
+    count = pers["ISPatternCount"]
+    u = planePrim.uDirection.copy()
+    v = planePrim.vDirection.copy()
+    u.normalize()
+    v.normalize()
+
+    if(pattern == "Rectangular"):
+        spacing = pers["VIPatternSpacing"]
+        rowSpacing = pers["VIPatternRowSpacing"]
+        offsets = [(i * spacing, j * rowSpacing) for j in range(pers["ISPatternRows"]) for i in range(count)]
+
+        result = []
+        for du, dv in offsets:
+            for transform in transforms:
+                origin, x, y, z = transform.getAsCoordinateSystem()
+                origin.translateBy(adsk.core.Vector3D.create(du * u.x + dv * v.x, du * u.y + dv * v.y, du * u.z + dv * v.z))
+                placed = adsk.core.Matrix3D.create()
+                placed.setWithCoordinateSystem(origin, x, y, z)
+                result.append(placed)
+        return result
+
+    if(inputs.itemById("SIPatternCenter").selectionCount):
+        center = getPatternCenter(inputs, planePrim)
+
+        # Rotates a vector within the plane, the part along the normal stays
+        def rotate(vector, angle):
+            a, b = vector.dotProduct(u), vector.dotProduct(v)
+            ra, rb = a * math.cos(angle) - b * math.sin(angle), a * math.sin(angle) + b * math.cos(angle)
+            return adsk.core.Vector3D.create(
+                vector.x + (ra - a) * u.x + (rb - b) * v.x,
+                vector.y + (ra - a) * u.y + (rb - b) * v.y,
+                vector.z + (ra - a) * u.z + (rb - b) * v.z
+            )
+
+        result = []
+        for k in range(count):
+            angle = 2 * math.pi * k / count
+            for transform in transforms:
+                origin, x, y, z = transform.getAsCoordinateSystem()
+                placedOrigin = center.copy()
+                placedOrigin.translateBy(rotate(center.vectorTo(origin), angle))
+                placed = adsk.core.Matrix3D.create()
+                placed.setWithCoordinateSystem(placedOrigin, rotate(x, angle), rotate(y, angle), z)
+                result.append(placed)
+        return result
+
+    return transforms
+
+
+# Returns one world space Matrix3D per built fitting, the copies of its pattern included.
+# Path patterns follow a curve only Fusion evaluates, their copies are placed by the elements of the built
+# pattern feature, whose first element is the original. Those transforms are in the space of the active component.
+def getBuiltTransforms(des, inputs, features):
+    transforms = getFittingTransforms(inputs)
+    pathPatterns = [feature for feature in features if feature.objectType == "adsk::fusion::PathPatternFeature"]
+    if(not pathPatterns):
+        return transforms
+
+    toWorld = getOccurrenceTransform(des.activeOccurrence) if des.activeOccurrence else adsk.core.Matrix3D.create()
+    fromWorld = toWorld.copy()
+    fromWorld.invert()
+    result = []
+    for element in pathPatterns[0].patternElements:
+        elementTransform = element.transform
+        for transform in transforms:
+            placed = transform.copy()
+            placed.transformBy(fromWorld)
+            placed.transformBy(elementTransform)
+            placed.transformBy(toWorld)
+            result.append(placed)
+    return result
+
+
+# Exports the built fittings into the folder of the inputs, one file each, without blocking the UI.
+# Every fitting, pattern copies included, gets a file of its own with the fitting alone, not the body it's on.
+# The mesh formats get written from luer's meshes by worker threads, placed by frames taken here.
+# STEP files can only be written by Fusion, from transient copies of the template body, one per EXPORT_EVENT_ID.
+def startExport(inputs, features):
+    cancelExport()
+    app = adsk.core.Application.get()
+    des = app.activeProduct
+    exportFormat = pers["DDExport"]
+    folder = pers["STExportFolder"]
+    os.makedirs(folder, exist_ok=True)
+
+    # Registered before the workers start, events fired before that would get lost
+    _export["handler"] = ExportEventHandler()
+    app.registerCustomEvent(EXPORT_EVENT_ID).add(_export["handler"])
+
+    transforms = getBuiltTransforms(des, inputs, features)
+    if(exportFormat == "STEP"):
+        dims = spec.fittingDims(pers["DDType"], pers["VIDiametralClearance"], pers["VIHole"])
+        # Like luer.export.exportMesh, fittings made of a cut alone are exported as the cut
+        join, cut = builders.load("template").getTemplate(des.activeComponent, dims, _templates)
+        _export["template"] = join or cut
+        _export["fittings"] = [(os.path.join(folder, "{} {}.step".format(pers["DDType"], i + 1)), transform) for i, transform in enumerate(transforms)]
+        _export["total"] = len(transforms)
+    else:
+        from .luer import exportqueue
+
+        # Snapshots the placement of every fitting, the workers must not call into Fusion
+        frames = []
+        for transform in transforms:
+            origin, x, y, z = transform.getAsCoordinateSystem()
+            frames.append(tuple((v.x, v.y, v.z) for v in (origin, x, y, z)))
+        jobs = exportqueue.fittingJobs(
+            folder,
+            "." + exportFormat.lower(),
+            pers["DDType"],
+            pers["VIDiametralClearance"],
+            pers["VIHole"],
+            frames
+        )
+        _export["total"] = len(frames)
+        _export["queue"] = exportqueue.ExportQueue(jobs, onProgress=lambda done, total: app.fireCustomEvent(EXPORT_EVENT_ID))
+
+    _export["folder"] = folder
+    _export["done"] = 0
+
+    progress = app.userInterface.createProgressDialog()
+    progress.isCancelButtonShown = True
+    progress.show("Exporting Luer Fittings", "%v of %m files", 0, max(_export["total"], 1), 0)
+    _export["progress"] = progress
+
+    # Starts the STEP files, also closes the dialog again if there's nothing to export
+    app.fireCustomEvent(EXPORT_EVENT_ID)
+
+
+# Stops the running export, files already written stay
+def cancelExport():
+    if(_export["queue"]):
+        _export["queue"].cancel()
+    _export["fittings"] = []
+    if(_export["handler"]):
+        finishExport()
+
+
+# Closes the progress dialog and reports the written files to the Text Commands palette
+def finishExport():
+    app = adsk.core.Application.get()
+    queue = _export["queue"]
+    done = _export["done"] + (queue.done if queue else 0)
+    failed = queue.failed if queue else []
+    cancelled = queue.cancelled if queue else done < _export["total"]
+
+    app.unregisterCustomEvent(EXPORT_EVENT_ID)
+    if(_export["progress"]):
+        _export["progress"].hide()
+    app.log("exported {} of {} files to {}{}".format(done, _export["total"], _export["folder"], ", cancelled" if cancelled else ""))
+    for path, error in failed:
+        app.log("export of {} failed: {}".format(path, error))
+
+    _export.update(queue=None, fittings=[], template=None, done=0, total=0, progress=None, handler=None)
+
+
+# Returns the Store in the directory given by luer.store.DIRECTORY_ENV or the default one,
+# False if it can't be opened, then the add-in works like before without persistence.
+# It's opened when the command is used for the first time, not at startup.
+def getStore():
+    global _store
+    if(_store is None):
+        # Imported here, hashlib and tempfile would make up most of the add-in's import time
+        from .luer import store
+        try:
+            _store = store.Store()
+        except OSError:
+            _store = False
+        loadLastSettings()
+    return _store
+
+
+# Takes the last used settings of an earlier session, as far as they still fit the dialog
+def loadLastSettings():
+    if(not _store):
+        return
+    for key, value in _store.lastSettings().items():
+        if(key in pers and type(value) == type(pers[key])):
+            pers[key] = value
+    if(pers["DDType"] not in spec.FITTING_TYPES):
+        pers["DDType"] = spec.FITTING_TYPES[0]
+    if(pers["DDPattern"] not in PATTERNS):
+        pers["DDPattern"] = PATTERNS[0]
+    if(pers["DDExport"] not in EXPORT_FORMATS):
+        pers["DDExport"] = EXPORT_FORMATS[0]
+
+
+# Sets the type, clearance and hole inputs to the values of the preset
+def applyPreset(inputs, name):
+    preset = getStore().presets().get(name) if getStore() else None
+    if(preset is None):
+        return
+    ddType = inputs.itemById("DDType")
+    for item in ddType.listItems:
+        if(item.name == preset.type):
+            item.isSelected = True
+    inputs.itemById("VIHole").isVisible = spec.SPECS[preset.type].kind in ["male", "maleInternal"]
+    inputs.itemById("VIDiametralClearance").value = preset.clearance
+    inputs.itemById("VIHole").value = preset.hole
+
+
+# Saves the type, clearance and hole inputs as preset named by STPresetName and selects it,
+# an existing preset of that name gets overwritten
+def savePreset(inputs):
+    name = inputs.itemById("STPresetName").value.strip()
+    if(not name or name == NO_PRESET or not getStore()):
+        return
+    from .luer import store
+    getStore().savePreset(name, store.Preset(
+        inputs.itemById("DDType").selectedItem.name,
+        inputs.itemById("VIDiametralClearance").value,
+        inputs.itemById("VIHole").value
+    ))
+
+    ddPreset = inputs.itemById("DDPreset")
+    names = [item.name for item in ddPreset.listItems]
+    if(name not in names):
+        ddPreset.listItems.add(name, False, "")
+        names.append(name)
+    ddPreset.listItems.item(names.index(name)).isSelected = True
+    ddPreset.isVisible = True
+    inputs.itemById("BVDeletePreset").isVisible = True
+
+
+# Deletes the preset selected in DDPreset from the store and the dropdown
+def deletePreset(inputs):
+    ddPreset = inputs.itemById("DDPreset")
+    item = ddPreset.selectedItem
+    if(item is None or item.name == NO_PRESET or not getStore()):
+        return
+    getStore().deletePreset(item.name)
+    item.deleteMe()
+    ddPreset.listItems.item(0).isSelected = True
+    ddPreset.isVisible = ddPreset.listItems.count > 1
+    inputs.itemById("BVDeletePreset").isVisible = False
+
+
+# Returns the (body, cut) preview meshes of the luer.lod level with the error, from the store if an
+# earlier session already built them
+def getPreviewMesh(fittingType, clearance, hole, error):
+    from .luer import store
+    key = store.cacheKey("previewMesh", fittingType, round(clearance, 9), round(hole, 9), error)
+    try:
+        meshes = getStore().getMeshes(key) if getStore() else None
+    except (OSError, ValueError, struct.error):
+        meshes = None
+    if(meshes is not None):
+        return meshes
+
+    meshes = lod.fittingMesh(fittingType, clearance, hole, error)
+    if(getStore()):
+        try:
+            getStore().putMeshes(key, meshes)
+        except OSError:
+            pass
+    return meshes
+
+
+# Keeps the handler referenced until releaseCommandHandlers and connects it to the event of the command
+def addCommandHandler(event, handler):
+    event.add(handler)
+    _commandHandlers.append(handler)
+    return handler
+
+
+# Drops the handlers of the command, its events don't fire anymore once it's destroyed
+def releaseCommandHandlers():
+    _commandHandlers.clear()
+
+
+# Returns the number of referenced handlers and cached bodies, and the traced memory if tracemalloc runs
+def diagnostics():
+    result = {
+        "handlers": len(_handlers),
+        "commandHandlers": len(_commandHandlers),
+        "templates": len(_templates),
+        "previewGraphics": len(_previewGraphics),
+    }
+    # Whoever started tracemalloc imported it, the add-in doesn't pay for its import otherwise
+    tracemalloc = sys.modules.get("tracemalloc")
+    if(tracemalloc and tracemalloc.is_tracing()):
+        result["memory"], result["peakMemory"] = tracemalloc.get_traced_memory()
+    return result
+
+
+# Writes the stage timings of this session to the file given by PROFILE_ENV and the Text Commands palette
+def reportTimings():
+    path = os.environ.get(PROFILE_ENV)
+    if(path):
+        profiling.dump(path)
+    app = adsk.core.Application.get()
+    app.log(profiling.formatSummary())
+    app.log("template cache: {entries} entries, {hits} hits, {misses} misses, {evictions} evictions".format(**_templates.stats()))
+    app.log("diagnostics: " + ", ".join("{} {}".format(name, value) for name, value in diagnostics().items()))
+
+
+# Fires PREVIEW_EVENT_ID after the delay (in s), replacing an earlier pending one
+def schedulePreview(delay):
+    cancelPreview()
+    timer = threading.Timer(delay, adsk.core.Application.get().fireCustomEvent, (PREVIEW_EVENT_ID,))
+    timer.daemon = True
+    _preview["timer"] = timer
+    timer.start()
+
+
+# Stops a pending postponed preview
+def cancelPreview():
+    if(_preview["timer"]):
+        _preview["timer"].cancel()
+        _preview["timer"] = None
+
+
+# Deletes all custom graphics drawn by the preview
+def clearPreviewGraphics():
+    while(_previewGraphics):
+        graphics = _previewGraphics.pop()
+        if(graphics.isValid):
+            graphics.deleteMe()
+
+
+# Builds the selected fittings as real features and groups them in the timeline, returns the features
+def buildFittings(inputs):
+    app = adsk.core.Application.get()
+    des = app.activeProduct
+    comp = des.activeComponent
+
+    dims = spec.fittingDims(
+        inputs.itemById("DDType").selectedItem.name,
+        inputs.itemById("VIDiametralClearance").value,
+        inputs.itemById("VIHole").value
+    )
+
+    # Direct designs have no timeline, the fittings are inserted as bodies right away
+    parametric = des.designType
+    if(not parametric):
+        features = builders.load("direct").buildDirect(comp, inActiveComponent(des, getFittingTransforms(inputs)), dims, _templates)
+    elif(inputs.itemById("BVCache").value):
+        features = builders.load("template").buildFromTemplate(
+            comp,
+            inActiveComponent(des, getFittingTransforms(inputs)),
+            dims,
+            _templates,
+            pers["BVNodePerFitting"]
+        )
+    else:
+        features = buildFromSketch(comp, inputs, dims)
+
+    if(parametric and len(features) > 1):
+        with profiling.stage("timelineGroups.add"):
+            des.timeline.timelineGroups.add(features[0].timelineObject.index, features[-1].timelineObject.index)
+
+    return features
+
+
+# Builds the fittings from one sketch and one feature per stage for all of them
+# Returns the sketch and the features in timeline order.
+def buildFromSketch(comp, inputs, dims):
+    points, plane = getSelections(inputs)
+
+    # Calculates it Plane primitive
+    planePrim = getPlane(points, plane)
+
+    # Derives the plane object from the first selected sketchPoint
+    if(plane is None):
+        plane = points[0].parentSketch.referencePlane
+
+    # Creates a single sketch on the plane object without including any geometry
+    # All fittings are drawn into it so every stage can be built as one multi-profile feature
+    with profiling.stage("sketches.addWithoutEdges"):
+        sketch = comp.sketches.addWithoutEdges(plane)
+
+    # Gets inverse transform matrix of Sketch
+    it = sketch.transform.copy()
+    it.invert()
+
+    # Calculates the Point3D of every point, projects it onto plane and transforms it into sketch space
+    pointPrims = []
+    for point in points:
+        pointPrim = projectPointOnPlane(getPrimitiveFromSelection(point), planePrim)
+        pointPrim.transformBy(it)
+        pointPrims.append(pointPrim)
+
+    # The builders move the points they get
+    pattern = pers["DDPattern"]
+    patternStart = pointPrims[0].copy() if pattern != "None" else None
+
+    features = builders.builder(dims.spec.kind)(comp, sketch, pointPrims, dims)
+    if(pers["BVParameters"]):
+        des = adsk.core.Application.get().activeProduct
+        builders.load("parameters").bindParameters(des, sketch, features, pers["STParameterPrefix"], dims)
+
+    if(pattern != "None"):
+        features.append(addPattern(comp, sketch, it, inputs, planePrim, patternStart, features))
+
+    return [sketch] + features
+
+
+# Replicates the features with the pattern selected in the inputs, returns the pattern feature.
+# The directions and the axis are drawn into the fitting sketch, it is the inverse of its transform.
+# They're construction lines, so they don't split the profiles the features were built from.
+def addPattern(comp, sketch, it, inputs, planePrim, start, features):
+    pattern = pers["DDPattern"]
+    count = pers["ISPatternCount"]
+    patterns = builders.load("pattern")
+
+    def sketchLine(origin, direction):
+        direction = direction.copy()
+        direction.normalize()
+        direction.transformBy(it)
+        end = origin.copy()
+        end.translateBy(direction)
+        line = sketch.sketchCurves.sketchLines.addByTwoPoints(origin, end)
+        line.isConstruction = True
+        return line
+
+    if(pattern == "Rectangular"):
+        return patterns.addRectangularPattern(
+            comp,
+            features,
+            sketchLine(start, planePrim.uDirection),
+            count,
+            pers["VIPatternSpacing"],
+            sketchLine(start, planePrim.vDirection),
+            pers["ISPatternRows"],
+            pers["VIPatternRowSpacing"]
+        )
+
+    if(pattern == "Circular"):
+        center = getPatternCenter(inputs, planePrim)
+        center.transformBy(it)
+        return patterns.addCircularPattern(comp, features, sketchLine(center, planePrim.normal), count)
+
+    path = inputs.itemById("SIPatternPath").selection(0).entity
+    return patterns.addPathPattern(comp, features, path, count, pers["VIPatternSpacing"])
+
+
+# Marks the resolved selections as outdated. Commands are modal and every preview gets rolled back,
+# so the design only changes between two commands or when one executes.
+def designChanged():
+    _resolved.clear()
+
+
+# Returns the primitive of the selected entity in world space: a Plane, an InfiniteLine3D or a Point3D.
+# It's resolved once per entity until the design changes, so repeated previews don't look it up again.
+# The primitives are shared, callers must copy them before modifying them.
 def getPrimitiveFromSelection(selection):
+    key = selection.entityToken
+    primitive = _resolved.get(key)
+    if(primitive is None):
+        primitive = resolvePrimitive(selection)
+        if(primitive is not None):
+            _resolved.put(key, primitive)
+    return primitive
+
+
+# Returns the Matrix3D from the space of the occurrence's component into world space.
+# Every occurrence is placed relative to the component it's in, so the transforms of nested
+# occurrences get composed from the innermost one outwards.
+def getOccurrenceTransform(occurrence):
+    key = occurrence.entityToken
+    transform = _resolved.get(key)
+    if(transform is None):
+        transform = adsk.core.Matrix3D.create()
+        while(occurrence):
+            # Proxies are placed relative to the root, their native occurrence relative to its parent
+            transform.transformBy((occurrence.nativeObject or occurrence).transform2)
+            occurrence = occurrence.assemblyContext
+        _resolved.put(key, transform)
+    return transform
+
+
+# Moves the world space transforms into the space of the design's active component, which the bodies
+# get added to. Returns the transforms.
+def inActiveComponent(des, transforms):
+    occurrence = des.activeOccurrence
+    if(occurrence is None):
+        return transforms
+    fromWorld = getOccurrenceTransform(occurrence).copy()
+    fromWorld.invert()
+    for transform in transforms:
+        transform.transformBy(fromWorld)
+    return transforms
+
+
+# Returns the primitive given in the space of the occurrence's component in world space.
+# Construction geometry is given that way even in an assembly context, BRep and sketch geometry isn't.
+def inWorldSpace(primitive, occurrence):
+    if(occurrence is None):
+        return primitive
+    primitive = primitive.copy()
+    primitive.transformBy(getOccurrenceTransform(occurrence))
+    return primitive
+
+
+# Looks up the primitive of the selected entity, see getPrimitiveFromSelection
+def resolvePrimitive(selection):
+    objectType = selection.objectType
+
     # Construction Plane
-    if selection.objectType == "adsk::fusion::ConstructionPlane":
-        # TODO: Coordinate in assembly context, world transform still required!
-        return selection.geometry
+    if objectType == "adsk::fusion::ConstructionPlane":
+        return inWorldSpace(selection.geometry, selection.assemblyContext)
 
     # Sketch Profile
-    if selection.objectType == "adsk::fusion::Profile":
+    if objectType == "adsk::fusion::Profile":
         return adsk.core.Plane.createUsingDirections(
             selection.parentSketch.origin,
             selection.parentSketch.xDirection,
@@ -697,7 +1145,7 @@ def getPrimitiveFromSelection(selection):
         )
 
     # BRepFace
-    if selection.objectType == "adsk::fusion::BRepFace":
+    if objectType == "adsk::fusion::BRepFace":
         _, normal = selection.evaluator.getNormalAtPoint(selection.pointOnFace)
         return adsk.core.Plane.create(
             selection.pointOnFace,
@@ -705,12 +1153,11 @@ def getPrimitiveFromSelection(selection):
         )
 
     # Construction Axis
-    if selection.objectType == "adsk::fusion::ConstructionAxis":
-        # TODO: Coordinate in assembly context, world transform still required!
-        return selection.geometry
+    if objectType == "adsk::fusion::ConstructionAxis":
+        return inWorldSpace(selection.geometry, selection.assemblyContext)
 
     # BRepEdge
-    if selection.objectType == "adsk::fusion::BRepEdge":
+    if objectType == "adsk::fusion::BRepEdge":
         # Linear edge
         if (selection.geometry.objectType == "adsk::core::Line3D"):
             _, tangent = selection.evaluator.getTangent(0)
@@ -723,20 +1170,19 @@ def getPrimitiveFromSelection(selection):
             return selection.geometry.center
 
     # Sketch Line
-    if selection.objectType == "adsk::fusion::SketchLine":
+    if objectType == "adsk::fusion::SketchLine":
         return selection.worldGeometry.asInfiniteLine()
 
     # Construction Point
-    if selection.objectType == "adsk::fusion::ConstructionPoint":
-        # TODO: Coordinate in assembly context, world transform still required!
-        return selection.geometry
+    if objectType == "adsk::fusion::ConstructionPoint":
+        return inWorldSpace(selection.geometry, selection.assemblyContext)
 
     # Sketch Point
-    if selection.objectType == "adsk::fusion::SketchPoint":
+    if objectType == "adsk::fusion::SketchPoint":
         return selection.worldGeometry
 
     # BRepVertex
-    if selection.objectType == "adsk::fusion::BRepVertex":
+    if objectType == "adsk::fusion::BRepVertex":
         return selection.geometry
 
 
@@ -789,6 +1235,13 @@ def stop(context):
         
         #Deletes the commandDefinition
         ui.commandDefinitions.itemById(COMMAND_ID).deleteMe()
+
+        _templates.clear()
+        cancelExport()
+        if(_store):
+            _store.flush()
+        releaseCommandHandlers()
+        _handlers.clear()
             
             
             
@@ -0,0 +1,54 @@
+# Simulates dragging the clearance spinner and counts how many previews actually get built.
+#
+# Usage: python benchmarks/bench_drag.py [--ticks N] [--interval MS] [--points N]
+#
+# Every tick changes VIDiametralClearance and fires executePreview like Fusion does. Ticks closer
+# together than the add-in's PREVIEW_COALESCE_INTERVAL should be coalesced into one rebuild at the end.
+
+import argparse
+import time
+
+import harness
+
+from harness import adsk
+
+
+def drag(addIn, fittingType, ticks, interval, points):
+    harness.newDesign()
+    command = harness.createCommand(addIn)
+    harness.configure(command, fittingType, count=points)
+    harness.fire(command, "executePreview")
+
+    groups = adsk.core.Application.get()._activeProduct._rootComponent._customGraphicsGroups
+    built = groups.count
+    start = time.perf_counter()
+    for tick in range(ticks):
+        harness.change(command, "VIDiametralClearance", tick * 0.001)
+        time.sleep(interval)
+    harness.pump(command, timeout=addIn.PREVIEW_COALESCE_INTERVAL * 4)
+    seconds = time.perf_counter() - start
+    built = groups.count - built
+
+    level = addIn._preview["level"]
+    harness.fire(command, "destroy")
+    return built, seconds, level
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=30, help="ms between ticks")
+    parser.add_argument("--points", type=int, default=1, help="fittings per command")
+    args = parser.parse_args()
+
+    addIn = harness.loadAddIn()
+
+    print("{} ticks {} ms apart, {} fitting(s) per command".format(args.ticks, args.interval, args.points))
+    print("{:<24}{:>10}{:>12}{:>8}".format("type", "previews", "total ms", "level"))
+    for fittingType in addIn.spec.FITTING_TYPES:
+        built, seconds, level = drag(addIn, fittingType, args.ticks, args.interval / 1000, args.points)
+        print("{:<24}{:>10}{:>12.1f}{:>8}".format(fittingType, built, seconds * 1000, level))
+
+
+if __name__ == "__main__":
+    main()
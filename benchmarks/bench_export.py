@@ -0,0 +1,129 @@
+# Compares exporting the built fittings one file after the other on the main thread to the add-in's background export.
+#
+# Usage: python benchmarks/bench_export.py [--points N] [--path-copies N] [--formats STL 3MF PLY STEP]
+#
+# Reports the files written per second and the longest time the main thread was busy at once, which is how
+# long Fusion's UI would freeze. The mesh formats are written by the worker threads of luer.exportqueue,
+# STEP files by the stand-in TemporaryBRepManager, which takes EXPORT_SECONDS per file, one file per custom event.
+# Every format gets one file per fitting. With --path-copies the fittings are repeated by a path pattern along a
+# line, whose copies only Fusion places, and the benchmark fails unless every copy got its file as well.
+
+import argparse
+import os
+import queue
+import shutil
+import tempfile
+import time
+
+import harness
+
+from harness import adsk
+
+
+def setUp(addIn, fittingType, points, pathCopies, exportFormat, folder):
+    design = harness.newDesign()
+    command = harness.createCommand(addIn)
+    harness.configure(command, fittingType, count=points)
+    if(pathCopies > 1):
+        harness.select(command, "DDPattern", "Path")
+        harness.change(command, "ISPatternCount", pathCopies)
+        sketch = adsk.fusion.Sketch(design, design._rootComponent._xYConstructionPlane, adsk.core.Matrix3D())
+        path = adsk.fusion.SketchLine(sketch, adsk.core.Point3D(0, -5, 0), adsk.core.Point3D(0, -4, 0))
+        command._commandInputs.itemById("SIPatternPath")._selections = [path]
+    # Fusion always previews before OK, which is where the add-in takes the dialog values
+    harness.fire(command, "executePreview")
+    addIn.pers["DDExport"] = exportFormat
+    addIn.pers["STExportFolder"] = folder
+    return command, harness.call(addIn.buildFittings, command._commandInputs)
+
+
+# Writes every file right away, like exporting them one at a time from the UI
+def exportBlocking(addIn, command, features, exportFormat, folder):
+    design = adsk.core.Application.get().activeProduct
+    transforms = addIn.getBuiltTransforms(design, command._commandInputs, features)
+    if(exportFormat == "STEP"):
+        tbm = adsk.fusion.TemporaryBRepManager.get()
+        dims = addIn.spec.fittingDims(addIn.pers["DDType"], addIn.pers["VIDiametralClearance"], addIn.pers["VIHole"])
+        join, cut = addIn.builders.load("template").getTemplate(design.activeComponent, dims, addIn._templates)
+        for i, transform in enumerate(transforms):
+            body = tbm.copy(join or cut)
+            tbm.transform(body, transform)
+            tbm.exportToFile([body], os.path.join(folder, "{}.step".format(i)))
+        return
+
+    frames = []
+    for transform in transforms:
+        frames.append(tuple((v.x, v.y, v.z) for v in transform.getAsCoordinateSystem()))
+    pers = addIn.pers
+    from luerAddIn.luer import exportqueue
+
+    jobs = exportqueue.fittingJobs(folder, "." + exportFormat.lower(), pers["DDType"], pers["VIDiametralClearance"], pers["VIHole"], frames)
+    for path, write, args in jobs:
+        write(path, *args)
+
+
+# Starts the background export and delivers its events until it's done, returns the longest event handler
+def exportBackground(addIn, command, features):
+    app = adsk.core.Application.get()
+    start = time.perf_counter()
+    harness.call(addIn.startExport, command._commandInputs, features)
+    longest = time.perf_counter() - start
+
+    while(addIn._export["handler"]):
+        try:
+            eventId, additionalInfo = app._pendingEvents.get(timeout=5)
+        except queue.Empty:
+            raise harness.AddInError("the export stalled")
+        event = app._customEvents.get(eventId)
+        start = time.perf_counter()
+        for handler in (event._handlers if event else []):
+            harness.call(handler.notify, adsk.core.CustomEventArgs(additionalInfo))
+        longest = max(longest, time.perf_counter() - start)
+    return longest
+
+
+def measure(addIn, fittingType, points, pathCopies, exportFormat, background):
+    folder = tempfile.mkdtemp(prefix="luer_export_")
+    try:
+        command, features = setUp(addIn, fittingType, points, pathCopies, exportFormat, folder)
+        start = time.perf_counter()
+        if(background):
+            longest = exportBackground(addIn, command, features)
+        else:
+            exportBlocking(addIn, command, features, exportFormat, folder)
+        seconds = time.perf_counter() - start
+        if(not background):
+            longest = seconds
+        harness.fire(command, "destroy")
+        return len(os.listdir(folder)), seconds, longest
+    finally:
+        addIn.pers["DDExport"] = "None"
+        addIn.pers["DDPattern"] = "None"
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=20, help="fittings per command")
+    parser.add_argument("--path-copies", type=int, default=1, help="copies of a path pattern of the fittings")
+    parser.add_argument("--type", default="Male Lock", help="fitting type")
+    parser.add_argument("--formats", nargs="+", default=["STL", "3MF", "PLY", "STEP"])
+    args = parser.parse_args()
+
+    addIn = harness.loadAddIn()
+
+    expected = args.points * args.path_copies
+    print("{} x {}".format(expected, args.type))
+    print("{:<8}{:<12}{:>8}{:>12}{:>12}{:>16}".format("format", "export", "files", "files/s", "total ms", "longest stall"))
+    for exportFormat in args.formats:
+        for background in [False, True]:
+            files, seconds, longest = measure(addIn, args.type, args.points, args.path_copies, exportFormat, background)
+            print("{:<8}{:<12}{:>8}{:>12.1f}{:>12.1f}{:>13.1f} ms".format(
+                exportFormat, "background" if background else "blocking", files, files / seconds, seconds * 1000, longest * 1000
+            ))
+            if(files != expected):
+                raise SystemExit("{} export wrote {} of {} files".format(exportFormat, files, expected))
+
+
+if __name__ == "__main__":
+    main()
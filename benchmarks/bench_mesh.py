@@ -0,0 +1,35 @@
+# Times the preview mesh generation of every fitting type outside of Fusion.
+#
+# Usage: python benchmarks/bench_mesh.py [segments] [repeats]
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from luer import mesh
+
+FITTING_TYPES = [
+    "Male Slip",
+    "Male Lock",
+    "Male Lock (internal)",
+    "Female Slip",
+    "Female Slip (internal)",
+    "Female Lock",
+]
+
+
+def main():
+    segments = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    print("{:<24}{:>12}{:>12}".format("type", "triangles", "ms/mesh"))
+    for fittingType in FITTING_TYPES:
+        body, cut = mesh.fittingMesh(fittingType, 0, 0.225, segments)
+        seconds = min(timeit.repeat(lambda: mesh.fittingMesh(fittingType, 0, 0.225, segments), number=1, repeat=repeats))
+        print("{:<24}{:>12}{:>12.3f}".format(fittingType, body.triangleCount + cut.triangleCount, seconds * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Builds fittings driven by user parameters and counts what one parameter edit reaches.
+#
+# Usage: python benchmarks/bench_parameters.py [--points N]
+#
+# Every fitting type is built twice into the same design, once without and once with user parameters.
+# Reports the extra calls the parameters cost on OK, the user parameters created and how many sketch
+# dimensions and extrude distances reference the clearance parameter, all of which follow a single edit of it.
+
+import argparse
+
+import harness
+
+from harness import adsk
+
+
+def build(addIn, design, fittingType, points, useParameters):
+    command = harness.createCommand(addIn)
+    harness.configure(command, fittingType, count=points)
+    addIn.pers["BVParameters"] = useParameters
+    harness.fire(command, "executePreview")
+
+    adsk.reset()
+    harness.fire(command, "execute")
+    calls = sum(adsk.calls.values())
+    harness.fire(command, "destroy")
+    addIn.pers["BVParameters"] = False
+    return calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=40, help="fittings per command")
+    args = parser.parse_args()
+
+    addIn = harness.loadAddIn()
+    print("{} fitting(s) per command".format(args.points))
+    print("{:<24}{:>14}{:>14}{:>14}{:>14}{:>14}".format("type", "plain calls", "param calls", "parameters", "dimensions", "distances"))
+    for fittingType in addIn.spec.FITTING_TYPES:
+        design = harness.newDesign()
+        plain = build(addIn, design, fittingType, args.points, False)
+        driven = build(addIn, design, fittingType, args.points, True)
+
+        clearance = addIn.pers["STParameterPrefix"] + "Clearance"
+        sketch = design._rootComponent._sketches._items[-1]
+        dimensions = sum(clearance in (d._parameter._expression or "") for d in sketch._sketchDimensions._items)
+        distances = sum(
+            feature._input._extentOne._distance._expression is not None
+            for feature in design._rootComponent._features._extrudeFeatures._items
+        )
+        print("{:<24}{:>14}{:>14}{:>14}{:>14}{:>14}".format(fittingType, plain, driven, design._userParameters.count, dimensions, distances))
+
+
+if __name__ == "__main__":
+    main()
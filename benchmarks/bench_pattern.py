@@ -0,0 +1,60 @@
+# Compares an array of fittings built with one pattern feature to the same array of selected points.
+#
+# Usage: python benchmarks/bench_pattern.py [--columns N] [--rows N] [--repeats N]
+#
+# With the pattern only the first fitting gets sketched and built, so the calls of the build on OK
+# should stay close to those of a single fitting no matter how large the array is.
+
+import argparse
+import time
+
+import harness
+
+from harness import adsk
+
+
+def measure(addIn, fittingType, columns, rows, repeats, pattern):
+    seconds = []
+    for _ in range(repeats):
+        harness.newDesign()
+        command = harness.createCommand(addIn)
+        if(pattern):
+            harness.configure(command, fittingType, count=1)
+            harness.select(command, "DDPattern", "Rectangular")
+            harness.change(command, "ISPatternCount", columns)
+            harness.change(command, "ISPatternRows", rows)
+            harness.change(command, "VIPatternSpacing", 2.0)
+            harness.change(command, "VIPatternRowSpacing", 2.0)
+        else:
+            harness.configure(command, fittingType, count=columns * rows)
+        harness.fire(command, "executePreview")
+
+        adsk.reset()
+        start = time.perf_counter()
+        harness.fire(command, "execute")
+        seconds.append(time.perf_counter() - start)
+        calls = sum(adsk.calls.values())
+        features = adsk.core.Application.get()._activeProduct._timeline._count
+        harness.fire(command, "destroy")
+        addIn.pers["DDPattern"] = "None"
+    return calls, features, min(seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    addIn = harness.loadAddIn()
+    print("{} x {} fittings".format(args.columns, args.rows))
+    print("{:<24}{:>18}{:>18}{:>18}{:>18}{:>18}{:>18}".format("type", "point calls", "point timeline", "point ms", "pattern calls", "pattern timeline", "pattern ms"))
+    for fittingType in addIn.spec.FITTING_TYPES:
+        points = measure(addIn, fittingType, args.columns, args.rows, args.repeats, False)
+        pattern = measure(addIn, fittingType, args.columns, args.rows, args.repeats, True)
+        print("{:<24}{:>18}{:>18}{:>18.3f}{:>18}{:>18}{:>18.3f}".format(fittingType, points[0], points[1], points[2] * 1000, pattern[0], pattern[1], pattern[2] * 1000))
+
+
+if __name__ == "__main__":
+    main()
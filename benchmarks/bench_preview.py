@@ -0,0 +1,91 @@
+# Counts the Fusion API calls and wall time of the preview and of the build on OK, per fitting type.
+#
+# Usage: python benchmarks/bench_preview.py [--points N] [--repeats N] [--cache] [--direct] [--save FILE] [--check FILE] [--profile FILE]
+#
+# --save writes the call counts as JSON, --check compares against such a file and exits with 1
+# if any count went up, so it can gate regressions. --profile enables the add-in's stage timings
+# and writes them as JSON. --cache builds the fittings from the cached template bodies.
+# --direct builds in a direct design from sketch points alone,
+# which should neither create sketches nor extrudes or sweeps per fitting.
+
+import argparse
+import json
+import sys
+import time
+
+import harness
+
+from harness import adsk
+
+
+def measure(addIn, fittingType, eventName, points, repeats, cache=False, direct=False):
+    seconds = []
+    for _ in range(repeats):
+        harness.newDesign(adsk.fusion.DesignTypes.DirectDesignType if direct else adsk.fusion.DesignTypes.ParametricDesignType)
+        command = harness.createCommand(addIn)
+        harness.configure(command, fittingType, count=points, cache=cache, selectPlane=not direct)
+        if(eventName == "execute"):
+            harness.fire(command, "executePreview")
+
+        adsk.reset()
+        start = time.perf_counter()
+        harness.fire(command, eventName)
+        seconds.append(time.perf_counter() - start)
+        calls = dict(adsk.calls)
+        harness.fire(command, "destroy")
+    return sum(calls.values()), min(seconds), calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=1, help="fittings per command")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--cache", action="store_true", help="build from the cached template bodies")
+    parser.add_argument("--direct", action="store_true", help="build in a direct design without selecting a plane")
+    parser.add_argument("--save", help="write the call counts to this JSON file")
+    parser.add_argument("--check", help="fail if any call count exceeds the one in this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="list the calls by API member")
+    parser.add_argument("--profile", help="write the add-in's stage timings to this JSON file")
+    args = parser.parse_args()
+
+    addIn = harness.loadAddIn()
+    addIn.profiling.enabled = bool(args.profile)
+    types = addIn.spec.FITTING_TYPES
+
+    results = {}
+    print("{} fitting(s) per command".format(args.points))
+    print("{:<24}{:>14}{:>14}{:>14}{:>14}".format("type", "preview calls", "preview ms", "execute calls", "execute ms"))
+    for fittingType in types:
+        previewCalls, previewSeconds, _ = measure(addIn, fittingType, "executePreview", args.points, args.repeats, args.cache, args.direct)
+        executeCalls, executeSeconds, byMember = measure(addIn, fittingType, "execute", args.points, args.repeats, args.cache, args.direct)
+        results[fittingType] = {"executePreview": previewCalls, "execute": executeCalls}
+        print("{:<24}{:>14}{:>14.3f}{:>14}{:>14.3f}".format(fittingType, previewCalls, previewSeconds * 1000, executeCalls, executeSeconds * 1000))
+        if(args.verbose):
+            for member, count in sorted(byMember.items(), key=lambda item: -item[1]):
+                print("    {:<50}{:>8}".format(member, count))
+
+    if(args.profile):
+        addIn.profiling.dump(args.profile)
+        print(addIn.profiling.formatSummary())
+
+    if(args.save):
+        with open(args.save, "w") as f:
+            json.dump({"points": args.points, "calls": results}, f, indent=4)
+
+    if(args.check):
+        with open(args.check) as f:
+            baseline = json.load(f)["calls"]
+        regressions = [
+            "{} {}: {} > {}".format(fittingType, eventName, count, baseline[fittingType][eventName])
+            for fittingType, counts in results.items()
+            for eventName, count in counts.items()
+            if fittingType in baseline and count > baseline[fittingType].get(eventName, count)
+        ]
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        if(regressions):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
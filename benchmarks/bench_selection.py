@@ -0,0 +1,137 @@
+# Counts the API calls spent resolving the selections over repeated previews, and checks where
+# fittings on construction geometry inside nested occurrences land.
+#
+# Usage: python benchmarks/bench_selection.py [--points N] [--previews N] [--depth N]
+#
+# The fittings are placed on construction points on a construction plane of a component that sits
+# --depth occurrences deep, each one rotated, tilted and moved. Below the top level the stand-in hands
+# out occurrence proxies, whose transform2 is in world space and whose nativeObject is placed relative
+# to its parent, like Fusion does. "uncached" marks the design as changed before every preview, so every
+# selection gets resolved again like before the add-in cached them.
+#
+# The first preview of a command resolves every selection either way, only the later ones can use the cache,
+# so the times of both get printed side by side. Even cached every preview still reads the entity token of
+# each selection to look it up, the cached one saves the rest of the calls spent resolving it.
+#
+# The centers and axes of the fittings and the center of a circular pattern on a construction point of
+# the same component are compared to the ones computed without the stand-in. The benchmark fails if any
+# of them is off by more than TOLERANCE.
+
+import argparse
+import math
+import time
+
+import harness
+
+from harness import adsk
+
+
+# Entities whose members count as resolving a selection
+SELECTION_CLASSES = ("ConstructionPlane", "ConstructionPoint", "SketchPoint", "Occurrence")
+
+# Largest error of a center (in cm) or an axis tolerated
+TOLERANCE = 1e-9
+
+
+# Returns a rigid 4x4 row major matrix tilting by tilt around x, then rotating by angle around z and moving by offset
+def placement(angle, tilt, offset):
+    c, s = math.cos(angle), math.sin(angle)
+    ct, st = math.cos(tilt), math.sin(tilt)
+    return [
+        [c, -s * ct, s * st, offset[0]],
+        [s, c * ct, -c * st, offset[1]],
+        [0.0, st, ct, offset[2]],
+        [0.0, 0.0, 0.0, 1.0]
+    ]
+
+
+# Applies m to the point p, or to the direction p with w = 0
+def apply(m, p, w=1):
+    return [sum(m[i][j] * p[j] for j in range(3)) + m[i][3] * w for i in range(3)]
+
+
+# Applies the placements of the occurrences, the innermost one is placed in the one before it,
+# so the outermost gets applied last
+def toWorld(placements, p, w=1):
+    for m in reversed(placements):
+        p = apply(m, p, w)
+    return p
+
+
+# Selects construction points on the XY construction plane of a component depth occurrences deep,
+# and one more as the center of a circular pattern.
+# Returns the world positions and axis the fittings should get and the world position of the pattern center,
+# computed without the stand-in.
+def configureNested(command, fittingType, points, depth, spacing=2.0):
+    harness.configure(command, fittingType)
+    inputs = command._commandInputs
+
+    occurrence = None
+    placements = []
+    for level in range(depth):
+        m = placement(math.pi / 6 * (level + 1), math.pi / 9 * (level + 1), (3.0 * (level + 1), -1.5 * level, 0.5 * level))
+        occurrence = adsk.fusion.Occurrence(adsk.core.Matrix3D(m), occurrence)
+        placements.append(m)
+
+    origin = adsk.core.Point3D(0, 0, 0)
+    plane = adsk.core.Plane(origin, adsk.core.Vector3D(0, 0, 1), adsk.core.Vector3D(1, 0, 0), adsk.core.Vector3D(0, 1, 0))
+    columns = max(1, int(round(points ** 0.5)))
+    local = [[spacing * (i % columns), spacing * (i // columns), 0.0] for i in range(points)]
+    inputs.itemById("SIPlane")._selections = [adsk.fusion.ConstructionPlane(plane, occurrence)]
+    inputs.itemById("SIOrigin")._selections = [adsk.fusion.ConstructionPoint(adsk.core.Point3D(*p), occurrence) for p in local]
+    center = [-spacing, -spacing, 0.0]
+    inputs.itemById("SIPatternCenter")._selections = [adsk.fusion.ConstructionPoint(adsk.core.Point3D(*center), occurrence)]
+
+    origins = [toWorld(placements, p) for p in local]
+    return origins, toWorld(placements, [0.0, 0.0, 1.0], 0), toWorld(placements, center)
+
+
+def measure(addIn, fittingType, points, previews, depth, cached):
+    harness.newDesign()
+    command = harness.createCommand(addIn)
+    origins, axis, center = configureNested(command, fittingType, points, depth)
+
+    calls = []
+    seconds = []
+    for _ in range(previews):
+        if(not cached):
+            addIn.designChanged()
+        adsk.reset()
+        start = time.perf_counter()
+        harness.fire(command, "executePreview")
+        seconds.append(time.perf_counter() - start)
+        calls.append(sum(count for name, count in adsk.calls.items() if name.split(".")[0] in SELECTION_CLASSES))
+
+    inputs = command._commandInputs
+    error = 0.0
+    for transform, origin in zip(harness.call(addIn.getFittingTransforms, inputs), origins):
+        o, _, _, z = transform.getAsCoordinateSystem()
+        error = max(error, math.dist((o.x, o.y, o.z), origin), math.dist((z.x, z.y, z.z), axis))
+    planePrim = addIn.getPrimitiveFromSelection(inputs.itemById("SIPlane").selection(0).entity)
+    c = harness.call(addIn.getPatternCenter, inputs, planePrim)
+    error = max(error, math.dist((c.x, c.y, c.z), center))
+    harness.fire(command, "destroy")
+    later = max(1, previews - 1)
+    return calls[0], sum(calls[1:]) / later, seconds[0], sum(seconds[1:]) / later, error
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=20, help="selected points per command")
+    parser.add_argument("--previews", type=int, default=10, help="previews per command")
+    parser.add_argument("--depth", type=int, default=3, help="occurrences the component is nested in")
+    parser.add_argument("--type", default="Male Lock", help="fitting type")
+    args = parser.parse_args()
+
+    addIn = harness.loadAddIn()
+    print("{} points in a component {} occurrence(s) deep, {} previews".format(args.points, args.depth, args.previews))
+    print("{:<12}{:>20}{:>20}{:>18}{:>18}{:>20}".format("resolver", "first preview calls", "later preview calls", "first preview ms", "later preview ms", "placement error"))
+    for cached in [False, True]:
+        first, later, firstSeconds, laterSeconds, error = measure(addIn, args.type, args.points, args.previews, args.depth, cached)
+        print("{:<12}{:>20}{:>20.1f}{:>18.3f}{:>18.3f}{:>20.2e}".format("cached" if cached else "uncached", first, later, firstSeconds * 1000, laterSeconds * 1000, error))
+        if(error > TOLERANCE):
+            raise SystemExit("centers or axes in occurrences are off by {:.2e}".format(error))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# Simulates a long working session and tracks what the add-in keeps referenced across commands.
+#
+# Usage: python benchmarks/bench_session.py [--commands N] [--every N]
+#
+# Every command opens the dialog, previews, builds one fitting on OK and gets destroyed, like placing
+# fittings one after another. The handler counts and the memory traced by tracemalloc should stay flat.
+
+import argparse
+import gc
+import tracemalloc
+
+import harness
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commands", type=int, default=500)
+    parser.add_argument("--every", type=int, default=100, help="commands between reports")
+    args = parser.parse_args()
+
+    addIn = harness.loadAddIn()
+    harness.call(addIn.run, None)
+    tracemalloc.start()
+
+    print("{:>10}{:>10}{:>18}{:>12}{:>14}".format("commands", "handlers", "command handlers", "templates", "memory KiB"))
+    for i in range(1, args.commands + 1):
+        harness.newDesign()
+        command = harness.createCommand(addIn)
+        harness.configure(command, addIn.spec.FITTING_TYPES[i % len(addIn.spec.FITTING_TYPES)])
+        harness.fire(command, "executePreview")
+        harness.fire(command, "execute")
+        harness.fire(command, "destroy")
+
+        if(i % args.every == 0):
+            gc.collect()
+            stats = addIn.diagnostics()
+            print("{:>10}{:>10}{:>18}{:>12}{:>14.0f}".format(i, stats["handlers"], stats["commandHandlers"], stats["templates"], stats["memory"] / 1024))
+
+    harness.call(addIn.stop, None)
+    print("after stop: {}".format(addIn.diagnostics()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# Measures what loading the add-in costs when Fusion starts, against the stand-in adsk package.
+#
+# Usage: python benchmarks/bench_startup.py [--repeats N] [--save FILE] [--check FILE]
+#
+# Every repeat runs in a fresh interpreter, so module imports aren't cached between them. The stand-in
+# is imported before the clock starts, only the import of LuerFittings.py and run() are timed.
+# --save writes the API calls of run(), the modules imported and the median times as JSON.
+# --check fails if run() makes more API calls than in such a file, if the add-in imports a module of its own
+# the file doesn't list, or if any of UNLOADED gets imported. The times vary too much between runs and
+# machines to fail on, they are only printed next to the ones in the file.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import harness
+
+
+# Modules the add-in must not import before the first command runs, the add-in's own relative to its package
+# The builders are imported by the first fitting of their kind, the store by the first command.
+UNLOADED = ["json", "numpy", "luer.store", "builders.*"]
+
+
+# Runs in the fresh interpreter, prints the measurements as JSON
+# json is imported after the measurement, so the modules list shows whether the add-in imports it.
+CHILD = """
+import sys, time
+sys.path.insert(0, {benchmarks!r})
+import harness
+from harness import adsk
+
+before = set(sys.modules)
+start = time.perf_counter()
+addIn = harness.loadAddIn()
+imported = time.perf_counter()
+adsk.reset()
+harness.call(addIn.run, None)
+registered = time.perf_counter()
+modules = sorted(name for name in set(sys.modules) - before)
+
+import json
+print(json.dumps({{
+    "importMs": (imported - start) * 1000,
+    "runMs": (registered - imported) * 1000,
+    "runCalls": sum(adsk.calls.values()),
+    "modules": modules,
+}}))
+"""
+
+
+def measure():
+    child = CHILD.format(benchmarks=os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", child], capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+# Returns the modules matching one of the names in UNLOADED
+def unloaded(modules):
+    prefix = harness.PACKAGE + "."
+    found = []
+    for name in modules:
+        relative = name[len(prefix):] if name.startswith(prefix) else name
+        for pattern in UNLOADED:
+            if(relative == pattern or (pattern.endswith(".*") and relative.startswith(pattern[:-1]))):
+                found.append(name)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--save", help="write the API calls, modules and median times to this JSON file")
+    parser.add_argument("--check", help="fail if run() makes more API calls or the add-in imports more modules than in this JSON file")
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.repeats)]
+    modules = [name for name in runs[0]["modules"] if name.startswith(harness.PACKAGE)]
+    result = {
+        "runCalls": runs[0]["runCalls"],
+        "modules": modules,
+        "importMs": statistics.median(run["importMs"] for run in runs),
+        "runMs": statistics.median(run["runMs"] for run in runs),
+    }
+
+    print("import {importMs:.2f} ms, run() {runMs:.2f} ms, {runCalls} API calls (median of {repeats})".format(repeats=args.repeats, **result))
+    print("{} modules imported, {} of the add-in:".format(len(runs[0]["modules"]), len(modules)))
+    for name in modules:
+        print("    " + name)
+
+    if(args.save):
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=4)
+
+    if(args.check):
+        with open(args.check) as f:
+            baseline = json.load(f)
+        print("baseline: import {:.2f} ms, run() {:.2f} ms, not checked".format(baseline["importMs"], baseline["runMs"]))
+
+        regressions = []
+        if(result["runCalls"] > baseline["runCalls"]):
+            regressions.append("runCalls: {} > {}".format(result["runCalls"], baseline["runCalls"]))
+        for name in modules:
+            if(name not in baseline["modules"]):
+                regressions.append("module {} isn't in the baseline".format(name))
+        for name in unloaded(runs[0]["modules"]):
+            regressions.append("module {} must not be imported at startup".format(name))
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        if(regressions):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
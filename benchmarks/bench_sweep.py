@@ -0,0 +1,42 @@
+# Measures how the parallel sweep export scales with the number of worker processes.
+#
+# Usage: python benchmarks/bench_sweep.py [variants] [segments]
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from luer import sweep
+
+
+def main():
+    variants = int(sys.argv[1]) if len(sys.argv) > 1 else 48
+    segments = int(sys.argv[2]) if len(sys.argv) > 2 else 96
+
+    clearances = [round(0.01 * i, 3) for i in range(variants)]
+    jobs = sweep.sweepJobs(["Male Lock", "Female Lock"], clearances, [2.25])
+
+    cores = os.cpu_count() or 1
+    workerCounts = sorted({1, 2, 4, 8, 16, cores} & set(range(1, cores + 1)))
+
+    print("{} files, {} segments, {} cores".format(len(jobs), segments, cores))
+    print("{:>8}{:>12}{:>12}{:>10}".format("workers", "seconds", "files/s", "speedup"))
+    baseline = None
+    for workers in workerCounts:
+        directory = tempfile.mkdtemp(prefix="luer_sweep_")
+        try:
+            start = time.perf_counter()
+            sweep.runSweep(directory, jobs, "stl", segments, workers)
+            seconds = time.perf_counter() - start
+        finally:
+            shutil.rmtree(directory)
+        baseline = baseline or seconds
+        print("{:>8}{:>12.2f}{:>12.1f}{:>10.2f}".format(workers, seconds, len(jobs) / seconds, baseline / seconds))
+
+
+if __name__ == "__main__":
+    main()
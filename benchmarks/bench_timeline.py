@@ -0,0 +1,59 @@
+# Counts the timeline nodes the fittings leave in a parametric design, per way of building them.
+#
+# Usage: python benchmarks/bench_timeline.py [--points N ...]
+#
+# Fusion recomputes every node after the one that changed, a timeline group doesn't spare any of them.
+# "node per fitting" captures each fitting in one base feature, so a design with N fittings recomputes
+# about N nodes plus one combine per body and operation. "extrude" shares one sketch and one feature per
+# stage between all fittings, so its count doesn't grow with the fittings.
+
+import argparse
+
+import harness
+
+from harness import adsk
+
+
+CONSTRUCTIONS = [
+    ("extrude", {}),
+    ("cached bodies", {"cache": True}),
+    ("node per fitting", {"cache": True, "nodePerFitting": True}),
+]
+
+
+def measure(addIn, fittingType, points, cache=False, nodePerFitting=False):
+    design = harness.newDesign()
+    command = harness.createCommand(addIn)
+    harness.configure(command, fittingType, count=points, cache=cache)
+    addIn.pers["BVNodePerFitting"] = nodePerFitting
+    harness.fire(command, "executePreview")
+
+    adsk.reset()
+    harness.fire(command, "execute")
+    calls = sum(adsk.calls.values())
+    harness.fire(command, "destroy")
+    addIn.pers["BVNodePerFitting"] = False
+
+    # Sketches count as nodes as well
+    return design._timeline._count, calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, nargs="+", default=[1, 50], help="fittings per command")
+    args = parser.parse_args()
+
+    addIn = harness.loadAddIn()
+    for points in args.points:
+        print("{} fitting(s) per command, timeline nodes / execute calls".format(points))
+        print("{:<24}".format("type") + "".join("{:>24}".format(name) for name, _ in CONSTRUCTIONS))
+        for fittingType in addIn.spec.FITTING_TYPES:
+            cells = []
+            for _, options in CONSTRUCTIONS:
+                nodes, calls = measure(addIn, fittingType, points, **options)
+                cells.append("{} / {}".format(nodes, calls))
+            print("{:<24}".format(fittingType) + "".join("{:>24}".format(cell) for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# Compares the first preview after startup with an empty store, with the store of an earlier session,
+# and a warm preview within the session, per fitting type.
+#
+# Usage: python benchmarks/bench_warmstart.py [--points N]
+#
+# Every startup imports the add-in afresh and calls run(), like Fusion does when it starts.
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import harness
+
+from luer import store
+
+
+def firstPreview(fittingType, points):
+    addIn = harness.loadAddIn()
+    harness.call(addIn.run, None)
+    harness.newDesign()
+    command = harness.createCommand(addIn)
+    harness.configure(command, fittingType, count=points)
+
+    seconds = []
+    for _ in range(2):
+        start = time.perf_counter()
+        harness.fire(command, "executePreview")
+        seconds.append(time.perf_counter() - start)
+    harness.fire(command, "destroy")
+    harness.call(addIn.stop, None)
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=1, help="fittings per command")
+    args = parser.parse_args()
+
+    addIn = harness.loadAddIn()
+    print("{:<24}{:>12}{:>12}{:>12}".format("type", "cold ms", "restart ms", "warm ms"))
+    for fittingType in addIn.spec.FITTING_TYPES:
+        directory = tempfile.mkdtemp(prefix="luer_store_")
+        os.environ[store.DIRECTORY_ENV] = directory
+        try:
+            cold, warm = firstPreview(fittingType, args.points)
+            restart, _ = firstPreview(fittingType, args.points)
+        finally:
+            shutil.rmtree(directory)
+        print("{:<24}{:>12.3f}{:>12.3f}{:>12.3f}".format(fittingType, cold * 1000, restart * 1000, warm * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# Runs the add-in against the stand-in adsk package in benchmarks/standin.
+#
+# The add-in folder gets imported as the package luerAddIn, the same way Fusion imports it,
+# so the relative imports of LuerFittings.py resolve. Its store (see luer.store) goes to a temporary
+# directory unless LUER_FITTINGS_STORE is set, so runs don't depend on earlier ones.
+
+import contextlib
+import io
+import importlib
+import os
+import queue
+import sys
+import tempfile
+import types
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks", "standin"))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("LUER_FITTINGS_STORE", tempfile.mkdtemp(prefix="luer_store_"))
+
+import adsk
+import adsk.core
+import adsk.fusion
+
+PACKAGE = "luerAddIn"
+
+
+class AddInError(Exception):
+    pass
+
+
+# Imports LuerFittings.py, by default without reusing an earlier import
+def loadAddIn(fresh=True):
+    if(fresh):
+        for name in [name for name in sys.modules if name == PACKAGE or name.startswith(PACKAGE + ".")]:
+            del sys.modules[name]
+    if(PACKAGE not in sys.modules):
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [ROOT]
+        sys.modules[PACKAGE] = package
+    return importlib.import_module(PACKAGE + ".LuerFittings")
+
+
+# Replaces the active design of the stand-in application with an empty one
+def newDesign(designType=adsk.fusion.DesignTypes.ParametricDesignType):
+    app = adsk.core.Application.get()
+    app._activeProduct = adsk.fusion.Design(designType)
+    return app._activeProduct
+
+
+# Calls the add-in and raises AddInError if it printed a traceback, as the add-in catches everything itself
+def call(function, *args):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = function(*args)
+    if("Traceback" in output.getvalue()):
+        raise AddInError(output.getvalue())
+    return result
+
+
+# Opens the command dialog, running the add-in's CommandCreatedHandler
+def createCommand(addIn):
+    command = adsk.core.Command()
+    call(addIn.CommandCreatedHandler().notify, adsk.core.CommandCreatedEventArgs(command))
+    return command
+
+
+# Sets the dialog inputs, placing the fittings on a grid of sketch points on the XY plane
+# A plate below the plane covers the grid, for the fittings to join to and cut into.
+# Without selectPlane the fittings are placed on the plane of the points' sketch.
+def configure(command, fittingType, clearance=0.0, hole=0.225, count=1, spacing=2.0, cache=False, selectPlane=True):
+    design = adsk.core.Application.get()._activeProduct
+    inputs = command._commandInputs
+
+    for item in inputs.itemById("DDType")._listItems._items:
+        item._isSelected = item._name == fittingType
+    inputs.itemById("VIDiametralClearance")._value = clearance
+    inputs.itemById("VIHole")._value = hole
+    inputs.itemById("BVCache")._value = cache
+
+    plane = design._rootComponent._xYConstructionPlane
+    sketch = adsk.fusion.Sketch(design, plane, adsk.core.Matrix3D())
+    columns = max(1, int(round(count ** 0.5)))
+    rows = (count + columns - 1) // columns
+    design._rootComponent._bRepBodies._items.append(adsk.fusion.BRepBody(adsk.core.BoundingBox3D(
+        adsk.core.Point3D(-spacing / 2, -spacing / 2, -1),
+        adsk.core.Point3D(spacing * (columns - 0.5), spacing * (rows - 0.5), 0)
+    ), False))
+    inputs.itemById("SIOrigin")._selections = [
+        adsk.fusion.SketchPoint(sketch, adsk.core.Point3D(spacing * (i % columns), spacing * (i // columns), 0))
+        for i in range(count)
+    ]
+    inputs.itemById("SIPlane")._selections = [plane] if selectPlane else []
+
+
+# Sets a value input the way the user would, firing inputChanged and then executePreview
+def change(command, inputId, value):
+    input = command._commandInputs.itemById(inputId)
+    input._value = value
+    args = adsk.core.InputChangedEventArgs(command, input)
+    for handler in command._event("inputChanged")._handlers:
+        call(handler.notify, args)
+    return fire(command, "executePreview")
+
+
+# Picks an item of a dropdown input the way the user would, firing inputChanged
+def select(command, inputId, name):
+    input = command._commandInputs.itemById(inputId)
+    for item in input._listItems._items:
+        item._isSelected = item._name == name
+    args = adsk.core.InputChangedEventArgs(command, input)
+    for handler in command._event("inputChanged")._handlers:
+        call(handler.notify, args)
+
+
+# Delivers the custom events fired so far, waiting up to timeout (in s) for the first one
+# Command.doExecutePreview of the stand-in fires executePreview right away.
+def pump(command, timeout=0):
+    app = adsk.core.Application.get()
+    delivered = 0
+    while True:
+        try:
+            eventId, additionalInfo = app._pendingEvents.get(timeout=timeout if not delivered else 0)
+        except queue.Empty:
+            return delivered
+        event = app._customEvents.get(eventId)
+        for handler in (event._handlers if event else []):
+            call(handler.notify, adsk.core.CustomEventArgs(additionalInfo))
+        delivered += 1
+
+
+# Fires validateInputs, returns whether the add-in accepted the inputs
+def validate(command):
+    args = adsk.core.ValidateInputsEventArgs(command)
+    for handler in command._event("validateInputs")._handlers:
+        call(handler.notify, args)
+    return args._areInputsValid
+
+
+# Fires one of the command's events ("executePreview", "execute", "destroy", ...)
+def fire(command, eventName):
+    args = adsk.core.CommandEventArgs(command)
+    for handler in command._event(eventName)._handlers:
+        call(handler.notify, args)
+    return args
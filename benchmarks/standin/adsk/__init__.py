@@ -0,0 +1,84 @@
+# Stand-in for the adsk package of Fusion360, for benchmarking the add-in outside of Fusion.
+#
+# Only the part of the API the add-in uses is implemented, with just enough geometry to keep
+# the add-in's code paths realistic. Every public attribute access on an API object or class is
+# counted in calls, as each of them is a round-trip into Fusion in the real thing.
+
+import collections
+import itertools
+
+
+# Number of API round-trips by "Class.member"
+calls = collections.Counter()
+
+
+# Source of entity tokens, unique within a session like Fusion's
+_tokens = itertools.count(1)
+
+
+def reset():
+    calls.clear()
+
+
+def record(cls, name):
+    calls[cls.__name__ + "." + name] += 1
+
+
+class _ApiMeta(type):
+    def __getattribute__(cls, name):
+        if(not name.startswith("_")):
+            record(cls, name)
+        return type.__getattribute__(cls, name)
+
+
+# Base of all stand-in API classes
+# Implementations keep their state in underscore attributes, so they don't count their own accesses.
+class ApiObject(metaclass=_ApiMeta):
+    def __getattribute__(self, name):
+        if(not name.startswith("_")):
+            record(type(self), name)
+        return object.__getattribute__(self, name)
+
+    def __setattr__(self, name, value):
+        if(not name.startswith("_")):
+            record(type(self), name)
+        object.__setattr__(self, name, value)
+
+    @property
+    def isValid(self):
+        return not getattr(self, "_deleted", False)
+
+    @property
+    def entityToken(self):
+        if(not hasattr(self, "_entityToken")):
+            self._entityToken = "{}/{}".format(type(self).__name__, next(_tokens))
+        return self._entityToken
+
+    def deleteMe(self):
+        self._deleted = True
+        return True
+
+
+# Base of all stand-in collections, iterating counts one item call per element
+class ApiCollection(ApiObject):
+    def __init__(self, items=None):
+        self._items = list(items or [])
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def item(self, index):
+        return self._items[index]
+
+    def __getitem__(self, index):
+        record(type(self), "item")
+        return self._items[index]
+
+    def __iter__(self):
+        for item in self._items:
+            record(type(self), "item")
+            yield item
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1 @@
+# Stand-in for adsk.cam, the add-in doesn't use anything from it
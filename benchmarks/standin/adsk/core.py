@@ -0,0 +1,843 @@
+# Stand-in for adsk.core, see adsk/__init__.py
+
+import math
+import queue
+
+from . import ApiObject, ApiCollection
+
+
+class Vector3D(ApiObject):
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self._v = [x, y, z]
+
+    @staticmethod
+    def create(x=0.0, y=0.0, z=0.0):
+        return Vector3D(x, y, z)
+
+    @property
+    def x(self):
+        return self._v[0]
+
+    @property
+    def y(self):
+        return self._v[1]
+
+    @property
+    def z(self):
+        return self._v[2]
+
+    @property
+    def length(self):
+        return math.sqrt(sum(c * c for c in self._v))
+
+    def copy(self):
+        return Vector3D(*self._v)
+
+    def scaleBy(self, scale):
+        self._v = [c * scale for c in self._v]
+        return True
+
+    def normalize(self):
+        length = math.sqrt(sum(c * c for c in self._v)) or 1.0
+        self._v = [c / length for c in self._v]
+        return True
+
+    def dotProduct(self, other):
+        return sum(a * b for a, b in zip(self._v, other._v))
+
+    def crossProduct(self, other):
+        (ax, ay, az), (bx, by, bz) = self._v, other._v
+        return Vector3D(ay * bz - az * by, az * bx - ax * bz, ax * by - ay * bx)
+
+    def transformBy(self, matrix):
+        self._v = matrix._apply(self._v, 0)
+        return True
+
+
+class Point3D(ApiObject):
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self._p = [x, y, z]
+
+    @staticmethod
+    def create(x=0.0, y=0.0, z=0.0):
+        return Point3D(x, y, z)
+
+    @property
+    def x(self):
+        return self._p[0]
+
+    @property
+    def y(self):
+        return self._p[1]
+
+    @property
+    def z(self):
+        return self._p[2]
+
+    def copy(self):
+        return Point3D(*self._p)
+
+    def translateBy(self, vector):
+        self._p = [a + b for a, b in zip(self._p, vector._v)]
+        return True
+
+    def transformBy(self, matrix):
+        self._p = matrix._apply(self._p, 1)
+        return True
+
+    def vectorTo(self, other):
+        return Vector3D(*[b - a for a, b in zip(self._p, other._p)])
+
+    def distanceTo(self, other):
+        return math.sqrt(sum((b - a) ** 2 for a, b in zip(self._p, other._p)))
+
+    def isEqualTo(self, other):
+        return all(abs(a - b) < 1e-10 for a, b in zip(self._p, other._p))
+
+
+# Row major 4x4 matrix
+class Matrix3D(ApiObject):
+    def __init__(self, cells=None):
+        self._m = cells or [[1.0 if i == j else 0.0 for j in range(4)] for i in range(4)]
+
+    @staticmethod
+    def create():
+        return Matrix3D()
+
+    def copy(self):
+        return Matrix3D([row[:] for row in self._m])
+
+    def _apply(self, v, w):
+        return [sum(self._m[i][j] * c for j, c in enumerate(v)) + self._m[i][3] * w for i in range(3)]
+
+    def setWithCoordinateSystem(self, origin, xAxis, yAxis, zAxis):
+        m = [[0.0] * 4 for _ in range(4)]
+        for i in range(3):
+            m[i][0], m[i][1], m[i][2], m[i][3] = xAxis._v[i], yAxis._v[i], zAxis._v[i], origin._p[i]
+        m[3][3] = 1.0
+        self._m = m
+        return True
+
+    def getAsCoordinateSystem(self):
+        m = self._m
+        return (
+            Point3D(m[0][3], m[1][3], m[2][3]),
+            Vector3D(m[0][0], m[1][0], m[2][0]),
+            Vector3D(m[0][1], m[1][1], m[2][1]),
+            Vector3D(m[0][2], m[1][2], m[2][2])
+        )
+
+    # Rigid transforms only, which is all the add-in produces
+    def invert(self):
+        m = self._m
+        r = [[m[j][i] for j in range(3)] for i in range(3)]
+        t = [-sum(r[i][j] * m[j][3] for j in range(3)) for i in range(3)]
+        self._m = [r[0] + [t[0]], r[1] + [t[1]], r[2] + [t[2]], [0.0, 0.0, 0.0, 1.0]]
+        return True
+
+    # self = matrix * self, like Fusion
+    def transformBy(self, matrix):
+        a, b = matrix._m, self._m
+        self._m = [[sum(a[i][k] * b[k][j] for k in range(4)) for j in range(4)] for i in range(4)]
+        return True
+
+
+class BoundingBox3D(ApiObject):
+    def __init__(self, minPoint, maxPoint):
+        self._minPoint = minPoint
+        self._maxPoint = maxPoint
+
+    @staticmethod
+    def create(minPoint, maxPoint):
+        return BoundingBox3D(minPoint.copy(), maxPoint.copy())
+
+    @property
+    def minPoint(self):
+        return self._minPoint
+
+    @property
+    def maxPoint(self):
+        return self._maxPoint
+
+    def copy(self):
+        return BoundingBox3D(self._minPoint.copy(), self._maxPoint.copy())
+
+    def intersects(self, other):
+        return all(
+            a0 <= b1 and b0 <= a1
+            for a0, a1, b0, b1 in zip(self._minPoint._p, self._maxPoint._p, other._minPoint._p, other._maxPoint._p)
+        )
+
+    def contains(self, point):
+        return self._contains(point)
+
+    def _contains(self, point):
+        return all(a <= p <= b for p, a, b in zip(point._p, self._minPoint._p, self._maxPoint._p))
+
+    def _unite(self, other):
+        self._minPoint = Point3D(*map(min, self._minPoint._p, other._minPoint._p))
+        self._maxPoint = Point3D(*map(max, self._maxPoint._p, other._maxPoint._p))
+
+    # Box around the transformed corners
+    def _transformed(self, matrix):
+        corners = [
+            matrix._apply([x, y, z], 1)
+            for x in (self._minPoint._p[0], self._maxPoint._p[0])
+            for y in (self._minPoint._p[1], self._maxPoint._p[1])
+            for z in (self._minPoint._p[2], self._maxPoint._p[2])
+        ]
+        return BoundingBox3D(Point3D(*map(min, *corners)), Point3D(*map(max, *corners)))
+
+
+class Plane(ApiObject):
+    def __init__(self, origin, normal, uDirection=None, vDirection=None):
+        self._origin = origin
+        self._normal = normal
+        if(uDirection is None):
+            helper = Vector3D(1, 0, 0) if abs(normal._v[0]) < 0.9 else Vector3D(0, 1, 0)
+            vDirection = normal.crossProduct(helper)
+            vDirection.normalize()
+            uDirection = vDirection.crossProduct(normal)
+        self._u = uDirection
+        self._v = vDirection
+
+    @staticmethod
+    def create(origin, normal):
+        return Plane(origin, normal)
+
+    @staticmethod
+    def createUsingDirections(origin, uDirection, vDirection):
+        return Plane(origin, uDirection.crossProduct(vDirection), uDirection, vDirection)
+
+    @property
+    def origin(self):
+        return self._origin
+
+    @property
+    def normal(self):
+        return self._normal
+
+    @property
+    def uDirection(self):
+        return self._u
+
+    @property
+    def vDirection(self):
+        return self._v
+
+    def copy(self):
+        return Plane(self._origin.copy(), self._normal.copy(), self._u.copy(), self._v.copy())
+
+    def transformBy(self, matrix):
+        for vector in (self._normal, self._u, self._v):
+            vector._v = matrix._apply(vector._v, 0)
+        self._origin._p = matrix._apply(self._origin._p, 1)
+        return True
+
+
+class Circle3D(ApiObject):
+    objectType = "adsk::core::Circle3D"
+
+    def __init__(self, center, radius):
+        self._center = center
+        self._radius = radius
+
+    @property
+    def center(self):
+        return self._center
+
+    @property
+    def radius(self):
+        return self._radius
+
+
+class Arc3D(Circle3D):
+    objectType = "adsk::core::Arc3D"
+
+
+class Line3D(ApiObject):
+    objectType = "adsk::core::Line3D"
+
+    def __init__(self, startPoint, endPoint):
+        self._startPoint = startPoint
+        self._endPoint = endPoint
+
+    @property
+    def startPoint(self):
+        return self._startPoint
+
+    @property
+    def endPoint(self):
+        return self._endPoint
+
+
+class ObjectCollection(ApiCollection):
+    @staticmethod
+    def create():
+        return ObjectCollection()
+
+    def add(self, item):
+        self._items.append(item)
+        return True
+
+
+class ValueInput(ApiObject):
+    def __init__(self, value):
+        self._value = value
+
+    @staticmethod
+    def createByReal(value):
+        return ValueInput(value)
+
+    @staticmethod
+    def createByString(value):
+        return ValueInput(value)
+
+
+class Color(ApiObject):
+    @staticmethod
+    def create(red, green, blue, opacity):
+        return Color()
+
+
+# Events and their handlers
+
+class Event(ApiObject):
+    def __init__(self):
+        self._handlers = []
+
+    def add(self, handler):
+        self._handlers.append(handler)
+        return True
+
+    def remove(self, handler):
+        self._handlers.remove(handler)
+        return True
+
+
+class CommandCreatedEventHandler:
+    def __init__(self):
+        pass
+
+
+class CommandEventHandler:
+    def __init__(self):
+        pass
+
+
+class InputChangedEventHandler:
+    def __init__(self):
+        pass
+
+
+class ValidateInputsEventHandler:
+    def __init__(self):
+        pass
+
+
+class CustomEventHandler:
+    def __init__(self):
+        pass
+
+
+class CommandCreatedEventArgs(ApiObject):
+    def __init__(self, command):
+        self._command = command
+
+    @property
+    def command(self):
+        return self._command
+
+
+class InputChangedEventArgs(ApiObject):
+    def __init__(self, command, input):
+        self._command = command
+        self._input = input
+
+    @property
+    def input(self):
+        return self._input
+
+    @property
+    def inputs(self):
+        return self._command._commandInputs
+
+
+class ValidateInputsEventArgs(ApiObject):
+    def __init__(self, command):
+        self._command = command
+        self._areInputsValid = True
+
+    @property
+    def inputs(self):
+        return self._command._commandInputs
+
+    @property
+    def areInputsValid(self):
+        return self._areInputsValid
+
+    @areInputsValid.setter
+    def areInputsValid(self, value):
+        self._areInputsValid = value
+
+
+class CustomEventArgs(ApiObject):
+    def __init__(self, additionalInfo):
+        self._additionalInfo = additionalInfo
+
+    @property
+    def additionalInfo(self):
+        return self._additionalInfo
+
+
+class CommandEventArgs(ApiObject):
+    def __init__(self, command):
+        self._command = command
+        self._isValidResult = False
+
+    @staticmethod
+    def cast(args):
+        return args
+
+    @property
+    def command(self):
+        return self._command
+
+    @property
+    def isValidResult(self):
+        return self._isValidResult
+
+    @isValidResult.setter
+    def isValidResult(self, value):
+        self._isValidResult = value
+
+
+# Command inputs
+
+class ListItem(ApiObject):
+    def __init__(self, name, isSelected, listItems=None):
+        self._name = name
+        self._isSelected = isSelected
+        self._listItems = listItems
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def isSelected(self):
+        return self._isSelected
+
+    # Like a single selection dropdown, selecting an item deselects the others
+    @isSelected.setter
+    def isSelected(self, value):
+        if(value and self._listItems):
+            for item in self._listItems._items:
+                item._isSelected = False
+        self._isSelected = value
+
+    def deleteMe(self):
+        if(self._listItems):
+            self._listItems._items.remove(self)
+        return True
+
+
+class ListItems(ApiCollection):
+    def add(self, name, isSelected, resourceFolder=""):
+        item = ListItem(name, isSelected, self)
+        self._items.append(item)
+        return item
+
+
+class CommandInput(ApiObject):
+    def __init__(self, id, name):
+        self._id = id
+        self._name = name
+        self._isVisible = True
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def isVisible(self):
+        return self._isVisible
+
+    @isVisible.setter
+    def isVisible(self, value):
+        self._isVisible = value
+
+
+class Selection(ApiObject):
+    def __init__(self, entity):
+        self._entity = entity
+
+    @property
+    def entity(self):
+        return self._entity
+
+
+class SelectionCommandInput(CommandInput):
+    def __init__(self, id, name):
+        super().__init__(id, name)
+        self._selections = []
+
+    def addSelectionFilter(self, filter):
+        return True
+
+    def setSelectionLimits(self, minimum, maximum=0):
+        return True
+
+    @property
+    def selectionCount(self):
+        return len(self._selections)
+
+    def selection(self, index):
+        return Selection(self._selections[index])
+
+
+class DropDownCommandInput(CommandInput):
+    def __init__(self, id, name):
+        super().__init__(id, name)
+        self._listItems = ListItems()
+
+    @property
+    def listItems(self):
+        return self._listItems
+
+    @property
+    def selectedItem(self):
+        for item in self._listItems._items:
+            if(item._isSelected):
+                return item
+        return None
+
+
+class ValueCommandInput(CommandInput):
+    def __init__(self, id, name, value):
+        super().__init__(id, name)
+        self._value = value
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+
+
+class BoolValueCommandInput(ValueCommandInput):
+    pass
+
+
+class IntegerSpinnerCommandInput(ValueCommandInput):
+    pass
+
+
+class StringValueCommandInput(ValueCommandInput):
+    pass
+
+
+class TextBoxCommandInput(CommandInput):
+    def __init__(self, id, name, text):
+        super().__init__(id, name)
+        self._text = text
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        self._text = value
+
+    @property
+    def formattedText(self):
+        return self._text
+
+    @formattedText.setter
+    def formattedText(self, value):
+        self._text = value
+
+
+class CommandInputs(ApiCollection):
+    def itemById(self, id):
+        for item in self._items:
+            if(item._id == id):
+                return item
+        return None
+
+    def _add(self, item):
+        self._items.append(item)
+        return item
+
+    def addSelectionInput(self, id, name, commandPrompt):
+        return self._add(SelectionCommandInput(id, name))
+
+    def addDropDownCommandInput(self, id, name, dropDownStyle):
+        return self._add(DropDownCommandInput(id, name))
+
+    def addValueInput(self, id, name, unitType, initialValue):
+        return self._add(ValueCommandInput(id, name, initialValue._value))
+
+    def addBoolValueInput(self, id, name, isCheckBox, resourceFolder="", initialValue=False):
+        return self._add(BoolValueCommandInput(id, name, initialValue))
+
+    def addIntegerSpinnerCommandInput(self, id, name, minimum, maximum, spinStep, initialValue):
+        return self._add(IntegerSpinnerCommandInput(id, name, initialValue))
+
+    def addStringValueInput(self, id, name, initialValue=""):
+        return self._add(StringValueCommandInput(id, name, initialValue))
+
+    def addTextBoxCommandInput(self, id, name, formattedText, numRows, isReadOnly):
+        return self._add(TextBoxCommandInput(id, name, formattedText))
+
+
+class Command(ApiObject):
+    def __init__(self):
+        self._commandInputs = CommandInputs()
+        self._events = {}
+
+    @staticmethod
+    def cast(command):
+        return command
+
+    @property
+    def commandInputs(self):
+        return self._commandInputs
+
+    def _event(self, name):
+        return self._events.setdefault(name, Event())
+
+    @property
+    def executePreview(self):
+        return self._event("executePreview")
+
+    @property
+    def execute(self):
+        return self._event("execute")
+
+    @property
+    def destroy(self):
+        return self._event("destroy")
+
+    @property
+    def inputChanged(self):
+        return self._event("inputChanged")
+
+    @property
+    def validateInputs(self):
+        return self._event("validateInputs")
+
+    def doExecutePreview(self):
+        args = CommandEventArgs(self)
+        for handler in self._event("executePreview")._handlers:
+            handler.notify(args)
+        return True
+
+
+# Application and user interface
+
+class Camera(ApiObject):
+    def __init__(self, viewExtents):
+        self._viewExtents = viewExtents
+
+    @property
+    def viewExtents(self):
+        return self._viewExtents
+
+
+# A viewport 1000 pixels high, showing 10 cm across, so a pixel is 0.01 cm at the camera's target
+class Viewport(ApiObject):
+    def __init__(self):
+        self._camera = Camera(5.0)
+        self._height = 1000
+
+    @property
+    def camera(self):
+        return self._camera
+
+    @property
+    def height(self):
+        return self._height
+
+    def refresh(self):
+        return True
+
+
+class CommandDefinition(ApiObject):
+    def __init__(self, id):
+        self._id = id
+        self._commandCreated = Event()
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def commandCreated(self):
+        return self._commandCreated
+
+
+class CommandDefinitions(ApiCollection):
+    def itemById(self, id):
+        for item in self._items:
+            if(item._id == id and not getattr(item, "_deleted", False)):
+                return item
+        return None
+
+    def addButtonDefinition(self, id, name, tooltip, resourceFolder=""):
+        definition = CommandDefinition(id)
+        self._items.append(definition)
+        return definition
+
+
+class CommandControl(ApiObject):
+    def __init__(self, id):
+        self._id = id
+
+
+class ToolbarControls(ApiCollection):
+    def addCommand(self, commandDefinition, positionID="", isBefore=True):
+        control = CommandControl(commandDefinition._id)
+        self._items.append(control)
+        return control
+
+    def itemById(self, id):
+        for item in self._items:
+            if(item._id == id and not getattr(item, "_deleted", False)):
+                return item
+        return None
+
+
+class ToolbarPanel(ApiObject):
+    def __init__(self):
+        self._controls = ToolbarControls()
+
+    @property
+    def controls(self):
+        return self._controls
+
+
+class ToolbarPanels(ApiCollection):
+    def __init__(self):
+        super().__init__()
+        self._panels = {}
+
+    def itemById(self, id):
+        return self._panels.setdefault(id, ToolbarPanel())
+
+
+class ProgressDialog(ApiObject):
+    def __init__(self):
+        self._isShowing = False
+        self._isCancelButtonShown = True
+        self._wasCancelled = False
+        self._progressValue = 0
+        self._maximumValue = 0
+
+    def show(self, title, message, minimumValue, maximumValue, delay=0):
+        self._isShowing = True
+        self._maximumValue = maximumValue
+        return True
+
+    def hide(self):
+        self._isShowing = False
+        return True
+
+    @property
+    def isShowing(self):
+        return self._isShowing
+
+    @property
+    def isCancelButtonShown(self):
+        return self._isCancelButtonShown
+
+    @isCancelButtonShown.setter
+    def isCancelButtonShown(self, value):
+        self._isCancelButtonShown = value
+
+    @property
+    def wasCancelled(self):
+        return self._wasCancelled
+
+    @property
+    def progressValue(self):
+        return self._progressValue
+
+    @progressValue.setter
+    def progressValue(self, value):
+        self._progressValue = value
+
+    @property
+    def maximumValue(self):
+        return self._maximumValue
+
+
+class UserInterface(ApiObject):
+    def __init__(self):
+        self._commandDefinitions = CommandDefinitions()
+        self._allToolbarPanels = ToolbarPanels()
+
+    @property
+    def commandDefinitions(self):
+        return self._commandDefinitions
+
+    @property
+    def allToolbarPanels(self):
+        return self._allToolbarPanels
+
+    def messageBox(self, text, title="", buttons=0, icon=0):
+        return 0
+
+    def createProgressDialog(self):
+        return ProgressDialog()
+
+
+class Application(ApiObject):
+    _instance = None
+
+    def __init__(self):
+        self._activeProduct = None
+        self._userInterface = UserInterface()
+        self._activeViewport = Viewport()
+        self._log = []
+        self._customEvents = {}
+        # Fired custom events waiting to be delivered on the main thread, see harness.pump
+        self._pendingEvents = queue.Queue()
+
+    @staticmethod
+    def get():
+        if(Application._instance is None):
+            Application._instance = Application()
+        return Application._instance
+
+    @property
+    def activeProduct(self):
+        return self._activeProduct
+
+    @property
+    def userInterface(self):
+        return self._userInterface
+
+    @property
+    def activeViewport(self):
+        return self._activeViewport
+
+    def registerCustomEvent(self, eventId):
+        return self._customEvents.setdefault(eventId, Event())
+
+    def unregisterCustomEvent(self, eventId):
+        return self._customEvents.pop(eventId, None) is not None
+
+    # Can be called from any thread, like in Fusion the handlers run later on the main thread
+    def fireCustomEvent(self, eventId, additionalInfo=""):
+        if(eventId not in self._customEvents):
+            return False
+        self._pendingEvents.put((eventId, additionalInfo))
+        return True
+
+    # Text Commands palette
+    def log(self, message, level=0, type=0):
+        self._log.append(message)
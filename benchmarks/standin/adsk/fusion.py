@@ -0,0 +1,1231 @@
+# Stand-in for adsk.fusion, see adsk/__init__.py
+
+import math
+import time
+
+from . import ApiObject, ApiCollection
+from .core import Arc3D, BoundingBox3D, Circle3D, Line3D, Matrix3D, Plane, Point3D, Vector3D
+
+
+class DesignTypes:
+    DirectDesignType = 0
+    ParametricDesignType = 1
+
+
+class FeatureOperations:
+    JoinFeatureOperation = 0
+    CutFeatureOperation = 1
+    IntersectFeatureOperation = 2
+    NewBodyFeatureOperation = 3
+    NewComponentFeatureOperation = 4
+
+
+class PointContainment:
+    PointInsidePointContainment = 0
+    PointOnPointContainment = 1
+    PointOutsidePointContainment = 2
+    UnknownPointContainment = 3
+
+
+class BooleanTypes:
+    DifferenceBooleanType = 0
+    IntersectionBooleanType = 1
+    UnionBooleanType = 2
+
+
+class PatternDistanceType:
+    ExtentPatternDistanceType = 0
+    SpacingPatternDistanceType = 1
+
+
+# Timeline
+
+class TimelineObject(ApiObject):
+    def __init__(self, index):
+        self._index = index
+
+    @property
+    def index(self):
+        return self._index
+
+
+class TimelineGroups(ApiCollection):
+    def add(self, startIndex, endIndex):
+        group = TimelineObject(startIndex)
+        self._items.append(group)
+        return group
+
+
+class Timeline(ApiObject):
+    def __init__(self):
+        self._count = 0
+        self._timelineGroups = TimelineGroups()
+
+    def _append(self):
+        self._count += 1
+        return TimelineObject(self._count - 1)
+
+    def _remove(self):
+        self._count -= 1
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def markerPosition(self):
+        return self._count
+
+    @property
+    def timelineGroups(self):
+        return self._timelineGroups
+
+
+# Parameters
+# Expressions aren't evaluated, a parameter keeps the value it was created with.
+
+class ModelParameter(ApiObject):
+    objectType = "adsk::fusion::ModelParameter"
+
+    def __init__(self, value, expression=None):
+        self._value = value
+        self._expression = expression
+
+    @property
+    def value(self):
+        return self._value
+
+    @property
+    def expression(self):
+        return self._expression
+
+    @expression.setter
+    def expression(self, value):
+        self._expression = value
+
+
+class UserParameter(ModelParameter):
+    objectType = "adsk::fusion::UserParameter"
+
+    def __init__(self, name, expression, unit, comment):
+        super().__init__(None, expression)
+        self._name = name
+        self._unit = unit
+        self._comment = comment
+
+    @property
+    def name(self):
+        return self._name
+
+
+class UserParameters(ApiCollection):
+    def add(self, name, value, units, comment):
+        parameter = UserParameter(name, value._value, units, comment)
+        self._items.append(parameter)
+        return parameter
+
+    def itemByName(self, name):
+        for parameter in self._items:
+            if(parameter._name == name):
+                return parameter
+        return None
+
+
+# Entities that can be selected
+
+# Occurrences are placed by _transform relative to the component they're in, the one of their
+# assemblyContext or the root. Occurrences with an assemblyContext are proxies like Fusion returns them
+# for nested occurrences: their transform2 is composed into world space, their nativeObject is the
+# occurrence in its parent component, whose transform2 is relative to that component.
+class Occurrence(ApiObject):
+    objectType = "adsk::fusion::Occurrence"
+
+    def __init__(self, transform, assemblyContext=None, component=None):
+        self._transform = transform
+        self._assemblyContext = assemblyContext
+        self._component = component
+        self._native = None
+
+    @property
+    def transform2(self):
+        transform = self._transform.copy()
+        occurrence = self._assemblyContext
+        while(occurrence):
+            a, b = occurrence._transform._m, transform._m
+            transform._m = [[sum(a[i][k] * b[k][j] for k in range(4)) for j in range(4)] for i in range(4)]
+            occurrence = occurrence._assemblyContext
+        return transform
+
+    @property
+    def assemblyContext(self):
+        return self._assemblyContext
+
+    @property
+    def nativeObject(self):
+        if(self._assemblyContext is None):
+            return None
+        if(self._native is None):
+            self._native = Occurrence(self._transform, None, self._component)
+        return self._native
+
+
+class ConstructionPlane(ApiObject):
+    objectType = "adsk::fusion::ConstructionPlane"
+
+    def __init__(self, plane, assemblyContext=None):
+        self._geometry = plane
+        self._assemblyContext = assemblyContext
+        self._timelineObject = None
+
+    @property
+    def timelineObject(self):
+        return self._timelineObject
+
+    @property
+    def geometry(self):
+        return self._geometry
+
+    @property
+    def assemblyContext(self):
+        return self._assemblyContext
+
+
+class ConstructionPoint(ApiObject):
+    objectType = "adsk::fusion::ConstructionPoint"
+
+    def __init__(self, point, assemblyContext=None):
+        self._geometry = point
+        self._assemblyContext = assemblyContext
+
+    @property
+    def geometry(self):
+        return self._geometry
+
+    @property
+    def assemblyContext(self):
+        return self._assemblyContext
+
+
+class SketchPoint(ApiObject):
+    objectType = "adsk::fusion::SketchPoint"
+
+    def __init__(self, sketch, point):
+        self._sketch = sketch
+        self._geometry = point
+        self._isFixed = False
+
+    @property
+    def isFixed(self):
+        return self._isFixed
+
+    @isFixed.setter
+    def isFixed(self, value):
+        self._isFixed = value
+
+    @property
+    def geometry(self):
+        return self._geometry
+
+    @property
+    def worldGeometry(self):
+        point = self._geometry.copy()
+        point._p = self._sketch._transform._apply(point._p, 1)
+        return point
+
+    @property
+    def parentSketch(self):
+        return self._sketch
+
+
+# Sketches
+
+class SketchCircle(ApiObject):
+    objectType = "adsk::fusion::SketchCircle"
+
+    def __init__(self, sketch, center, radius):
+        self._geometry = Circle3D(center, radius)
+        self._centerSketchPoint = SketchPoint(sketch, center)
+
+    @property
+    def geometry(self):
+        return self._geometry
+
+    @property
+    def radius(self):
+        return self._geometry._radius
+
+    @property
+    def centerSketchPoint(self):
+        return self._centerSketchPoint
+
+
+class SketchArc(ApiObject):
+    objectType = "adsk::fusion::SketchArc"
+
+    def __init__(self, sketch, center, start, sweep):
+        cx, cy, cz = center._p
+        sx, sy, sz = start._p
+        radius = math.hypot(sx - cx, sy - cy)
+        angle = math.atan2(sy - cy, sx - cx) + sweep
+        self._geometry = Arc3D(center, radius)
+        self._startSketchPoint = SketchPoint(sketch, Point3D(sx, sy, sz))
+        self._endSketchPoint = SketchPoint(sketch, Point3D(cx + radius * math.cos(angle), cy + radius * math.sin(angle), cz))
+
+    @property
+    def geometry(self):
+        return self._geometry
+
+    @property
+    def startSketchPoint(self):
+        return self._startSketchPoint
+
+    @property
+    def endSketchPoint(self):
+        return self._endSketchPoint
+
+
+class SketchLine(ApiObject):
+    objectType = "adsk::fusion::SketchLine"
+
+    def __init__(self, sketch, start, end):
+        self._startSketchPoint = start if isinstance(start, SketchPoint) else SketchPoint(sketch, start.copy())
+        self._endSketchPoint = end if isinstance(end, SketchPoint) else SketchPoint(sketch, end.copy())
+        self._isConstruction = False
+
+    @property
+    def isConstruction(self):
+        return self._isConstruction
+
+    @isConstruction.setter
+    def isConstruction(self, value):
+        self._isConstruction = value
+
+    @property
+    def geometry(self):
+        return Line3D(self._startSketchPoint._geometry.copy(), self._endSketchPoint._geometry.copy())
+
+    @property
+    def startSketchPoint(self):
+        return self._startSketchPoint
+
+    @property
+    def endSketchPoint(self):
+        return self._endSketchPoint
+
+
+def _point(pointOrSketchPoint):
+    if(isinstance(pointOrSketchPoint, SketchPoint)):
+        return pointOrSketchPoint._geometry
+    return pointOrSketchPoint
+
+
+class SketchCircles(ApiCollection):
+    def __init__(self, sketch):
+        super().__init__()
+        self._sketch = sketch
+
+    def addByCenterRadius(self, center, radius):
+        circle = SketchCircle(self._sketch, _point(center).copy(), radius)
+        self._items.append(circle)
+        self._sketch._profiles = None
+        return circle
+
+
+class SketchArcs(ApiCollection):
+    def __init__(self, sketch):
+        super().__init__()
+        self._sketch = sketch
+
+    def addByCenterStartSweep(self, center, start, sweep):
+        arc = SketchArc(self._sketch, _point(center).copy(), _point(start), sweep)
+        self._items.append(arc)
+        self._sketch._profiles = None
+        return arc
+
+
+class SketchLines(ApiCollection):
+    def __init__(self, sketch):
+        super().__init__()
+        self._sketch = sketch
+
+    def addByTwoPoints(self, start, end):
+        line = SketchLine(self._sketch, start, end)
+        self._items.append(line)
+        self._sketch._profiles = None
+        return line
+
+
+class SketchPoints(ApiCollection):
+    def __init__(self, sketch):
+        super().__init__()
+        self._sketch = sketch
+
+    def add(self, point):
+        sketchPoint = SketchPoint(self._sketch, point.copy())
+        self._items.append(sketchPoint)
+        return sketchPoint
+
+
+class SketchCurves(ApiObject):
+    def __init__(self, sketch):
+        self._sketchCircles = SketchCircles(sketch)
+        self._sketchArcs = SketchArcs(sketch)
+        self._sketchLines = SketchLines(sketch)
+
+    @property
+    def sketchCircles(self):
+        return self._sketchCircles
+
+    @property
+    def sketchArcs(self):
+        return self._sketchArcs
+
+    @property
+    def sketchLines(self):
+        return self._sketchLines
+
+
+class SketchDiameterDimension(ApiObject):
+    objectType = "adsk::fusion::SketchDiameterDimension"
+
+    def __init__(self, entity, textPoint):
+        self._entity = entity
+        self._parameter = ModelParameter(2 * entity._geometry._radius)
+
+    @property
+    def parameter(self):
+        return self._parameter
+
+
+class SketchDimensions(ApiCollection):
+    def addDiameterDimension(self, entity, textPoint, isDriving=True):
+        dimension = SketchDiameterDimension(entity, textPoint)
+        self._items.append(dimension)
+        return dimension
+
+
+class ProfileCurve(ApiObject):
+    def __init__(self, geometry, sketchEntity):
+        self._geometry = geometry
+        self._sketchEntity = sketchEntity
+
+    @property
+    def geometry(self):
+        return self._geometry
+
+    @property
+    def sketchEntity(self):
+        return self._sketchEntity
+
+
+class ProfileCurves(ApiCollection):
+    pass
+
+
+class ProfileLoop(ApiObject):
+    def __init__(self, isOuter, curves):
+        self._isOuter = isOuter
+        self._profileCurves = ProfileCurves(curves)
+
+    @property
+    def isOuter(self):
+        return self._isOuter
+
+    @property
+    def profileCurves(self):
+        return self._profileCurves
+
+
+class ProfileLoops(ApiCollection):
+    pass
+
+
+class Profile(ApiObject):
+    objectType = "adsk::fusion::Profile"
+
+    def __init__(self, sketch, loops):
+        self._sketch = sketch
+        self._profileLoops = ProfileLoops(loops)
+
+    @property
+    def profileLoops(self):
+        return self._profileLoops
+
+    @property
+    def parentSketch(self):
+        return self._sketch
+
+
+class Profiles(ApiCollection):
+    pass
+
+
+class Sketch(ApiObject):
+    objectType = "adsk::fusion::Sketch"
+
+    def __init__(self, design, plane, transform):
+        self._design = design
+        self._referencePlane = plane
+        self._transform = transform
+        self._sketchCurves = SketchCurves(self)
+        self._sketchPoints = SketchPoints(self)
+        self._sketchDimensions = SketchDimensions()
+        self._isComputeDeferred = False
+        self._profiles = None
+        self._timelineObject = None
+
+    @property
+    def timelineObject(self):
+        return self._timelineObject
+
+    def deleteMe(self):
+        if(self._timelineObject):
+            self._design._timeline._remove()
+        return super().deleteMe()
+
+    @property
+    def transform(self):
+        return self._transform
+
+    @property
+    def referencePlane(self):
+        return self._referencePlane
+
+    @property
+    def sketchCurves(self):
+        return self._sketchCurves
+
+    @property
+    def sketchPoints(self):
+        return self._sketchPoints
+
+    @property
+    def sketchDimensions(self):
+        return self._sketchDimensions
+
+    @property
+    def isComputeDeferred(self):
+        return self._isComputeDeferred
+
+    @isComputeDeferred.setter
+    def isComputeDeferred(self, value):
+        self._isComputeDeferred = value
+
+    def modelToSketchSpace(self, modelCoordinate):
+        transform = self._transform.copy()
+        transform.invert()
+        point = modelCoordinate.copy()
+        point._p = transform._apply(point._p, 1)
+        return point
+
+    @property
+    def profiles(self):
+        if(self._profiles is None):
+            self._profiles = Profiles(self._computeProfiles())
+        return self._profiles
+
+    # Builds the regions of concentric circles, plus the thread wings drawn around them.
+    # Arcs centered on a circle center are the outer arcs of a thread wing, their radius tells
+    # which circle the wings attach to, see addThreadSection in the add-in.
+    def _computeProfiles(self):
+        def key(point):
+            return tuple(round(c, 7) for c in point._p)
+
+        centers = {}
+        for circle in self._sketchCurves._sketchCircles._items:
+            centers.setdefault(key(circle._geometry._center), []).append(circle)
+
+        wingArcs = {}
+        for arc in self._sketchCurves._sketchArcs._items:
+            k = key(arc._geometry._center)
+            if(k in centers):
+                wingArcs.setdefault(k, []).append(arc)
+
+        profiles = []
+        for k, circles in centers.items():
+            circles = sorted(circles, key=lambda c: c._geometry._radius)
+
+            def loop(circle, isOuter):
+                return ProfileLoop(isOuter, [ProfileCurve(circle._geometry, circle)])
+
+            # Wings inside a tube split the region below the tube, wings outside only touch the outermost circle
+            ring = None
+            if(k in wingArcs):
+                radius = wingArcs[k][0]._geometry._radius
+                inside = [c for c in circles if c._geometry._radius > radius]
+                ring = inside[0] if inside else None
+
+            profiles.append(Profile(self, [loop(circles[0], True)]))
+            for inner, outer in zip(circles, circles[1:]):
+                if(outer is ring):
+                    # The wings cut into the outer circle of this region
+                    arc = wingArcs[k][0]
+                    curves = [ProfileCurve(outer._geometry, outer), ProfileCurve(arc._geometry, arc)]
+                    profiles.append(Profile(self, [ProfileLoop(True, curves), loop(inner, False)]))
+                else:
+                    profiles.append(Profile(self, [loop(outer, True), loop(inner, False)]))
+
+            for arc in wingArcs.get(k, []):
+                flank = Arc3D(arc._geometry._center, arc._geometry._radius / 2)
+                curves = [ProfileCurve(arc._geometry, arc), ProfileCurve(flank, arc)]
+                profiles.append(Profile(self, [ProfileLoop(True, curves)]))
+
+        # Closed chains of lines, like the half-sections of the add-in, each make one profile
+        chain = []
+        for line in self._sketchCurves._sketchLines._items:
+            if(chain and line._startSketchPoint is not chain[-1]._endSketchPoint):
+                chain = []
+            chain.append(line)
+            if(len(chain) > 2 and line._endSketchPoint is chain[0]._startSketchPoint):
+                curves = [ProfileCurve(line.geometry, line) for line in chain]
+                profiles.append(Profile(self, [ProfileLoop(True, curves)]))
+                chain = []
+
+        return profiles
+
+
+class ConstructionPlaneInput(ApiObject):
+    def setByThreePoints(self, pointEntityOne, pointEntityTwo, pointEntityThree):
+        self._points = [point.worldGeometry for point in (pointEntityOne, pointEntityTwo, pointEntityThree)]
+        return True
+
+
+class ConstructionPlanes(ApiCollection):
+    def __init__(self, design):
+        super().__init__()
+        self._design = design
+
+    def createInput(self, occurrenceForCreation=None):
+        return ConstructionPlaneInput()
+
+    def add(self, input):
+        origin, second, third = input._points
+        u = origin.vectorTo(second)
+        u.normalize()
+        v = origin.vectorTo(third)
+        normal = u.crossProduct(v)
+        normal.normalize()
+        plane = ConstructionPlane(Plane(origin, normal, u, normal.crossProduct(u)))
+        plane._timelineObject = self._design._timeline._append()
+        self._items.append(plane)
+        return plane
+
+
+class Sketches(ApiCollection):
+    def __init__(self, design):
+        super().__init__()
+        self._design = design
+
+    def addWithoutEdges(self, planarEntity):
+        return self._add(planarEntity)
+
+    def add(self, planarEntity, occurrenceForCreation=None):
+        return self._add(planarEntity)
+
+    def _add(self, planarEntity):
+        plane = planarEntity._geometry if isinstance(planarEntity, ConstructionPlane) else planarEntity
+        transform = Matrix3D()
+        transform.setWithCoordinateSystem(plane._origin, plane._u, plane._v, plane._normal)
+        # Sketches on planes in an assembly context are placed in world space
+        occurrence = getattr(planarEntity, "_assemblyContext", None)
+        while(occurrence):
+            a, b = occurrence._transform._m, transform._m
+            transform._m = [[sum(a[i][k] * b[k][j] for k in range(4)) for j in range(4)] for i in range(4)]
+            occurrence = occurrence._assemblyContext
+        sketch = Sketch(self._design, planarEntity, transform)
+        sketch._timelineObject = self._design._timeline._append()
+        self._items.append(sketch)
+        return sketch
+
+
+# Bodies
+# Only their bounding box is modelled.
+
+class BRepBody(ApiObject):
+    objectType = "adsk::fusion::BRepBody"
+
+    def __init__(self, boundingBox, isTransient=True):
+        self._boundingBox = boundingBox
+        self._isTransient = isTransient
+
+    @property
+    def boundingBox(self):
+        return self._boundingBox.copy()
+
+    @property
+    def isTransient(self):
+        return self._isTransient
+
+    # Bodies are taken to fill their bounding box
+    def pointContainment(self, point):
+        box = self._boundingBox
+        if(not box._contains(point)):
+            return PointContainment.PointOutsidePointContainment
+        if(any(p in (a, b) for p, a, b in zip(point._p, box._minPoint._p, box._maxPoint._p))):
+            return PointContainment.PointOnPointContainment
+        return PointContainment.PointInsidePointContainment
+
+
+class BRepBodies(ApiCollection):
+    def add(self, body, baseFeature=None):
+        added = BRepBody(body._boundingBox.copy(), False)
+        self._items.append(added)
+        if(baseFeature):
+            baseFeature._bodies._items.append(added)
+        return added
+
+
+class BRepBodyList(ApiCollection):
+    pass
+
+
+class TemporaryBRepManager(ApiObject):
+    _instance = None
+
+    @staticmethod
+    def get():
+        if(TemporaryBRepManager._instance is None):
+            TemporaryBRepManager._instance = TemporaryBRepManager()
+        return TemporaryBRepManager._instance
+
+    def createCylinderOrCone(self, pointOne, pointOneRadius, pointTwo, pointTwoRadius):
+        radius = max(pointOneRadius, pointTwoRadius)
+        (x0, y0, z0), (x1, y1, z1) = pointOne._p, pointTwo._p
+        return BRepBody(BoundingBox3D(
+            Point3D(min(x0, x1) - radius, min(y0, y1) - radius, min(z0, z1)),
+            Point3D(max(x0, x1) + radius, max(y0, y1) + radius, max(z0, z1))
+        ))
+
+    def booleanOperation(self, targetBody, toolBody, booleanType):
+        if(booleanType == BooleanTypes.UnionBooleanType):
+            targetBody._boundingBox._unite(toolBody._boundingBox)
+        return True
+
+    def copy(self, body):
+        return BRepBody(body._boundingBox.copy())
+
+    def transform(self, body, transform):
+        body._boundingBox = body._boundingBox._transformed(transform)
+        return True
+
+    def exportToFile(self, bodies, filename):
+        return _writeStep(filename)
+
+
+# Features
+
+class Feature(ApiObject):
+    def __init__(self, design, input):
+        self._design = design
+        self._timelineObject = design._timeline._append()
+        self._input = input
+        self._bodies = BRepBodyList(input._newBodies() if input else [])
+
+    @property
+    def timelineObject(self):
+        return self._timelineObject
+
+    @property
+    def bodies(self):
+        return self._bodies
+
+    def deleteMe(self):
+        self._design._timeline._remove()
+        return super().deleteMe()
+
+
+class FeatureInput(ApiObject):
+    def __init__(self, *args):
+        self._args = args
+
+    def _newBodies(self):
+        return []
+
+
+class DistanceExtentDefinition(ApiObject):
+    def __init__(self, distance):
+        self._distance = ModelParameter(distance._value)
+
+    @staticmethod
+    def create(distance):
+        return DistanceExtentDefinition(distance)
+
+    @property
+    def distance(self):
+        return self._distance
+
+
+class ExtrudeFeatureInput(FeatureInput):
+    def setOneSideExtent(self, extent, direction, taperAngle=None):
+        self._extentOne = extent
+        return True
+
+
+class SweepFeatureInput(FeatureInput):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._twistAngle = None
+
+    # One body per profile with new body sweeps, the box of its curves' circles stretched along the path
+    def _newBodies(self):
+        profiles, path, operation = self._args
+        if(operation != FeatureOperations.NewBodyFeatureOperation):
+            return []
+        start, end = path._curve._startSketchPoint._geometry._p, path._curve._endSketchPoint._geometry._p
+        bodies = []
+        for profile in profiles._items:
+            radius = max(
+                curve._geometry._center.distanceTo(Point3D(*start)) + curve._geometry._radius
+                for loop in profile._profileLoops._items
+                for curve in loop._profileCurves._items
+            )
+            bodies.append(BRepBody(BoundingBox3D(
+                Point3D(start[0] - radius, start[1] - radius, min(start[2], end[2])),
+                Point3D(start[0] + radius, start[1] + radius, max(start[2], end[2]))
+            ), False))
+        return bodies
+
+    @property
+    def twistAngle(self):
+        return self._twistAngle
+
+    @twistAngle.setter
+    def twistAngle(self, value):
+        self._twistAngle = value
+
+
+class RevolveFeatureInput(FeatureInput):
+    def setAngleExtent(self, isSymmetric, angle):
+        return True
+
+
+class RectangularPatternFeatureInput(FeatureInput):
+    def setDirectionTwo(self, directionTwoEntity, quantityTwo, distanceTwo):
+        self._directionTwo = (directionTwoEntity, quantityTwo, distanceTwo)
+        return True
+
+
+class CircularPatternFeatureInput(FeatureInput):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._quantity = None
+        self._totalAngle = None
+        self._isSymmetric = True
+
+    @property
+    def quantity(self):
+        return self._quantity
+
+    @quantity.setter
+    def quantity(self, value):
+        self._quantity = value
+
+    @property
+    def totalAngle(self):
+        return self._totalAngle
+
+    @totalAngle.setter
+    def totalAngle(self, value):
+        self._totalAngle = value
+
+    @property
+    def isSymmetric(self):
+        return self._isSymmetric
+
+    @isSymmetric.setter
+    def isSymmetric(self, value):
+        self._isSymmetric = value
+
+
+class PathPatternFeatureInput(FeatureInput):
+    pass
+
+
+class ExtrudeFeature(Feature):
+    objectType = "adsk::fusion::ExtrudeFeature"
+
+    @property
+    def extentOne(self):
+        return self._input._extentOne
+
+
+class RevolveFeature(Feature):
+    objectType = "adsk::fusion::RevolveFeature"
+
+
+class SweepFeature(Feature):
+    objectType = "adsk::fusion::SweepFeature"
+
+
+class RectangularPatternFeature(Feature):
+    objectType = "adsk::fusion::RectangularPatternFeature"
+
+
+class CircularPatternFeature(Feature):
+    objectType = "adsk::fusion::CircularPatternFeature"
+
+
+class PathPatternFeature(Feature):
+    objectType = "adsk::fusion::PathPatternFeature"
+
+    # Only straight paths are modelled, the copies are spaced along the sketch line from its start
+    @property
+    def patternElements(self):
+        _, path, quantity, distance, _ = self._input._args
+        direction = [0.0, 0.0, 0.0]
+        if(isinstance(path._curve, SketchLine)):
+            line = path._curve
+            start = line._startSketchPoint._sketch._transform._apply(line._startSketchPoint._geometry._p, 1)
+            end = line._endSketchPoint._sketch._transform._apply(line._endSketchPoint._geometry._p, 1)
+            length = math.dist(start, end)
+            direction = [(b - a) / length for a, b in zip(start, end)]
+
+        elements = []
+        for k in range(int(quantity._value)):
+            transform = Matrix3D()
+            for i in range(3):
+                transform._m[i][3] = k * distance._value * direction[i]
+            elements.append(PatternElement(transform))
+        return PatternElements(elements)
+
+
+# The first element of a pattern is the original
+class PatternElement(ApiObject):
+    def __init__(self, transform):
+        self._transform = transform
+
+    @property
+    def transform(self):
+        return self._transform.copy()
+
+
+class PatternElements(ApiCollection):
+    pass
+
+
+class FeatureCollection(ApiCollection):
+    _inputClass = FeatureInput
+    _featureClass = Feature
+
+    def __init__(self, design):
+        super().__init__()
+        self._design = design
+
+    def createInput(self, *args):
+        return self._inputClass(*args)
+
+    def add(self, input):
+        feature = self._featureClass(self._design, input)
+        self._items.append(feature)
+        return feature
+
+
+class ExtrudeFeatures(FeatureCollection):
+    _inputClass = ExtrudeFeatureInput
+    _featureClass = ExtrudeFeature
+
+
+class RevolveFeatures(FeatureCollection):
+    _inputClass = RevolveFeatureInput
+    _featureClass = RevolveFeature
+
+
+class SweepFeatures(FeatureCollection):
+    _inputClass = SweepFeatureInput
+    _featureClass = SweepFeature
+
+
+class RectangularPatternFeatures(FeatureCollection):
+    _inputClass = RectangularPatternFeatureInput
+    _featureClass = RectangularPatternFeature
+
+
+class CircularPatternFeatures(FeatureCollection):
+    _inputClass = CircularPatternFeatureInput
+    _featureClass = CircularPatternFeature
+
+
+class PathPatternFeatures(FeatureCollection):
+    _inputClass = PathPatternFeatureInput
+    _featureClass = PathPatternFeature
+
+
+class Path(ApiObject):
+    def __init__(self, curve):
+        self._curve = curve
+
+
+class BaseFeature(Feature):
+    objectType = "adsk::fusion::BaseFeature"
+    def __init__(self, design):
+        super().__init__(design, None)
+        self._isEditing = False
+
+    def startEdit(self):
+        self._isEditing = True
+        return True
+
+    def finishEdit(self):
+        self._isEditing = False
+        return True
+
+
+class BaseFeatures(ApiCollection):
+    def __init__(self, design):
+        super().__init__()
+        self._design = design
+
+    def add(self):
+        feature = BaseFeature(self._design)
+        self._items.append(feature)
+        return feature
+
+
+class CombineFeatureInput(FeatureInput):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._operation = FeatureOperations.JoinFeatureOperation
+        self._isKeepToolBodies = False
+
+    @property
+    def operation(self):
+        return self._operation
+
+    @operation.setter
+    def operation(self, value):
+        self._operation = value
+
+    @property
+    def isKeepToolBodies(self):
+        return self._isKeepToolBodies
+
+    @isKeepToolBodies.setter
+    def isKeepToolBodies(self, value):
+        self._isKeepToolBodies = value
+
+
+class CombineFeature(Feature):
+    objectType = "adsk::fusion::CombineFeature"
+
+
+class CombineFeatures(FeatureCollection):
+    _inputClass = CombineFeatureInput
+    _featureClass = CombineFeature
+
+    # The tool bodies get consumed by the target body
+    def add(self, input):
+        if(not input._isKeepToolBodies):
+            bodies = self._design._activeComponent()._bRepBodies._items
+            for tool in input._args[1]._items:
+                bodies.remove(tool)
+        return super().add(input)
+
+
+class Features(ApiObject):
+    def __init__(self, design):
+        self._extrudeFeatures = ExtrudeFeatures(design)
+        self._sweepFeatures = SweepFeatures(design)
+        self._revolveFeatures = RevolveFeatures(design)
+        self._combineFeatures = CombineFeatures(design)
+        self._baseFeatures = BaseFeatures(design)
+        self._rectangularPatternFeatures = RectangularPatternFeatures(design)
+        self._circularPatternFeatures = CircularPatternFeatures(design)
+        self._pathPatternFeatures = PathPatternFeatures(design)
+
+    @property
+    def extrudeFeatures(self):
+        return self._extrudeFeatures
+
+    @property
+    def sweepFeatures(self):
+        return self._sweepFeatures
+
+    @property
+    def revolveFeatures(self):
+        return self._revolveFeatures
+
+    @property
+    def combineFeatures(self):
+        return self._combineFeatures
+
+    @property
+    def baseFeatures(self):
+        return self._baseFeatures
+
+    @property
+    def rectangularPatternFeatures(self):
+        return self._rectangularPatternFeatures
+
+    @property
+    def circularPatternFeatures(self):
+        return self._circularPatternFeatures
+
+    @property
+    def pathPatternFeatures(self):
+        return self._pathPatternFeatures
+
+    def createPath(self, curve, isChain=True):
+        return Path(curve)
+
+
+# Custom graphics
+
+class CustomGraphicsCoordinates(ApiObject):
+    @staticmethod
+    def create(coordinates):
+        return CustomGraphicsCoordinates()
+
+
+class CustomGraphicsSolidColorEffect(ApiObject):
+    @staticmethod
+    def create(color):
+        return CustomGraphicsSolidColorEffect()
+
+
+class CustomGraphicsMesh(ApiObject):
+    def __init__(self):
+        self._transform = None
+        self._color = None
+
+    @property
+    def transform(self):
+        return self._transform
+
+    @transform.setter
+    def transform(self, value):
+        self._transform = value
+
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, value):
+        self._color = value
+
+
+class CustomGraphicsGroup(ApiCollection):
+    def addMesh(self, coordinates, coordinateIndexList, normalVectors, normalIndexList):
+        entity = CustomGraphicsMesh()
+        self._items.append(entity)
+        return entity
+
+
+class CustomGraphicsGroups(ApiCollection):
+    def add(self):
+        group = CustomGraphicsGroup()
+        self._items.append(group)
+        return group
+
+
+class Component(ApiObject):
+    def __init__(self, design):
+        self._sketches = Sketches(design)
+        self._features = Features(design)
+        self._customGraphicsGroups = CustomGraphicsGroups()
+        self._bRepBodies = BRepBodies()
+        self._constructionPlanes = ConstructionPlanes(design)
+        origin = Point3D(0, 0, 0)
+        self._xYConstructionPlane = ConstructionPlane(Plane(origin, Vector3D(0, 0, 1), Vector3D(1, 0, 0), Vector3D(0, 1, 0)))
+
+    @property
+    def sketches(self):
+        return self._sketches
+
+    @property
+    def features(self):
+        return self._features
+
+    @property
+    def customGraphicsGroups(self):
+        return self._customGraphicsGroups
+
+    @property
+    def bRepBodies(self):
+        return self._bRepBodies
+
+    @property
+    def constructionPlanes(self):
+        return self._constructionPlanes
+
+    @property
+    def xYConstructionPlane(self):
+        return self._xYConstructionPlane
+
+
+# Export
+# Writing a file takes EXPORT_SECONDS on the calling thread, like Fusion serializing the body on the main thread.
+
+EXPORT_SECONDS = 0.02
+
+
+class STEPExportOptions(ApiObject):
+    def __init__(self, filename, geometry):
+        self._filename = filename
+        self._geometry = geometry
+
+
+def _writeStep(filename):
+    time.sleep(EXPORT_SECONDS)
+    with open(filename, "w") as f:
+        f.write("ISO-10303-21;\nEND-ISO-10303-21;\n")
+    return True
+
+
+class ExportManager(ApiObject):
+    # Fusion exports a Component or an Occurrence, None being the root component
+    def createSTEPExportOptions(self, filename, geometry=None):
+        if(geometry is not None and not isinstance(geometry, (Component, Occurrence))):
+            raise TypeError("createSTEPExportOptions takes a Component or an Occurrence, not {}".format(type(geometry).__name__))
+        return STEPExportOptions(filename, geometry)
+
+    def execute(self, exportOptions):
+        return _writeStep(exportOptions._filename)
+
+
+class Design(ApiObject):
+    objectType = "adsk::fusion::Design"
+
+    def __init__(self, designType=DesignTypes.ParametricDesignType):
+        self._designType = designType
+        self._timeline = Timeline()
+        self._userParameters = UserParameters()
+        self._exportManager = ExportManager()
+        self._rootComponent = Component(self)
+        self._activeOccurrence = None
+
+    @staticmethod
+    def cast(product):
+        return product
+
+    @property
+    def designType(self):
+        return self._designType
+
+    @property
+    def timeline(self):
+        return self._timeline
+
+    @property
+    def userParameters(self):
+        return self._userParameters
+
+    @property
+    def exportManager(self):
+        return self._exportManager
+
+    @property
+    def rootComponent(self):
+        return self._rootComponent
+
+    @property
+    def activeComponent(self):
+        return self._activeComponent()
+
+    # None while the root component is active
+    @property
+    def activeOccurrence(self):
+        return self._activeOccurrence
+
+    def _activeComponent(self):
+        return self._activeOccurrence._component if self._activeOccurrence else self._rootComponent
@@ -0,0 +1,28 @@
+# Builders of the fittings as Fusion features, one module per construction.
+#
+# They're only imported when a fitting of their kind gets built for the first time, so starting Fusion
+# with the add-in only pays for registering the command. Every sketch builder takes the component,
+# the fitting sketch, the fitting centers in sketch space and the FittingDims, and returns the features
+# it created in timeline order.
+
+import importlib
+
+
+# (module, function) of the sketch builders by spec kind, see luer.spec
+BUILDERS = {
+    "male": ("male", "buildMale"),
+    "maleInternal": ("maleInternal", "buildMaleInternal"),
+    "female": ("female", "buildFemale"),
+    "femaleInternal": ("femaleInternal", "buildFemaleInternal"),
+}
+
+
+# Imports the builder module on first use
+def load(name):
+    return importlib.import_module("." + name, __name__)
+
+
+# Returns the sketch builder of the spec kind
+def builder(kind):
+    module, function = BUILDERS[kind]
+    return getattr(load(module), function)
@@ -0,0 +1,99 @@
+# Sketch and feature helpers shared by the builders.
+
+import adsk.core, adsk.fusion
+
+from ..luer import mesh, profiling
+
+
+# Creates a one sided extrude of the profiles. Distance is in cm, taperAngle in radians.
+def addExtrude(comp, profiles, operation, distance, taperAngle=0):
+    extrudeInput = comp.features.extrudeFeatures.createInput(profiles, operation)
+    extrudeInput.setOneSideExtent(
+        adsk.fusion.DistanceExtentDefinition.create(adsk.core.ValueInput.createByReal(distance)),
+        0,
+        adsk.core.ValueInput.createByReal(taperAngle)
+    )
+    with profiling.stage("extrudeFeatures.add"):
+        return comp.features.extrudeFeatures.add(extrudeInput)
+
+
+# Sweeps the profiles of every fitting along its own path with the twist of the thread.
+# The twist is defined around the path, so sweeps can't be shared between fittings.
+def addThreadSweeps(comp, profilesByPoint, pathLines, operation, thread):
+    sweeps = []
+    for profiles, pathLine in zip(profilesByPoint, pathLines):
+        path = comp.features.createPath(pathLine)
+        sweepInput = comp.features.sweepFeatures.createInput(profiles, path, operation)
+        sweepInput.twistAngle = adsk.core.ValueInput.createByReal(thread.twist)
+        with profiling.stage("sweepFeatures.add"):
+            sweeps.append(comp.features.sweepFeatures.add(sweepInput))
+    return sweeps
+
+
+# Draws the crosssection of both thread wings around center and the line used as sweep path
+# The arcs come precomputed relative to the fitting center, see luer.mesh.threadSectionArcs,
+# placing them is a translation by center done in Python, so every point costs a single API call.
+def addThreadSection(sketch, center, thread):
+    x, y, z = center.x, center.y, center.z
+    point = adsk.core.Point3D.create
+    curves = sketch.sketchCurves
+    arcs = curves.sketchArcs
+
+    for odStart, odSweep, csa1, csa1Sweep, csa2, csa2Sweep in mesh.threadSectionArcs(thread):
+        # Creates Arcs for thread crosssection, the flanks share the end points of the outer arc
+        odArc = arcs.addByCenterStartSweep(center, point(x + odStart[0], y + odStart[1], z), odSweep)
+        arcs.addByCenterStartSweep(point(x + csa1[0], y + csa1[1], z), odArc.startSketchPoint, csa1Sweep)
+        arcs.addByCenterStartSweep(point(x + csa2[0], y + csa2[1], z), odArc.endSketchPoint, csa2Sweep)
+
+    return curves.sketchLines.addByTwoPoints(center, point(x, y, z + thread.length))
+
+
+# Returns the radius of a profile loop if all of its curves are circles or arcs of the same radius.
+# Returns None for any other loop, e.g. the crosssection of a thread wing.
+def getLoopRadius(loop):
+    radius = None
+    for curve in loop.profileCurves:
+        geometry = curve.geometry
+        if geometry.objectType not in ["adsk::core::Circle3D", "adsk::core::Arc3D"]:
+            return None
+        if radius is not None and abs(geometry.radius - radius) > 1e-6:
+            return None
+        radius = geometry.radius
+    return radius
+
+
+# Returns True if the loops of the profile match the signature.
+# A signature lists the loop radii, outer loop first. None stands for a non-circular loop.
+def profileMatches(profile, signature):
+    loops = sorted(profile.profileLoops, key=lambda loop: not loop.isOuter)
+    if len(loops) != len(signature):
+        return False
+    for loop, radius in zip(loops, signature):
+        loopRadius = getLoopRadius(loop)
+        if (loopRadius is None) != (radius is None):
+            return False
+        if radius is not None and abs(loopRadius - radius) > 1e-6:
+            return False
+    return True
+
+
+# Collects all profiles of the sketch matching any of the signatures.
+# As profiles are picked by shape rather than index, this works for any number of fittings per sketch.
+def getProfilesByLoopRadii(sketch, *signatures):
+    with profiling.stage("sketch.profiles"):
+        oc = adsk.core.ObjectCollection.create()
+        for profile in sketch.profiles:
+            if any(profileMatches(profile, signature) for signature in signatures):
+                oc.add(profile)
+        return oc
+
+
+# Same as getProfilesByLoopRadii, but returns one Object collection per center point.
+# Each profile is assigned to the center point closest to the center of its first curve.
+def getProfilesByPoint(sketch, centers, *signatures):
+    ocs = [adsk.core.ObjectCollection.create() for _ in centers]
+    for profile in getProfilesByLoopRadii(sketch, *signatures):
+        curveCenter = profile.profileLoops[0].profileCurves[0].sketchEntity.geometry.center
+        distances = [curveCenter.distanceTo(center) for center in centers]
+        ocs[distances.index(min(distances))].add(profile)
+    return ocs
@@ -0,0 +1,39 @@
+# Builds fittings in direct designs, which have no timeline to keep sketches and features in.
+#
+# Every fitting is a transient copy of the template bodies of its type, see template.py. The copies touching
+# the same body are united before they're inserted, so each body gets one insert and one combine per operation
+# however many fittings it holds, and no sketch, extrude or sweep is created per fitting.
+
+import adsk.core, adsk.fusion
+
+from ..luer import profiling
+from .template import combineBodies, placeTemplates
+
+
+# Places the fitting's template bodies at every transform and combines them with the bodies they attach to.
+# Joins attached to no body are inserted as bodies of their own. Returns the combine features.
+# transforms are in the space of comp, templates is the cache of template bodies by (type, clearance, hole).
+def buildDirect(comp, transforms, dims, templates):
+    tbm = adsk.fusion.TemporaryBRepManager.get()
+
+    # Unites the copies of each operation by the body they attach to
+    tools = {}
+    separate = []
+    with profiling.stage("direct.unite"):
+        for fitting in placeTemplates(comp, transforms, dims, templates):
+            for tool, operation, target in fitting:
+                if(target is None):
+                    separate.append(tool)
+                    continue
+                key = (operation, id(target))
+                if(key in tools):
+                    tbm.booleanOperation(tools[key][0], tool, adsk.fusion.BooleanTypes.UnionBooleanType)
+                else:
+                    tools[key] = (tool, operation, target)
+
+    with profiling.stage("bRepBodies.add"):
+        for tool in separate:
+            comp.bRepBodies.add(tool)
+        bodies = [(comp.bRepBodies.add(tool), operation, target) for tool, operation, target in tools.values()]
+
+    return combineBodies(comp, bodies)
@@ -0,0 +1,36 @@
+# Builds female fittings from the fitting sketch.
+
+from ..luer import profiling
+from .common import addExtrude, addThreadSection, addThreadSweeps, getProfilesByLoopRadii, getProfilesByPoint
+
+
+# Builds female fittings, the thread wings only if the spec has a thread
+def buildFemale(comp, sketch, pointPrims, dims):
+    thread = dims.spec.thread
+    rTaper = dims.taperStartRadius
+
+    pathLines = []
+    with profiling.stage("sketch.draw"):
+        for pointPrim in pointPrims:
+            # Creates circle for outside diameter
+            sketch.sketchCurves.sketchCircles.addByCenterRadius(pointPrim, dims.outerRadius)
+
+            # Creates circle for base diameter of taper
+            sketch.sketchCurves.sketchCircles.addByCenterRadius(pointPrim, rTaper)
+
+            if(thread):
+                # Creates Arcs for thread crosssection and the sweep path
+                pathLines.append(addThreadSection(sketch, pointPrim, thread))
+
+    features = [
+        # Creates extude of the outer walls
+        addExtrude(comp, getProfilesByLoopRadii(sketch, [dims.outerRadius, rTaper]), 0, dims.spec.taperLength),
+        # Creates extude cut with taper
+        addExtrude(comp, getProfilesByLoopRadii(sketch, [rTaper]), 1, dims.spec.taperLength, dims.taperExtrudeAngle)
+    ]
+
+    if(thread):
+        # Sweeps the thread wings
+        features.extend(addThreadSweeps(comp, getProfilesByPoint(sketch, pointPrims, [None]), pathLines, 0, thread))
+
+    return features
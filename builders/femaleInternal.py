@@ -0,0 +1,17 @@
+# Builds female fittings cut into the body from the fitting sketch.
+
+from ..luer import profiling
+from .common import addExtrude, getProfilesByLoopRadii
+
+
+# Builds female fittings cut into the body below the plane
+def buildFemaleInternal(comp, sketch, pointPrims, dims):
+    rTaper = dims.taperStartRadius
+
+    with profiling.stage("sketch.draw"):
+        for pointPrim in pointPrims:
+            # Creates circle for base diameter of taper
+            sketch.sketchCurves.sketchCircles.addByCenterRadius(pointPrim, rTaper)
+
+    # Creates extude cut with taper
+    return [addExtrude(comp, getProfilesByLoopRadii(sketch, [rTaper]), 1, dims.taperZ1, dims.taperExtrudeAngle)]
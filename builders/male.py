@@ -0,0 +1,49 @@
+# Builds male fittings from the fitting sketch.
+
+from ..luer import profiling
+from .common import addExtrude, addThreadSection, addThreadSweeps, getProfilesByLoopRadii, getProfilesByPoint
+
+
+# Builds male fittings, the threaded collar only if the spec has a thread
+def buildMale(comp, sketch, pointPrims, dims):
+    thread = dims.spec.thread
+    rTaper = dims.taperStartRadius
+    rHole = dims.holeRadius
+
+    pathLines = []
+    with profiling.stage("sketch.draw"):
+        for pointPrim in pointPrims:
+            # Creates circle for base diameter of taper
+            sketch.sketchCurves.sketchCircles.addByCenterRadius(pointPrim, rTaper)
+
+            # Creates circle for internal diameter
+            sketch.sketchCurves.sketchCircles.addByCenterRadius(pointPrim, rHole)
+
+            if(thread):
+                # Creates Arcs for thread crosssection and the sweep path
+                pathLines.append(addThreadSection(sketch, pointPrim, thread))
+
+                # Creates circles for internal and external diameter of threaded tube
+                sketch.sketchCurves.sketchCircles.addByCenterRadius(pointPrim, dims.spec.collarInnerRadius)
+                sketch.sketchCurves.sketchCircles.addByCenterRadius(pointPrim, dims.spec.collarOuterRadius)
+
+    features = [
+        # Creates first extude with taper
+        addExtrude(comp, getProfilesByLoopRadii(sketch, [rTaper, rHole], [rHole]), 0, dims.spec.taperLength, dims.taperExtrudeAngle),
+        # Creates second extrude to cut internal holes
+        addExtrude(comp, getProfilesByLoopRadii(sketch, [rHole]), 1, dims.spec.taperLength)
+    ]
+
+    if(thread):
+        # Creates third extrude to join threaded tubes
+        features.append(addExtrude(
+            comp,
+            getProfilesByLoopRadii(sketch, [dims.spec.collarOuterRadius, dims.spec.collarInnerRadius]),
+            0,
+            thread.length
+        ))
+
+        # Sweeps the thread wings
+        features.extend(addThreadSweeps(comp, getProfilesByPoint(sketch, pointPrims, [None]), pathLines, 0, thread))
+
+    return features
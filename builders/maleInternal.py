@@ -0,0 +1,43 @@
+# Builds male fittings sunk into the body from the fitting sketch.
+
+import adsk.core
+
+from ..luer import profiling
+from .common import addExtrude, addThreadSection, addThreadSweeps, getProfilesByLoopRadii, getProfilesByPoint
+
+
+# Builds male fittings sunk into the body, the space between the threads gets cut out of it
+def buildMaleInternal(comp, sketch, pointPrims, dims):
+    thread = dims.spec.thread
+    rTaper = dims.taperStartRadius
+    rHole = dims.holeRadius
+
+    pathLines = []
+    with profiling.stage("sketch.draw"):
+        for pointPrim in pointPrims:
+            pointPrim.translateBy(adsk.core.Vector3D.create(0, 0, dims.taperZ0))
+
+            # Creates circle for base diameter of taper
+            sketch.sketchCurves.sketchCircles.addByCenterRadius(pointPrim, rTaper)
+
+            # Creates circle for internal diameter
+            sketch.sketchCurves.sketchCircles.addByCenterRadius(pointPrim, rHole)
+
+            # Creates Arcs for thread crosssection and the sweep path
+            pathLines.append(addThreadSection(sketch, pointPrim, thread))
+
+            # Creates circles for internal and external diameter of threaded tube
+            sketch.sketchCurves.sketchCircles.addByCenterRadius(pointPrim, dims.spec.collarInnerRadius)
+            sketch.sketchCurves.sketchCircles.addByCenterRadius(pointPrim, dims.spec.collarOuterRadius)
+
+    # Cuts the space between the threads
+    recesses = getProfilesByPoint(sketch, pointPrims, [rTaper, rHole], [rHole], [None, rTaper])
+    features = addThreadSweeps(comp, recesses, pathLines, 1, thread)
+
+    # Creates first extude with taper
+    features.append(addExtrude(comp, getProfilesByLoopRadii(sketch, [rTaper, rHole], [rHole]), 0, dims.spec.taperLength, dims.taperExtrudeAngle))
+
+    # Creates second extrude to cut internal holes
+    features.append(addExtrude(comp, getProfilesByLoopRadii(sketch, [rHole]), 1, dims.spec.taperLength))
+
+    return features
@@ -0,0 +1,72 @@
+# Makes built fittings reference the user parameters of luer.parameters instead of literal values.
+#
+# The builders draw and extrude with plain values, afterwards the circles and extrudes whose values match
+# the taper and hole get their expressions. The values don't change, so nothing has to be recomputed yet.
+
+import adsk.core
+
+from ..luer import parameters, profiling
+
+
+# Returns the first indexed prefix of prefix whose parameters either don't exist yet or hold the fitting's values.
+# Parameters holding other values drive fittings built before, which must keep their sizes.
+def choosePrefix(des, prefix, dims):
+    userParameters = des.userParameters
+    index = 0
+    while(True):
+        candidate = parameters.indexedPrefix(prefix, index)
+        existing = [(parameter, userParameters.itemByName(parameter.name)) for parameter in parameters.userParameters(candidate, dims)]
+        if(all(item is None or item.expression == parameter.expression for parameter, item in existing)):
+            return candidate
+        index += 1
+
+
+# Adds the user parameters of the fitting that don't exist yet, see choosePrefix
+def addUserParameters(des, prefix, dims):
+    userParameters = des.userParameters
+    for parameter in parameters.userParameters(prefix, dims):
+        if(not userParameters.itemByName(parameter.name)):
+            userParameters.add(parameter.name, adsk.core.ValueInput.createByString(parameter.expression), parameter.unit, parameter.comment)
+
+
+# Dimensions the taper and hole circles of the sketch with the parameter expressions.
+# The centers get fixed, so only the diameters follow the parameters.
+def bindSketch(sketch, prefix, dims):
+    expressions = [
+        (dims.taperStartRadius, parameters.taperDiameterExpression(prefix, dims)),
+        (dims.holeRadius, parameters.holeDiameterExpression(prefix, dims)),
+    ]
+    sketch.isComputeDeferred = True
+    for circle in sketch.sketchCurves.sketchCircles:
+        radius = circle.radius
+        for expressionRadius, expression in expressions:
+            if(expression and abs(radius - expressionRadius) < 1e-6):
+                center = circle.centerSketchPoint
+                center.isFixed = True
+                textPoint = center.geometry.copy()
+                textPoint.translateBy(adsk.core.Vector3D.create(radius, 0, 0))
+                sketch.sketchDimensions.addDiameterDimension(circle, textPoint).parameter.expression = expression
+                break
+    sketch.isComputeDeferred = False
+
+
+# Sets the distance of the extrudes spanning the taper length to the taper length parameter
+def bindExtrudes(features, prefix, dims):
+    for feature in features:
+        if(feature.objectType != "adsk::fusion::ExtrudeFeature"):
+            continue
+        distance = feature.extentOne.distance
+        expression = parameters.lengthExpression(prefix, dims, distance.value)
+        if(expression):
+            distance.expression = expression
+
+
+# Creates the user parameters and makes the sketch and the features of the fittings reference them.
+# Returns the prefix the parameters got, see choosePrefix.
+def bindParameters(des, sketch, features, prefix, dims):
+    with profiling.stage("parameters"):
+        prefix = choosePrefix(des, prefix, dims)
+        addUserParameters(des, prefix, dims)
+        bindSketch(sketch, prefix, dims)
+        bindExtrudes(features, prefix, dims)
+    return prefix
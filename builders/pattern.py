@@ -0,0 +1,61 @@
+# Replicates the features of the fittings with a single pattern feature.
+# Only features get patterned, the sketches and construction planes they're built from stay.
+
+import adsk.core, adsk.fusion
+import math
+
+from ..luer import profiling
+
+
+# Collects the features, leaving out sketches and construction planes
+def getPatternEntities(features):
+    oc = adsk.core.ObjectCollection.create()
+    for feature in features:
+        if(feature.objectType not in ["adsk::fusion::Sketch", "adsk::fusion::ConstructionPlane"]):
+            oc.add(feature)
+    return oc
+
+
+# Repeats the features count times along directionOne and rows times along directionTwo, spacings in cm
+def addRectangularPattern(comp, features, directionOne, count, spacing, directionTwo, rows, rowSpacing):
+    patternFeatures = comp.features.rectangularPatternFeatures
+    patternInput = patternFeatures.createInput(
+        getPatternEntities(features),
+        directionOne,
+        adsk.core.ValueInput.createByReal(count),
+        adsk.core.ValueInput.createByReal(spacing),
+        adsk.fusion.PatternDistanceType.SpacingPatternDistanceType
+    )
+    if(rows > 1):
+        patternInput.setDirectionTwo(
+            directionTwo,
+            adsk.core.ValueInput.createByReal(rows),
+            adsk.core.ValueInput.createByReal(rowSpacing)
+        )
+    with profiling.stage("rectangularPatternFeatures.add"):
+        return patternFeatures.add(patternInput)
+
+
+# Repeats the features count times around the full circle of the axis
+def addCircularPattern(comp, features, axis, count):
+    patternFeatures = comp.features.circularPatternFeatures
+    patternInput = patternFeatures.createInput(getPatternEntities(features), axis)
+    patternInput.quantity = adsk.core.ValueInput.createByReal(count)
+    patternInput.totalAngle = adsk.core.ValueInput.createByReal(2 * math.pi)
+    patternInput.isSymmetric = False
+    with profiling.stage("circularPatternFeatures.add"):
+        return patternFeatures.add(patternInput)
+
+
+# Repeats the features count times along the curve, spacing in cm
+def addPathPattern(comp, features, curve, count, spacing):
+    patternFeatures = comp.features.pathPatternFeatures
+    patternInput = patternFeatures.createInput(
+        getPatternEntities(features),
+        comp.features.createPath(curve),
+        adsk.core.ValueInput.createByReal(count),
+        adsk.core.ValueInput.createByReal(spacing),
+        adsk.fusion.PatternDistanceType.SpacingPatternDistanceType
+    )
+    with profiling.stage("pathPatternFeatures.add"):
+        return patternFeatures.add(patternInput)
@@ -0,0 +1,172 @@
+# Builds fittings as copies of template bodies built once per parameter set, the "Reuse cached bodies" option.
+
+import adsk.core, adsk.fusion
+
+from ..luer import mesh, profiling
+from .common import addThreadSection, addThreadSweeps, getProfilesByLoopRadii
+
+
+# Containments of the fitting base in the body it attaches to. Fittings stand on the face they're placed on.
+CONTAINED = (adsk.fusion.PointContainment.PointInsidePointContainment, adsk.fusion.PointContainment.PointOnPointContainment)
+
+
+# Places a copy of the fitting's template bodies at every transform.
+# All copies get inserted at once and combined with the bodies they attach to, one feature per body and operation.
+# With nodePerFitting every fitting gets a base feature of its own instead of sharing one.
+# Returns the features in timeline order.
+# transforms are in the space of comp, templates is the cache of template bodies by (type, clearance, hole).
+def buildFromTemplate(comp, transforms, dims, templates, nodePerFitting=False):
+    des = adsk.core.Application.get().activeProduct
+    fittingTools = placeTemplates(comp, transforms, dims, templates)
+    tools = [tool for fitting in fittingTools for tool in fitting]
+
+    features = []
+    with profiling.stage("bRepBodies.add"):
+        if(des.designType):
+            bodies = []
+            for group in (fittingTools if nodePerFitting else [tools]):
+                baseFeature = comp.features.baseFeatures.add()
+                baseFeature.startEdit()
+                bodies.extend(comp.bRepBodies.add(tool, baseFeature) for tool, _, _ in group)
+                baseFeature.finishEdit()
+                features.append(baseFeature)
+        else:
+            bodies = [comp.bRepBodies.add(tool) for tool, _, _ in tools]
+
+    features.extend(combineBodies(comp, [(body, operation, target) for body, (_, operation, target) in zip(bodies, tools)]))
+    return features
+
+
+# Copies the templates to every transform and finds the body of comp each copy attaches to.
+# Returns one list of (tool, operation, target) per transform. Cuts without a body to cut from are dropped,
+# joins without one have no target and stay separate bodies.
+def placeTemplates(comp, transforms, dims, templates):
+    tbm = adsk.fusion.TemporaryBRepManager.get()
+    join, cut = getTemplate(comp, dims, templates)
+
+    boxes = [(body, body.boundingBox) for body in comp.bRepBodies]
+    fittingTools = []
+    with profiling.stage("template.copy"):
+        for transform in transforms:
+            fitting = []
+            fittingTools.append(fitting)
+            target = getTargetBody(boxes, transform.getAsCoordinateSystem()[0])
+            for template, operation in [(cut, adsk.fusion.FeatureOperations.CutFeatureOperation), (join, adsk.fusion.FeatureOperations.JoinFeatureOperation)]:
+                if(template is None):
+                    continue
+                if(target or operation == adsk.fusion.FeatureOperations.JoinFeatureOperation):
+                    tool = tbm.copy(template)
+                    tbm.transform(tool, transform)
+                    fitting.append((tool, operation, target))
+    return fittingTools
+
+
+# Combines the inserted bodies with their targets, one feature per target and operation.
+# Cuts come first, so the joined taper of sunk fittings stays. Returns the features in timeline order.
+# bodies is a list of (body, operation, target), the ones without a target are left alone.
+def combineBodies(comp, bodies):
+    features = []
+    for operation in [adsk.fusion.FeatureOperations.CutFeatureOperation, adsk.fusion.FeatureOperations.JoinFeatureOperation]:
+        groups = {}
+        for body, bodyOperation, target in bodies:
+            if(bodyOperation == operation and target is not None):
+                groups.setdefault(id(target), (target, adsk.core.ObjectCollection.create()))[1].add(body)
+
+        for target, oc in groups.values():
+            combineInput = comp.features.combineFeatures.createInput(target, oc)
+            combineInput.operation = operation
+            with profiling.stage("combineFeatures.add"):
+                features.append(comp.features.combineFeatures.add(combineInput))
+    return features
+
+
+# Returns the (join, cut) transient bodies of the fitting at the origin with its axis along z, either may be None.
+# They're built once per parameter set and kept in templates.
+def getTemplate(comp, dims, templates):
+    key = (dims.spec.name, dims.clearance, dims.hole)
+    template = templates.get(key)
+    if(template is None):
+        with profiling.stage("template.build"):
+            template = buildTemplate(comp, dims)
+        templates.put(key, template)
+    return template
+
+
+# Builds the template bodies with the TemporaryBRepManager from the revolved loops of luer.mesh.fittingGeometry.
+# Only the thread wings need a real sweep, which gets copied and deleted again.
+def buildTemplate(comp, dims):
+    tbm = adsk.fusion.TemporaryBRepManager.get()
+    geometry = mesh.fittingGeometry(dims.spec.name, dims.clearance, dims.hole)
+
+    join = [createRevolvedLoop(tbm, loop) for loop in geometry.body]
+    for thread, z0, z1 in geometry.wings:
+        join.extend(sweepWingBodies(comp, dims, thread, z0))
+
+    cut = [createRevolvedLoop(tbm, loop) for loop in geometry.cut]
+
+    return unionBodies(tbm, join), unionBodies(tbm, cut)
+
+
+# Creates the solid of a loop [(inner, z0), (outer, z0), (outer, z1), (inner, z1)] revolved around the z axis
+def createRevolvedLoop(tbm, loop):
+    (innerRadius0, z0), (outerRadius0, _), (outerRadius1, z1), (innerRadius1, _) = loop
+    bottom = adsk.core.Point3D.create(0, 0, z0)
+    top = adsk.core.Point3D.create(0, 0, z1)
+
+    body = tbm.createCylinderOrCone(bottom, outerRadius0, top, outerRadius1)
+    if(innerRadius0 > 0 or innerRadius1 > 0):
+        hole = tbm.createCylinderOrCone(bottom, innerRadius0, top, innerRadius1)
+        tbm.booleanOperation(body, hole, adsk.fusion.BooleanTypes.DifferenceBooleanType)
+    return body
+
+
+# Sweeps the thread wings around the origin as new bodies and returns transient copies of them.
+# The sketch and the sweep get deleted again.
+def sweepWingBodies(comp, dims, thread, z0):
+    des = adsk.core.Application.get().activeProduct
+    tbm = adsk.fusion.TemporaryBRepManager.get()
+
+    sketch = comp.sketches.addWithoutEdges(comp.xYConstructionPlane)
+    center = adsk.core.Point3D.create(0, 0, z0)
+    pathLine = addThreadSection(sketch, center, thread)
+
+    # The ring closes the wings, the taper circle keeps the rest of the ring's disk from looking like a wing
+    sketch.sketchCurves.sketchCircles.addByCenterRadius(center, thread.ringRadius)
+    sketch.sketchCurves.sketchCircles.addByCenterRadius(center, dims.taperStartRadius)
+
+    sweep = addThreadSweeps(
+        comp,
+        [getProfilesByLoopRadii(sketch, [None])],
+        [pathLine],
+        adsk.fusion.FeatureOperations.NewBodyFeatureOperation,
+        thread
+    )[0]
+    bodies = [tbm.copy(body) for body in sweep.bodies]
+
+    if(des.designType):
+        sweep.deleteMe()
+    else:
+        for body in list(sweep.bodies):
+            body.deleteMe()
+    sketch.deleteMe()
+
+    return bodies
+
+
+# Unites the transient bodies into the first one, returns None if there are none
+def unionBodies(tbm, bodies):
+    if(not bodies):
+        return None
+    for body in bodies[1:]:
+        tbm.booleanOperation(bodies[0], body, adsk.fusion.BooleanTypes.UnionBooleanType)
+    return bodies[0]
+
+
+# Returns the first body the fitting base at point lies in or on, None if there is none.
+# The bounding boxes skip the bodies far from it before asking the kernel.
+# boxes is a list of (body, boundingBox), point is in the space of the bodies.
+def getTargetBody(boxes, point):
+    for body, box in boxes:
+        if(box.contains(point) and body.pointContainment(point) in CONTAINED):
+            return body
+    return None
@@ -0,0 +1,2 @@
+# Fusion independent helpers of the Luer Fitting Add-In.
+# Nothing in this package may import adsk, so it can be used and benchmarked outside of Fusion.
@@ -0,0 +1,71 @@
+# Bounded least recently used cache with hit and miss counters.
+#
+# The size of an entry is given by sizeOf, 1 per entry by default, and entries get evicted oldest
+# use first once the sizes add up to more than maxSize. Values must not be None.
+
+from collections import OrderedDict
+
+
+class LRUCache:
+    def __init__(self, maxSize, sizeOf=None, onEvict=None):
+        self.maxSize = maxSize
+        self.sizeOf = sizeOf or (lambda value: 1)
+        # Called with key and value of every evicted entry, e.g. to free resources held by it
+        self.onEvict = onEvict
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    # Returns the value of the key and marks it as most recently used, None if it's not cached
+    def get(self, key):
+        entry = self._entries.get(key)
+        if(entry is None):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value):
+        self.discard(key)
+        size = self.sizeOf(value)
+        self._entries[key] = (value, size)
+        self.size += size
+
+        # Keeps the new entry even if it's bigger than maxSize on its own
+        while(self.size > self.maxSize and len(self._entries) > 1):
+            oldKey, (oldValue, oldSize) = self._entries.popitem(last=False)
+            self.size -= oldSize
+            self.evictions += 1
+            if(self.onEvict):
+                self.onEvict(oldKey, oldValue)
+
+    def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if(entry is not None):
+            self.size -= entry[1]
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    # Returns the counters, e.g. for logging
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "size": self.size,
+            "maxSize": self.maxSize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
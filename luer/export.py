@@ -0,0 +1,196 @@
+# Writes fitting meshes as binary STL or 3MF files, without Fusion.
+#
+# Usage: python -m luer.export TYPE OUTPUT [--clearance MM] [--hole MM] [--segments N | --tolerance MM]
+#
+# --tolerance picks the resolution from the largest chordal error the mesh may have, see luer.lod.
+# --array COLUMNS ROWS writes a grid of the fitting, --pitch MM apart, as one mesh streamed by luer.stream.
+# Besides .stl and .3mf it can also write .ply, any other extension is rejected.
+# Meshes are in cm like everything else in luer, files are written in mm.
+# With NumPy installed meshes get tessellated and STL and 3MF files packed from arrays, without it per triangle in Python.
+
+import argparse
+import os
+import struct
+import zipfile
+
+from . import lod, mesh, spec
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+MM_PER_CM = 10.0
+
+# File extensions writeMesh and luer.stream.writeChunks know
+EXTENSIONS = (".stl", ".3mf", ".ply")
+
+# Layout of a triangle in binary STL, normal, three vertices and the attribute byte count
+STL_RECORD = numpy.dtype([("normal", "<f4", 3), ("vertices", "<f4", (3, 3)), ("attribute", "<u2")]) if numpy is not None else None
+
+VERTEX_3MF = '<vertex x="%.5f" y="%.5f" z="%.5f"/>'
+TRIANGLE_3MF = '<triangle v1="%d" v2="%d" v3="%d"/>'
+
+CONTENT_TYPES_3MF = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>'
+    '</Types>'
+)
+
+RELS_3MF = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Target="/3D/3dmodel.model" Id="rel0" Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>'
+    '</Relationships>'
+)
+
+
+# Returns the mesh of the fitting that makes sense as a standalone part.
+# That is the body, or for the internal types which only remove material the cut.
+def exportMesh(fittingType, clearance, hole, segments=96, sectionPoints=None):
+    body, cut = mesh.fittingMesh(fittingType, clearance, hole, segments, sectionPoints=sectionPoints, arrays=numpy is not None)
+    return body if body.triangleCount else cut
+
+
+# Writes the mesh as binary STL
+def writeStl(path, fittingMesh, scale=MM_PER_CM):
+    pack = _packStlArrays if numpy is not None else _packStlLoop
+    with open(path, "wb") as f:
+        f.write(b"Luer Fitting".ljust(80, b"\0"))
+        f.write(struct.pack("<I", fittingMesh.triangleCount))
+        f.write(pack(fittingMesh, scale))
+
+
+# Returns the 50 byte records of all triangles of the mesh
+def _packStlLoop(fittingMesh, scale):
+    c = [v * scale for v in fittingMesh.coords]
+    normals = fittingMesh.faceNormals()
+    indices = fittingMesh.indices
+
+    values = []
+    for t in range(fittingMesh.triangleCount):
+        a, b, d = 3 * indices[3*t], 3 * indices[3*t+1], 3 * indices[3*t+2]
+        values.extend(normals[3*t:3*t+3])
+        values.extend(c[a:a+3])
+        values.extend(c[b:b+3])
+        values.extend(c[d:d+3])
+        values.append(0)
+    return struct.pack("<" + "12fH" * fittingMesh.triangleCount, *values)
+
+
+# Same as _packStlLoop on NumPy arrays
+def _packStlArrays(fittingMesh, scale):
+    c = numpy.asarray(fittingMesh.coords, dtype=float).reshape(-1, 3) * scale
+    triangles = numpy.asarray(fittingMesh.indices, dtype=numpy.intp).reshape(-1, 3)
+    records = numpy.zeros(len(triangles), dtype=STL_RECORD)
+    records["normal"] = mesh._faceNormalArrays(fittingMesh.coords, fittingMesh.indices)
+    records["vertices"] = c[triangles]
+    return records.tobytes()
+
+
+# Writes the mesh as 3MF
+def write3mf(path, fittingMesh, scale=MM_PER_CM):
+    elements = _3mfElementArrays if numpy is not None else _3mfElementLoop
+    vertices, triangles = elements(fittingMesh, scale)
+    model = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<model unit="millimeter" xml:lang="en-US" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">'
+        '<resources><object id="1" type="model"><mesh>'
+        '<vertices>' + vertices + '</vertices>'
+        '<triangles>' + triangles + '</triangles>'
+        '</mesh></object></resources>'
+        '<build><item objectid="1"/></build>'
+        '</model>'
+    )
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml", CONTENT_TYPES_3MF)
+        z.writestr("_rels/.rels", RELS_3MF)
+        z.writestr("3D/3dmodel.model", model)
+
+
+# Returns the vertex and triangle elements of the 3MF model
+def _3mfElementLoop(fittingMesh, scale):
+    c = fittingMesh.coords
+    indices = fittingMesh.indices
+    vertices = "".join(
+        '<vertex x="{:.5f}" y="{:.5f}" z="{:.5f}"/>'.format(c[i] * scale, c[i+1] * scale, c[i+2] * scale)
+        for i in range(0, len(c), 3)
+    )
+    triangles = "".join(
+        '<triangle v1="{}" v2="{}" v3="{}"/>'.format(indices[i], indices[i+1], indices[i+2])
+        for i in range(0, len(indices), 3)
+    )
+    return vertices, triangles
+
+
+# Same as _3mfElementLoop on NumPy arrays, formatting all elements with a single % operation
+def _3mfElementArrays(fittingMesh, scale):
+    c = numpy.asarray(fittingMesh.coords, dtype=float) * scale
+    vertices = (VERTEX_3MF * fittingMesh.vertexCount) % tuple(c.tolist())
+    triangles = (TRIANGLE_3MF * fittingMesh.triangleCount) % tuple(fittingMesh.indices)
+    return vertices, triangles
+
+
+# Returns the lower case extension of the path, raises ValueError if it's none of EXTENSIONS
+def fileExtension(path):
+    extension = os.path.splitext(path)[1].lower()
+    if(extension not in EXTENSIONS):
+        raise ValueError("unknown file extension {!r} of {}, use one of {}".format(extension, path, ", ".join(EXTENSIONS)))
+    return extension
+
+
+# Writes the mesh in the format given by the file extension
+def writeMesh(path, fittingMesh, scale=MM_PER_CM):
+    extension = fileExtension(path)
+    if(extension == ".3mf"):
+        write3mf(path, fittingMesh, scale)
+    elif(extension == ".ply"):
+        from . import stream
+
+        stream.writePly(path, [fittingMesh], scale)
+    else:
+        writeStl(path, fittingMesh, scale)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m luer.export", description="Exports a luer fitting as STL, 3MF or PLY")
+    parser.add_argument("type", choices=spec.FITTING_TYPES)
+    parser.add_argument("output", help="output file, .stl, .3mf or .ply")
+    parser.add_argument("--clearance", type=float, default=0, help="diametral clearance in mm")
+    parser.add_argument("--hole", type=float, default=2.25, help="hole diameter in mm")
+    resolution = parser.add_mutually_exclusive_group()
+    resolution.add_argument("--segments", type=int, default=96, help="segments per full turn")
+    resolution.add_argument("--tolerance", type=float, help="largest chordal error in mm")
+    parser.add_argument("--array", type=int, nargs=2, metavar=("COLUMNS", "ROWS"), help="writes a grid of fittings")
+    parser.add_argument("--pitch", type=float, default=10, help="distance of the fittings in the grid in mm")
+    args = parser.parse_args(argv)
+    try:
+        fileExtension(args.output)
+    except ValueError as e:
+        parser.error(str(e))
+
+    clearance, hole = args.clearance / MM_PER_CM, args.hole / MM_PER_CM
+    segments, sectionPoints = args.segments, None
+    if(args.tolerance):
+        segments, sectionPoints = lod.resolution(args.type, clearance, hole, args.tolerance / MM_PER_CM)
+
+    fittingMesh = exportMesh(args.type, clearance, hole, segments, sectionPoints)
+    if(args.array):
+        from . import stream
+
+        offsets = stream.gridOffsets(args.array[0], args.array[1], args.pitch / MM_PER_CM)
+        chunks = stream.placedMeshes(fittingMesh, offsets)
+        count = stream.writeChunks(args.output, chunks, fittingMesh.triangleCount * len(offsets))
+        print("{}: {} fittings, {} triangles".format(args.output, len(offsets), count))
+        return
+
+    writeMesh(args.output, fittingMesh)
+    print("{}: {} triangles".format(args.output, fittingMesh.triangleCount))
+
+
+if __name__ == "__main__":
+    main()
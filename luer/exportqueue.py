@@ -0,0 +1,133 @@
+# Writes files on a pool of worker threads fed through a bounded queue, so whoever starts an export isn't held up by it.
+#
+# Jobs are (path, write, args) tuples, running one calls write(path, *args). A feeder thread takes them from an
+# iterable and blocks while MAX_QUEUED of them are waiting, so jobs producing their data lazily, like the
+# fitting meshes of fittingJobs, never pile up in memory. onProgress(done, total) gets called from the worker
+# threads after every job, total is None until the feeder reached the end of the jobs.
+# Cancelling drops the jobs that haven't started yet, the running ones finish.
+#
+# Nothing here may call into Fusion, its API only works on the main thread. Whatever a job needs from Fusion
+# has to be snapshotted on the main thread before, like the frames of the placed fittings.
+
+import os
+import queue
+import threading
+
+from . import export, lod, mesh
+
+
+WORKERS = min(4, os.cpu_count() or 1)
+MAX_QUEUED = 8
+
+# Largest chordal error (in cm) of exported meshes, the print level of luer.lod
+EXPORT_TOLERANCE = 0.001
+
+
+class ExportQueue:
+    def __init__(self, jobs, workers=WORKERS, maxQueued=MAX_QUEUED, onProgress=None):
+        self.done = 0
+        # (path, exception) of every job that raised, path is None if the jobs iterable raised
+        self.failed = []
+        self.total = None
+        self._finished = 0
+        self._onProgress = onProgress
+        self._queue = queue.Queue(maxQueued)
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+
+        self._threads = [threading.Thread(target=self._feed, args=(jobs, workers), daemon=True)]
+        self._threads.extend(threading.Thread(target=self._work, daemon=True) for _ in range(workers))
+        for thread in self._threads:
+            thread.start()
+
+    def _feed(self, jobs, workers):
+        count = 0
+        try:
+            for job in jobs:
+                if(self._cancelled.is_set()):
+                    break
+                self._queue.put(job)
+                count += 1
+        except Exception as e:
+            with self._lock:
+                self.failed.append((None, e))
+        finally:
+            with self._lock:
+                self.total = count
+            # Workers skip the jobs left after a cancel, so the queue always drains for the stop marks
+            for _ in range(workers):
+                self._queue.put(None)
+            self._report()
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if(job is None):
+                return
+            if(self._cancelled.is_set()):
+                continue
+            path, write, args = job
+            try:
+                write(path, *args)
+            except Exception as e:
+                with self._lock:
+                    self.failed.append((path, e))
+                    self._finished += 1
+            else:
+                with self._lock:
+                    self.done += 1
+                    self._finished += 1
+            self._report()
+
+    def _report(self):
+        if(self._onProgress):
+            self._onProgress(*self.progress())
+
+    # Returns (finished jobs, total jobs or None while unknown)
+    def progress(self):
+        with self._lock:
+            return self._finished, self.total
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def isFinished(self):
+        return not any(thread.is_alive() for thread in self._threads)
+
+    # Waits up to timeout (in s) for all threads to finish, returns whether they did
+    def wait(self, timeout=None):
+        for thread in self._threads:
+            thread.join(timeout)
+        return self.isFinished()
+
+
+# Returns a copy of the mesh placed by the frame (origin, x, y, z), each a 3-tuple in world space
+def placedMesh(fittingMesh, frame):
+    (ox, oy, oz), (xx, xy, xz), (yx, yy, yz), (zx, zy, zz) = frame
+    c = fittingMesh.coords
+    coords = []
+    for i in range(0, len(c), 3):
+        px, py, pz = c[i], c[i+1], c[i+2]
+        coords.extend((
+            ox + px * xx + py * yx + pz * zx,
+            oy + px * xy + py * yy + pz * zy,
+            oz + px * xz + py * yz + pz * zz,
+        ))
+    placed = mesh.Mesh()
+    placed.coords = coords
+    placed.indices = fittingMesh.indices
+    return placed
+
+
+# Yields one job per frame writing the placed fitting to "<folder>/<type> <n><extension>".
+# The mesh gets built when the first job is taken, on the feeder thread.
+def fittingJobs(folder, extension, fittingType, clearance, hole, frames, tolerance=EXPORT_TOLERANCE):
+    segments, sectionPoints = lod.resolution(fittingType, clearance, hole, tolerance)
+    fittingMesh = export.exportMesh(fittingType, clearance, hole, segments, sectionPoints)
+    for i, frame in enumerate(frames):
+        path = os.path.join(folder, "{} {}{}".format(fittingType, i + 1, extension))
+        yield path, export.writeMesh, (placedMesh(fittingMesh, frame),)
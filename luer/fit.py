@@ -0,0 +1,299 @@
+# Monte Carlo tolerance analysis of a mating male and female fitting, from the cone math alone.
+#
+# Usage: python -m luer.fit MALE FEMALE [--clearance MM ...] [--side both|male|female] [--samples N]
+#                           [--sigma-diameter MM] [--sigma-angle DEG] [--sigma-thread MM] [--workers N] [--seed N]
+#
+# Every sample perturbs the taper diameters, the taper half angles and the thread radii of both parts with
+# normal distributions and reports, like the printed pair would:
+#     engagement    how far the male tip sits inside the socket once the cones touch, or either part bottoms out
+#     interference  diametral overlap of the cones at the nominal engagement of a perfect pair, negative is play
+#     threadOverlap axial length over which the thread wings of lock fittings engage
+#
+# Clearances (VIDiametralClearance) get swept to pick the one for a printer, one process per clearance.
+# With NumPy installed the samples are drawn and evaluated as arrays, SAMPLE_CHUNK at a time, which takes
+# millions of samples in seconds. Fusion ships without NumPy, there the same math runs per sample.
+# Lengths are in cm like everything else in luer, the command line takes and prints mm.
+
+import argparse
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from . import mesh, spec, validate
+from .sweep import parseValues
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Samples evaluated at once by the NumPy path, bounds its memory to a few dozen MB
+SAMPLE_CHUNK = 2 ** 20
+
+
+# Standard deviations of the printed dimensions, diameters and thread radii in cm, angles in radians
+class Tolerances(spec.Record):
+    __slots__ = ("diameter", "angle", "thread")
+
+
+DEFAULT_TOLERANCES = Tolerances(0.005, math.radians(0.05), 0.005)
+
+
+class Distribution(spec.Record):
+    __slots__ = ("mean", "std", "p5", "p50", "p95")
+
+
+class FitResult(spec.Record):
+    __slots__ = (
+        "maleClearance",
+        "femaleClearance",
+        "samples",
+        "engagement",
+        "interference",
+        "threadOverlap",
+        # Fractions of the samples
+        "bottomed",
+        "threadMissed",
+    )
+
+
+# Takes a list or, if NumPy is installed, an array of values
+def distribution(values):
+    n = len(values)
+    if(numpy is not None and isinstance(values, numpy.ndarray)):
+        values = numpy.sort(values)
+        mean, std = float(values.mean()), float(values.std())
+    else:
+        values = sorted(values)
+        mean = sum(values) / n
+        std = math.sqrt(max(0, sum(v * v for v in values) / n - mean * mean))
+    return Distribution(mean, std, float(values[int(0.05 * (n - 1))]), float(values[int(0.5 * (n - 1))]), float(values[int(0.95 * (n - 1))]))
+
+
+# Returns the nominal (tip diameter, length) of a male and the (opening diameter, depth) of a female fitting
+def taperOf(fittingType, clearance):
+    dims = spec.fittingDims(fittingType, clearance, 0)
+    if(dims.spec.kind in ["male", "maleInternal"]):
+        return 2 * dims.taperEndRadius, dims.spec.taperLength
+    return 2 * max(dims.taperStartRadius, dims.taperEndRadius), dims.spec.taperLength
+
+
+# Outermost radius of thread wings sitting around a tube, the male thread wings have to reach past it
+def threadOuterRadius(thread):
+    return max(math.hypot(x, y) for x, y in mesh.threadSection(thread))
+
+
+def isMale(fittingType):
+    return spec.SPECS[fittingType].kind in ["male", "maleInternal"]
+
+
+# Nominal dimensions of a pair, everything the sampling needs
+class Pair(spec.Record):
+    __slots__ = (
+        "maleTip",
+        "maleLength",
+        "femaleOpening",
+        "femaleDepth",
+        # Engagement of the perfect pair without clearance, where the interference gets measured
+        "nominal",
+        # Thread specs and the radii their wings have to pass, None unless both are lock fittings
+        "maleThread",
+        "femaleThread",
+        "maleThreadRadius",
+        "femaleThreadRadius",
+    )
+
+
+def pairOf(maleType, femaleType, maleClearance, femaleClearance):
+    maleTip, maleLength = taperOf(maleType, maleClearance)
+    femaleOpening, femaleDepth = taperOf(femaleType, femaleClearance)
+
+    t = spec.TAN_TAPER_HALF_ANGLE
+    nominalTip, _ = taperOf(maleType, 0)
+    nominalOpening, _ = taperOf(femaleType, 0)
+    nominal = min((nominalOpening - nominalTip) / (2 * t), maleLength, femaleDepth)
+
+    maleThread = spec.SPECS[maleType].thread
+    femaleThread = spec.SPECS[femaleType].thread
+    if(maleThread is None or femaleThread is None):
+        return Pair(maleTip, maleLength, femaleOpening, femaleDepth, nominal)
+    return Pair(
+        maleTip, maleLength, femaleOpening, femaleDepth, nominal,
+        maleThread, femaleThread, validate.threadInnerRadius(maleThread), threadOuterRadius(femaleThread)
+    )
+
+
+# Returns (engagements, interferences, thread overlaps or None, bottomed count, thread missed count), one sample at a time
+def _sampleLoop(pair, tolerances, samples, seed):
+    gauss = random.Random(seed).gauss
+    sd, sa, st = tolerances.diameter, tolerances.angle, tolerances.thread
+    angle = spec.TAPER_HALF_ANGLE
+    limit = min(pair.maleLength, pair.femaleDepth)
+    threaded = pair.maleThread is not None
+
+    engagements = []
+    interferences = []
+    overlaps = []
+    bottomed = 0
+    threadMissed = 0
+    for _ in range(samples):
+        tip = pair.maleTip + gauss(0, sd)
+        opening = pair.femaleOpening + gauss(0, sd)
+        tm = math.tan(angle + gauss(0, sa))
+        tf = math.tan(angle + gauss(0, sa))
+
+        # The gap between the cones changes linearly along the socket, so they touch at its opening if the male
+        # is the steeper cone and at the male tip otherwise
+        e = (opening - tip) / (2 * max(tm, tf))
+        if(e >= limit):
+            e = limit
+            bottomed += 1
+        engagements.append(max(e, 0))
+
+        # Smallest gap along the overlap at the nominal engagement
+        gap = opening - tip - 2 * tm * pair.nominal + 2 * min(tm - tf, 0) * min(pair.nominal, pair.femaleDepth)
+        interferences.append(-gap)
+
+        if(threaded):
+            # Male wings run from the taper base up the collar, female wings from the opening along the whole part
+            openingZ = pair.maleLength - e
+            overlap = min(pair.maleThread.length, openingZ + pair.femaleThread.length) - max(0, openingZ)
+            if(pair.femaleThreadRadius + gauss(0, st) <= pair.maleThreadRadius + gauss(0, st) or overlap <= 0):
+                threadMissed += 1
+                overlap = 0
+            overlaps.append(overlap)
+
+    return engagements, interferences, overlaps if threaded else None, bottomed, threadMissed
+
+
+# Same as _sampleLoop with the samples as NumPy arrays, SAMPLE_CHUNK at a time
+def _sampleArrays(pair, tolerances, samples, seed):
+    rng = numpy.random.default_rng(seed)
+    sd, sa, st = tolerances.diameter, tolerances.angle, tolerances.thread
+    angle = spec.TAPER_HALF_ANGLE
+    limit = min(pair.maleLength, pair.femaleDepth)
+    threaded = pair.maleThread is not None
+
+    engagements = []
+    interferences = []
+    overlaps = []
+    bottomed = 0
+    threadMissed = 0
+    for start in range(0, samples, SAMPLE_CHUNK):
+        n = min(SAMPLE_CHUNK, samples - start)
+        tip = pair.maleTip + rng.normal(0, sd, n)
+        opening = pair.femaleOpening + rng.normal(0, sd, n)
+        tm = numpy.tan(angle + rng.normal(0, sa, n))
+        tf = numpy.tan(angle + rng.normal(0, sa, n))
+
+        e = (opening - tip) / (2 * numpy.maximum(tm, tf))
+        bottomed += int(numpy.count_nonzero(e >= limit))
+        e = numpy.minimum(e, limit)
+        engagements.append(numpy.maximum(e, 0))
+
+        gap = opening - tip - 2 * tm * pair.nominal + 2 * numpy.minimum(tm - tf, 0) * min(pair.nominal, pair.femaleDepth)
+        interferences.append(-gap)
+
+        if(threaded):
+            openingZ = pair.maleLength - e
+            overlap = numpy.minimum(pair.maleThread.length, openingZ + pair.femaleThread.length) - numpy.maximum(0, openingZ)
+            missed = (pair.femaleThreadRadius + rng.normal(0, st, n) <= pair.maleThreadRadius + rng.normal(0, st, n)) | (overlap <= 0)
+            threadMissed += int(numpy.count_nonzero(missed))
+            overlaps.append(numpy.where(missed, 0, overlap))
+
+    return (
+        numpy.concatenate(engagements),
+        numpy.concatenate(interferences),
+        numpy.concatenate(overlaps) if threaded else None,
+        bottomed,
+        threadMissed
+    )
+
+
+# Samples the pair and returns its FitResult.
+# The NumPy and the pure Python path draw different random numbers, so the same seed only repeats within one of them.
+def analyzeFit(maleType, femaleType, maleClearance, femaleClearance, tolerances=DEFAULT_TOLERANCES, samples=100000, seed=None):
+    if(not isMale(maleType) or isMale(femaleType)):
+        raise ValueError("needs a male and a female fitting type")
+
+    pair = pairOf(maleType, femaleType, maleClearance, femaleClearance)
+    sample = _sampleArrays if numpy is not None else _sampleLoop
+    engagements, interferences, overlaps, bottomed, threadMissed = sample(pair, tolerances, samples, seed)
+
+    return FitResult(
+        maleClearance,
+        femaleClearance,
+        samples,
+        distribution(engagements),
+        distribution(interferences),
+        distribution(overlaps) if overlaps is not None else None,
+        bottomed / samples,
+        threadMissed / samples if overlaps is not None else None
+    )
+
+
+# Runs in the worker processes
+def _analyzeJob(job):
+    return analyzeFit(*job)
+
+
+# Analyzes the pair for every clearance, applied to the printed side(s), one process per clearance
+def sweepFit(maleType, femaleType, clearances, side="both", tolerances=DEFAULT_TOLERANCES, samples=100000, workers=None, seed=None):
+    jobs = [
+        (
+            maleType,
+            femaleType,
+            clearance if side in ["both", "male"] else 0,
+            clearance if side in ["both", "female"] else 0,
+            tolerances,
+            samples,
+            None if seed is None else seed + i
+        )
+        for i, clearance in enumerate(clearances)
+    ]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if(workers == 1):
+        return [_analyzeJob(job) for job in jobs]
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(_analyzeJob, jobs))
+
+
+def main(argv=None):
+    males = [t for t in spec.FITTING_TYPES if isMale(t)]
+    females = [t for t in spec.FITTING_TYPES if not isMale(t)]
+
+    parser = argparse.ArgumentParser(prog="python -m luer.fit", description="Monte Carlo fit analysis of a male and a female luer fitting")
+    parser.add_argument("male", choices=males)
+    parser.add_argument("female", choices=females)
+    parser.add_argument("--clearance", nargs="+", default=["0:0.2:0.05"], help="diametral clearances in mm, values or START:STOP:STEP")
+    parser.add_argument("--side", choices=["both", "male", "female"], default="both", help="printed part(s) the clearance applies to")
+    parser.add_argument("--samples", type=int, default=100000, help="samples per clearance")
+    parser.add_argument("--sigma-diameter", type=float, default=DEFAULT_TOLERANCES.diameter * 10, help="mm")
+    parser.add_argument("--sigma-angle", type=float, default=math.degrees(DEFAULT_TOLERANCES.angle), help="degrees")
+    parser.add_argument("--sigma-thread", type=float, default=DEFAULT_TOLERANCES.thread * 10, help="mm")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes, 0 for one per core")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    clearances = [v / 10 for text in args.clearance for v in parseValues(text)]
+    tolerances = Tolerances(args.sigma_diameter / 10, math.radians(args.sigma_angle), args.sigma_thread / 10)
+    results = sweepFit(args.male, args.female, clearances, args.side, tolerances, args.samples, args.workers or None, args.seed)
+
+    print("{:>10}{:>24}{:>24}{:>10}{:>16}{:>12}".format(
+        "clearance", "engagement p5/50/95", "interference p5/50/95", "bottomed", "thread overlap", "thread miss"))
+    for clearance, result in zip(clearances, results):
+        line = "{:>10.3f}{:>24}{:>24}{:>10.1%}".format(
+            clearance * 10,
+            "{:.2f}/{:.2f}/{:.2f}".format(*(v * 10 for v in (result.engagement.p5, result.engagement.p50, result.engagement.p95))),
+            "{:.3f}/{:.3f}/{:.3f}".format(*(v * 10 for v in (result.interference.p5, result.interference.p50, result.interference.p95))),
+            result.bottomed
+        )
+        if(result.threadOverlap):
+            line += "{:>16.2f}{:>12.1%}".format(result.threadOverlap.mean * 10, result.threadMissed)
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# Levels of detail of the fitting meshes, picked by chordal error instead of a fixed resolution.
+#
+# The chordal error of an arc of radius r split into segments of angle a is r * (1 - cos(a / 2)), the distance
+# between a chord and the arc it replaces. The segments per turn follow from the largest radius of the fitting,
+# the helix of a thread wing deviates less than a circle of the same radius. The points per arc of the wing
+# crosssection follow from the radius and sweep of each of its arcs. Together they bound the error of the mesh.
+#
+# Callers ask for a tolerance and get the coarsest of the fixed LEVELS within it. Each level of a fitting is
+# built on its first request and kept in a cache bounded by triangle count, so switching between a preview,
+# a print and a render of the same fitting costs nothing after the first request, and a preview never pays
+# for the render level. The add-in's preview picks its tolerance from the zoom of the viewport.
+# Errors are in cm like everything else in luer.
+
+import math
+from functools import lru_cache
+
+from . import cache, mesh, spec
+
+
+# Chordal errors of the levels, finest first: render, print (slicer STL), preview and zoomed out preview
+LEVELS = (0.0002, 0.001, 0.005, 0.02)
+
+# Triangles kept in the cache, a Female Lock has about 77000 at all four levels together
+CACHE_TRIANGLES = 2000000
+
+# Segments per full turn are never fewer than this, as a coarser revolve isn't recognizable anymore
+MIN_SEGMENTS = 8
+
+
+class Level(spec.Record):
+    __slots__ = ("error", "segments", "sectionPoints", "body", "cut")
+
+
+_levels = cache.LRUCache(CACHE_TRIANGLES, lambda level: level.body.triangleCount + level.cut.triangleCount)
+
+
+# Segments an arc of the radius and sweep (radians) needs for its chords to stay within error of it
+def segmentsForError(radius, error, sweep=2 * math.pi):
+    if(error >= radius):
+        return 1
+    return int(math.ceil(abs(sweep) / (2 * math.acos(1 - error / radius)) - 1e-9))
+
+
+# Returns (radius, sweep) of every arc of a wing crosssection, see mesh.threadSection
+# The flanks are clipped at the ring, so their full sweep is an upper bound. The ring arc spans at most
+# the angle the whole crosssection covers as seen from the axis.
+@lru_cache(maxsize=None)
+def sectionArcs(thread):
+    (odStart, odSweep, csa1, csa1Sweep, csa2, csa2Sweep), _ = mesh.threadSectionArcs(thread)
+    odRadius = math.hypot(*odStart)
+    a0 = math.atan2(odStart[1], odStart[0])
+    odEnd = (odRadius * math.cos(a0 + odSweep), odRadius * math.sin(a0 + odSweep))
+
+    angles = [(math.atan2(y, x) - a0 + math.pi) % (2 * math.pi) - math.pi for x, y in mesh.threadSection(thread, 32)]
+    return (
+        (odRadius, odSweep),
+        (math.hypot(odStart[0] - csa1[0], odStart[1] - csa1[1]), csa1Sweep),
+        (math.hypot(odEnd[0] - csa2[0], odEnd[1] - csa2[1]), csa2Sweep),
+        (thread.ringRadius, max(angles) - min(angles)),
+    )
+
+
+# Largest distance of the fitting's geometry from its axis
+def maxRadius(fittingType, clearance, hole):
+    geometry = mesh.fittingGeometry(fittingType, clearance, hole)
+    radii = [r for loop in geometry.body + geometry.cut for r, z in loop]
+    for thread, z0, z1 in geometry.wings:
+        radii.extend(math.hypot(x, y) for x, y in mesh.threadSection(thread))
+    return max(radii)
+
+
+# Returns (segments per full turn, points per wing crosssection arc) keeping the mesh within error of the fitting
+def resolution(fittingType, clearance, hole, error):
+    segments = max(MIN_SEGMENTS, segmentsForError(maxRadius(fittingType, clearance, hole), error))
+    thread = spec.SPECS[fittingType].thread
+    if(thread is None):
+        return segments, None
+    return segments, max(segmentsForError(radius, error, sweep) for radius, sweep in sectionArcs(thread))
+
+
+# Returns the error of the coarsest of LEVELS within the tolerance, the finest one if none is
+def levelError(tolerance):
+    for error in reversed(LEVELS):
+        if(error <= tolerance):
+            return error
+    return LEVELS[0]
+
+
+# Returns the Level of the fitting with one of the LEVELS errors, built on the first request and cached
+def _level(fittingType, clearance, hole, error):
+    dims = spec.fittingDims(fittingType, clearance, hole)
+    key = (fittingType, dims.clearance, dims.hole, error)
+    result = _levels.get(key)
+    if(result is None):
+        segments, sectionPoints = resolution(fittingType, dims.clearance, dims.hole, error)
+        body, cut = mesh.fittingMesh(fittingType, dims.clearance, dims.hole, segments, sectionPoints=sectionPoints)
+        result = Level(error, segments, sectionPoints, body, cut)
+        _levels.put(key, result)
+    return result
+
+
+# Returns all Levels of the fitting, finest first
+def levels(fittingType, clearance, hole):
+    return tuple(_level(fittingType, clearance, hole, error) for error in LEVELS)
+
+
+# Returns the coarsest Level within the tolerance, the finest one if none is
+def level(fittingType, clearance, hole, tolerance):
+    return _level(fittingType, clearance, hole, levelError(tolerance))
+
+
+# Returns the (body, cut) meshes of level(), like mesh.fittingMesh
+def fittingMesh(fittingType, clearance, hole, tolerance):
+    result = level(fittingType, clearance, hole, tolerance)
+    return result.body, result.cut
+
+
+def clear():
+    _levels.clear()
+
+
+def stats():
+    return _levels.stats()
@@ -0,0 +1,395 @@
+# Triangle meshes of the luer fittings, used for the command preview.
+# Pure Python so it runs inside Fusion's bundled interpreter and can be benchmarked anywhere.
+# With arrays=True the tessellation runs on NumPy arrays instead, with the same vertices and triangles in the same order.
+# luer.export asks for that when NumPy is installed, the add-in's preview never does, so it doesn't import NumPy at startup.
+#
+# All coordinates are in cm (Fusion's internal unit).
+# The fitting axis is +Z, the fitting plane is Z=0 and the center point is the origin.
+
+import math
+from functools import lru_cache
+
+from . import spec
+
+
+# Version of the meshes this module generates, part of the keys of meshes cached on disk (see luer.store).
+# Bump it with every change to the geometry, so no session picks up meshes of an older version.
+GEOMETRY_VERSION = 2
+
+
+# Indexed triangle mesh
+# coords holds x, y, z of every vertex, indices holds three vertex indices per triangle.
+class Mesh:
+    __slots__ = ("coords", "indices")
+
+    def __init__(self):
+        self.coords = []
+        self.indices = []
+
+    @property
+    def vertexCount(self):
+        return len(self.coords) // 3
+
+    @property
+    def triangleCount(self):
+        return len(self.indices) // 3
+
+    # Appends all vertices and triangles of another mesh
+    def extend(self, other):
+        offset = self.vertexCount
+        self.coords.extend(other.coords)
+        self.indices.extend([i + offset for i in other.indices])
+
+    # Returns one unit normal per triangle as a flat x, y, z list
+    def faceNormals(self, arrays=False):
+        if(arrays):
+            return _faceNormalArrays(self.coords, self.indices).ravel().tolist()
+
+        c = self.coords
+        normals = []
+        for a, b, d in zip(self.indices[0::3], self.indices[1::3], self.indices[2::3]):
+            ax, ay, az = c[3*a], c[3*a+1], c[3*a+2]
+            ux, uy, uz = c[3*b] - ax, c[3*b+1] - ay, c[3*b+2] - az
+            vx, vy, vz = c[3*d] - ax, c[3*d+1] - ay, c[3*d+2] - az
+            nx, ny, nz = uy*vz - uz*vy, uz*vx - ux*vz, ux*vy - uy*vx
+            length = math.sqrt(nx*nx + ny*ny + nz*nz) or 1.0
+            normals.extend((nx / length, ny / length, nz / length))
+        return normals
+
+
+# Same as Mesh.faceNormals on NumPy arrays, returns a (triangles, 3) array
+def _faceNormalArrays(coords, indices):
+    import numpy
+
+    c = numpy.asarray(coords, dtype=float).reshape(-1, 3)
+    triangles = numpy.asarray(indices, dtype=numpy.intp).reshape(-1, 3)
+    a = c[triangles[:, 0]]
+    normals = numpy.cross(c[triangles[:, 1]] - a, c[triangles[:, 2]] - a)
+    length = numpy.sqrt((normals * normals).sum(axis=1))
+    length[length == 0] = 1.0
+    return normals / length[:, None]
+
+
+# Describes everything needed to tessellate a fitting
+# body and cut are lists of closed (r, z) loops, counter clockwise, revolved around the Z axis.
+# wings are (thread, z0, z1) tuples, the crosssections of the ThreadSpec get swept from z0 to z1.
+class FittingGeometry:
+    __slots__ = ("body", "cut", "wings")
+
+    def __init__(self, body, cut, wings):
+        self.body = body
+        self.cut = cut
+        self.wings = wings
+
+
+# Returns the FittingGeometry of the fitting type in the same shape the add-in builds it
+def fittingGeometry(fittingType, clearance, hole):
+    return dimsGeometry(spec.fittingDims(fittingType, clearance, hole))
+
+
+# Returns the FittingGeometry of the FittingDims, with array dimensions (see spec.computeDims) the loops hold arrays
+def dimsGeometry(dims):
+    fitting = dims.spec
+    thread = fitting.thread
+
+    if(fitting.kind in ["male", "maleInternal"]):
+        taper = [
+            (dims.holeRadius, dims.taperZ0),
+            (dims.taperStartRadius, dims.taperZ0),
+            (dims.taperEndRadius, dims.taperZ1),
+            (dims.holeRadius, dims.taperZ1)
+        ]
+        if(thread is None):
+            return FittingGeometry([taper], [], [])
+
+        z0 = -thread.length if fitting.kind == "maleInternal" else 0
+        wings = [(thread, z0, z0 + thread.length)]
+
+        if(fitting.kind == "male"):
+            collar = [
+                (fitting.collarInnerRadius, 0),
+                (fitting.collarOuterRadius, 0),
+                (fitting.collarOuterRadius, thread.length),
+                (fitting.collarInnerRadius, thread.length)
+            ]
+            return FittingGeometry([taper, collar], [], wings)
+
+        recess = [(0, z0), (fitting.collarInnerRadius, z0), (fitting.collarInnerRadius, 0), (0, 0)]
+        return FittingGeometry([taper], [recess], wings)
+
+    if(fitting.kind == "femaleInternal"):
+        socket = [(0, dims.taperZ1), (dims.taperEndRadius, dims.taperZ1), (dims.taperStartRadius, 0), (0, 0)]
+        return FittingGeometry([], [socket], [])
+
+    socket = [
+        (dims.taperStartRadius, 0),
+        (dims.outerRadius, 0),
+        (dims.outerRadius, dims.taperZ1),
+        (dims.taperEndRadius, dims.taperZ1)
+    ]
+    wings = []
+    if(thread is not None):
+        wings = [(thread, 0, thread.length)]
+    return FittingGeometry([socket], [], wings)
+
+
+# Samples an arc given by center, start point and sweep angle (radians) with n+1 points
+def arcPoints(center, start, sweep, n):
+    cx, cy = center
+    radius = math.hypot(start[0] - cx, start[1] - cy)
+    angle = math.atan2(start[1] - cy, start[0] - cx)
+    return [(cx + radius * math.cos(angle + sweep * i / n), cy + radius * math.sin(angle + sweep * i / n)) for i in range(n + 1)]
+
+
+# Builds the crosssection loop of a thread wing from the same arcs the add-in sketches.
+# The flank arcs are clipped at the ring radius, the surface of the tube the wing sits on.
+def threadSection(thread, n=8):
+    ringRadius = thread.ringRadius
+    odArc = arcPoints((0, 0), thread.odArcOffset, thread.odArcSweep, n)
+    flank1 = arcPoints(thread.csa1Offset, odArc[0], -thread.csaSweep, n)
+    flank2 = arcPoints(thread.csa2Offset, odArc[-1], thread.csaSweep, n)
+
+    # Wings inside a tube have to stay within it, wings outside of it have to stay outside
+    # The flanks end where they cross the tube surface, projecting the points beyond it would fold the loop.
+    inside = math.hypot(*thread.odArcOffset) < ringRadius
+    def truncate(flank):
+        for i in range(1, len(flank)):
+            r = math.hypot(*flank[i])
+            if((r > ringRadius) if inside else (r < ringRadius)):
+                (x0, y0), (x1, y1) = flank[i - 1], flank[i]
+                r0 = math.hypot(x0, y0)
+                t = (ringRadius - r0) / (r - r0)
+                x, y = x0 + t * (x1 - x0), y0 + t * (y1 - y0)
+                rc = math.hypot(x, y)
+                return flank[:i] + [(x * ringRadius / rc, y * ringRadius / rc)]
+        return flank
+    flank1 = truncate(flank1)
+    flank2 = truncate(flank2)
+
+    # Closes the loop along the tube surface
+    a0 = math.atan2(flank2[-1][1], flank2[-1][0])
+    a1 = math.atan2(flank1[-1][1], flank1[-1][0])
+    sweep = (a1 - a0 + math.pi) % (2 * math.pi) - math.pi
+    ring = arcPoints((0, 0), (ringRadius * math.cos(a0), ringRadius * math.sin(a0)), sweep, n)
+
+    loop = []
+    for p in odArc + flank2[1:] + ring[1:-1] + flank1[::-1]:
+        if(not loop or math.hypot(p[0] - loop[-1][0], p[1] - loop[-1][1]) > 1e-9):
+            loop.append(p)
+    if(math.hypot(loop[0][0] - loop[-1][0], loop[0][1] - loop[-1][1]) <= 1e-9):
+        loop.pop()
+
+    if(signedArea(loop) < 0):
+        loop.reverse()
+    return tuple(loop)
+
+
+# Both wing sections of a thread, the second one mirrored through the axis
+@lru_cache(maxsize=None)
+def threadSections(thread, n=8):
+    section = threadSection(thread, n)
+    return (section, tuple((-x, -y) for x, y in section))
+
+
+# Arcs the add-in sketches the crosssection of both wings from, relative to the fitting center
+# Per wing (outer arc start, outer arc sweep, flank 1 center, flank 1 sweep, flank 2 center, flank 2 sweep).
+# The outer arc is centered on the axis, the flanks start at its start and end point.
+@lru_cache(maxsize=None)
+def threadSectionArcs(thread):
+    wings = []
+    for s in (1, -1):
+        wings.append((
+            (s * thread.odArcOffset[0], s * thread.odArcOffset[1]),
+            thread.odArcSweep,
+            (s * thread.csa1Offset[0], s * thread.csa1Offset[1]),
+            -thread.csaSweep,
+            (s * thread.csa2Offset[0], s * thread.csa2Offset[1]),
+            thread.csaSweep
+        ))
+    return tuple(wings)
+
+
+def signedArea(loop):
+    return sum(p[0] * q[1] - q[0] * p[1] for p, q in zip(loop, loop[1:] + loop[:1])) / 2
+
+
+# Triangulates a simple counter clockwise polygon by ear clipping
+@lru_cache(maxsize=64)
+def triangulate(loop):
+    remaining = list(range(len(loop)))
+    triangles = []
+
+    def isEar(i, j, k):
+        (ax, ay), (bx, by), (cx, cy) = loop[i], loop[j], loop[k]
+        if((bx - ax) * (cy - ay) - (by - ay) * (cx - ax) <= 0):
+            return False
+        for m in remaining:
+            if(m in (i, j, k)):
+                continue
+            px, py = loop[m]
+            if((bx - ax) * (py - ay) - (by - ay) * (px - ax) >= 0 and
+               (cx - bx) * (py - by) - (cy - by) * (px - bx) >= 0 and
+               (ax - cx) * (py - cy) - (ay - cy) * (px - cx) >= 0):
+                return False
+        return True
+
+    while(len(remaining) > 3):
+        for n in range(len(remaining)):
+            i, j, k = remaining[n - 1], remaining[n], remaining[(n + 1) % len(remaining)]
+            if(isEar(i, j, k)):
+                triangles.append((i, j, k))
+                del remaining[n]
+                break
+        else:
+            # Numerically degenerate rest, closes it with a fan
+            triangles.extend((remaining[0], remaining[n], remaining[n + 1]) for n in range(1, len(remaining) - 1))
+            return tuple(triangles)
+    triangles.append(tuple(remaining))
+    return tuple(triangles)
+
+
+# Revolves a closed counter clockwise (r, z) loop around the Z axis
+def revolveLoop(loop, segments, arrays=False):
+    if(arrays):
+        return _revolveLoopArrays(loop, segments)
+
+    mesh = Mesh()
+    angles = [2 * math.pi * i / segments for i in range(segments)]
+    cos = [math.cos(a) for a in angles]
+    sin = [math.sin(a) for a in angles]
+
+    # Every loop point becomes a ring of vertices, points on the axis a single pole vertex
+    rings = []
+    for r, z in loop:
+        start = mesh.vertexCount
+        if(r <= 1e-12):
+            mesh.coords.extend((0.0, 0.0, z))
+            rings.append([start] * segments)
+        else:
+            for c, s in zip(cos, sin):
+                mesh.coords.extend((r * c, r * s, z))
+            rings.append(list(range(start, start + segments)))
+
+    for (p, q), (rp, _), (rq, _) in zip(zip(rings, rings[1:] + rings[:1]), loop, loop[1:] + loop[:1]):
+        for i in range(segments):
+            j = (i + 1) % segments
+            if(rp > 1e-12):
+                mesh.indices.extend((p[i], p[j], q[j]))
+            if(rq > 1e-12):
+                mesh.indices.extend((p[i], q[j], q[i]))
+    return mesh
+
+
+# Same as revolveLoop on NumPy arrays
+def _revolveLoopArrays(loop, segments):
+    import numpy
+
+    r, z = numpy.array(loop, dtype=float).T
+    angles = 2 * numpy.pi * numpy.arange(segments) / segments
+    pole = r <= 1e-12
+
+    # One row of segments vertices per loop point, of which poles keep only the first
+    shape = (len(loop), segments)
+    ring = numpy.empty(shape + (3,))
+    ring[:, :, 0] = r[:, None] * numpy.cos(angles)
+    ring[:, :, 1] = r[:, None] * numpy.sin(angles)
+    ring[:, :, 2] = z[:, None]
+    ring[pole, :, :2] = 0.0
+    keep = numpy.ones(shape, dtype=bool)
+    keep[pole, 1:] = False
+
+    counts = numpy.where(pole, 1, segments)
+    starts = numpy.concatenate(([0], numpy.cumsum(counts)[:-1]))
+    rings = starts[:, None] + numpy.where(pole[:, None], 0, numpy.arange(segments))
+
+    # Per edge of the loop and segment two triangles, without the ones collapsing at a pole
+    p, q = rings, numpy.roll(rings, -1, axis=0)
+    pj, qj = numpy.roll(p, -1, axis=1), numpy.roll(q, -1, axis=1)
+    triangles = numpy.stack((numpy.stack((p, pj, qj), axis=-1), numpy.stack((p, qj, q), axis=-1)), axis=2)
+    used = numpy.stack((numpy.broadcast_to(~pole[:, None], shape), numpy.broadcast_to(~numpy.roll(pole, -1)[:, None], shape)), axis=-1)
+
+    mesh = Mesh()
+    mesh.coords = ring[keep].ravel().tolist()
+    mesh.indices = triangles[used].ravel().tolist()
+    return mesh
+
+
+# Sweeps a closed counter clockwise (x, y) loop from z0 to z1 while rotating it by twist radians
+def twistLoop(loop, z0, z1, twist, segments, arrays=False):
+    slices = max(1, int(math.ceil(abs(twist) / (2 * math.pi) * segments)))
+    if(arrays):
+        return _twistLoopArrays(loop, z0, z1, twist, slices)
+
+    mesh = Mesh()
+    n = len(loop)
+
+    for k in range(slices + 1):
+        a = twist * k / slices
+        c, s = math.cos(a), math.sin(a)
+        z = z0 + (z1 - z0) * k / slices
+        for x, y in loop:
+            mesh.coords.extend((x * c - y * s, x * s + y * c, z))
+
+    for k in range(slices):
+        bottom, top = k * n, (k + 1) * n
+        for i in range(n):
+            j = (i + 1) % n
+            mesh.indices.extend((bottom + i, bottom + j, top + j, bottom + i, top + j, top + i))
+
+    # End caps, the bottom one facing down
+    top = slices * n
+    for i, j, k in triangulate(tuple(loop)):
+        mesh.indices.extend((k, j, i, top + i, top + j, top + k))
+    return mesh
+
+
+# Same as twistLoop on NumPy arrays, with the number of slices already picked
+def _twistLoopArrays(loop, z0, z1, twist, slices):
+    import numpy
+
+    x, y = numpy.array(loop, dtype=float).T
+    n = len(loop)
+    k = numpy.arange(slices + 1)
+    a = twist * k / slices
+    c, s = numpy.cos(a)[:, None], numpy.sin(a)[:, None]
+
+    coords = numpy.empty((slices + 1, n, 3))
+    coords[:, :, 0] = x * c - y * s
+    coords[:, :, 1] = x * s + y * c
+    coords[:, :, 2] = (z0 + (z1 - z0) * k / slices)[:, None]
+
+    bottom = (k[:-1] * n)[:, None] + numpy.arange(n)
+    j = (k[:-1] * n)[:, None] + numpy.roll(numpy.arange(n), -1)
+    sides = numpy.stack((bottom, j, j + n, bottom, j + n, bottom + n), axis=-1)
+
+    # End caps, the bottom one facing down
+    caps = numpy.array(triangulate(tuple(loop)), dtype=numpy.intp).reshape(-1, 3)
+    caps = numpy.concatenate((caps[:, ::-1], caps + slices * n), axis=1)
+
+    mesh = Mesh()
+    mesh.coords = coords.ravel().tolist()
+    mesh.indices = sides.ravel().tolist() + caps.ravel().tolist()
+    return mesh
+
+
+# Returns a (body, cut) pair of meshes for the fitting.
+# body is the material the fitting adds, cut the material it removes from the existing body.
+# Without wings the thread is left out, which is by far the most expensive part to tessellate.
+# sectionPoints sets the segments per arc of the wing crosssection, see luer.lod for picking both from an error.
+# arrays=True tessellates with NumPy, see the top of this module.
+def fittingMesh(fittingType, clearance, hole, segments=48, wings=True, sectionPoints=None, arrays=False):
+    geometry = fittingGeometry(fittingType, clearance, hole)
+
+    body = Mesh()
+    for loop in geometry.body:
+        body.extend(revolveLoop(loop, segments, arrays))
+    for thread, z0, z1 in (geometry.wings if wings else ()):
+        # By default the arcs of the crosssection get about as fine as the segments around the axis
+        for section in threadSections(thread, sectionPoints or max(4, segments // 6)):
+            body.extend(twistLoop(list(section), z0, z1, thread.twist, segments, arrays))
+
+    cut = Mesh()
+    for loop in geometry.cut:
+        cut.extend(revolveLoop(loop, segments, arrays))
+
+    return body, cut
@@ -0,0 +1,88 @@
+# Names and expressions of the user parameters driving the fittings built with them.
+#
+# The taper and hole circles of such fittings get sketch dimensions, and their taper extrudes distances,
+# that reference user parameters named after a prefix instead of holding literal values:
+#     <prefix>Clearance                                 diametral clearance
+#     <prefix>Hole                                      hole diameter of male fittings
+#     <prefix>MaleTaperLength, <prefix>FemaleTaperLength
+# All fittings built with the same prefix and values share them, so editing one of them updates every fitting in a
+# single recompute. Parameters already driving fittings are never changed: fittings built with other values get the
+# prefix with the next free index, see indexedPrefix. Values are in cm like everything else in luer, the expressions
+# are written in mm and deg as Fusion shows them.
+
+import math
+import re
+
+from . import spec
+
+
+DEFAULT_PREFIX = "luer"
+
+# Fusion parameter names start with a letter or underscore
+PARAMETER_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# Full taper angle, its tangent is spec.TAN_TAPER_ANGLE
+TAPER_ANGLE_EXPRESSION = "{:g} deg".format(round(math.degrees(2 * spec.TAPER_HALF_ANGLE), 6))
+
+
+class UserParameter(spec.Record):
+    __slots__ = ("name", "expression", "unit", "comment")
+
+
+def isValidPrefix(prefix):
+    return bool(PARAMETER_NAME.match(prefix))
+
+
+# Prefix of the index-th set of parameters built with prefix, the first set has the prefix itself
+def indexedPrefix(prefix, index):
+    return prefix if index == 0 else "{}_{}".format(prefix, index + 1)
+
+
+def _mm(value):
+    return "{:g} mm".format(round(value * 10, 6))
+
+
+def _names(prefix, dims):
+    side = "Male" if dims.spec.kind in ["male", "maleInternal"] else "Female"
+    return prefix + "Clearance", prefix + "Hole", prefix + side + "TaperLength"
+
+
+# Returns the UserParameters the fitting references, set to the values it's built with.
+# Female fittings have no hole to reference.
+def userParameters(prefix, dims):
+    clearance, hole, taperLength = _names(prefix, dims)
+    result = [
+        UserParameter(clearance, _mm(dims.clearance), "mm", "Diametral clearance of the luer fittings"),
+        UserParameter(taperLength, _mm(dims.spec.taperLength), "mm", "Taper length of the luer fittings"),
+    ]
+    if(holeDiameterExpression(prefix, dims)):
+        result.append(UserParameter(hole, _mm(dims.hole), "mm", "Hole diameter of the male luer fittings"))
+    return result
+
+
+# Expression of the taper diameter at the sketch plane, 2 * dims.taperStartRadius, see spec.fittingDims
+def taperDiameterExpression(prefix, dims):
+    clearance, _, taperLength = _names(prefix, dims)
+    diameter = _mm(dims.spec.taperDiameter)
+    if(dims.spec.kind in ["male", "maleInternal"]):
+        return "{} + tan({}) * {} - {}".format(diameter, TAPER_ANGLE_EXPRESSION, taperLength, clearance)
+    if(dims.spec.kind == "femaleInternal"):
+        return "{} + {}".format(diameter, clearance)
+    return "{} - tan({}) * {} + {}".format(diameter, TAPER_ANGLE_EXPRESSION, taperLength, clearance)
+
+
+# Expression of the hole diameter, None for fittings without a hole
+def holeDiameterExpression(prefix, dims):
+    if(dims.spec.kind not in ["male", "maleInternal"]):
+        return None
+    return _names(prefix, dims)[1]
+
+
+# Expression of an extrude distance (in cm) if it's the taper length, None if it's any other length
+def lengthExpression(prefix, dims, distance):
+    taperLength = _names(prefix, dims)[2]
+    if(abs(distance - dims.spec.taperLength) < 1e-9):
+        return taperLength
+    if(abs(distance + dims.spec.taperLength) < 1e-9):
+        return "-" + taperLength
+    return None
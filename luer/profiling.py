@@ -0,0 +1,91 @@
+# Per stage timing of the add-in's hot paths.
+#
+#     with profiling.stage("extrudeFeatures.add"):
+#         ...
+#
+# Durations are aggregated per stage for the whole session. While disabled, stage() returns a
+# shared no-op context manager, so instrumented code only pays for one function call.
+
+import math
+import time
+
+
+enabled = False
+
+# Durations in seconds by stage name
+_durations = {}
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _durations.setdefault(self.name, []).append(time.perf_counter() - self.start)
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+# Returns a context manager timing the stage, if profiling is enabled
+def stage(name):
+    if(enabled):
+        return _Stage(name)
+    return _NO_STAGE
+
+
+def reset():
+    _durations.clear()
+
+
+def _percentile(sortedValues, p):
+    index = max(0, int(math.ceil(p / 100 * len(sortedValues))) - 1)
+    return sortedValues[index]
+
+
+# Returns count, total, p50, p95 and max (in ms) of every stage
+def summary():
+    result = {}
+    for name, durations in _durations.items():
+        values = sorted(durations)
+        result[name] = {
+            "count": len(values),
+            "total": sum(values) * 1000,
+            "p50": _percentile(values, 50) * 1000,
+            "p95": _percentile(values, 95) * 1000,
+            "max": values[-1] * 1000,
+        }
+    return result
+
+
+# Returns the summary as a text table, slowest stage first
+def formatSummary():
+    lines = ["{:<32}{:>8}{:>12}{:>10}{:>10}{:>10}".format("stage", "count", "total ms", "p50 ms", "p95 ms", "max ms")]
+    for name, s in sorted(summary().items(), key=lambda item: -item[1]["total"]):
+        lines.append("{:<32}{:>8}{:>12.2f}{:>10.2f}{:>10.2f}{:>10.2f}".format(name, s["count"], s["total"], s["p50"], s["p95"], s["max"]))
+    return "\n".join(lines)
+
+
+# Writes the summary to a JSON file
+def dump(path):
+    # Imported here, the add-in imports this module at startup but rarely dumps
+    import json
+    with open(path, "w") as f:
+        json.dump(summary(), f, indent=4, sort_keys=True)
@@ -0,0 +1,218 @@
+# Volume, surface area and mass of fittings from their closed form, without building a mesh or a body.
+#
+# Usage: python -m luer.properties [--types TYPE ...] [--clearance MM] [--hole MM] [--density G/CM3] [--check]
+#
+# The revolved parts are the (r, z) loops of mesh.fittingGeometry, their volume and area follow from
+# Pappus' theorems. A thread wing is its crosssection swept along a helix: its volume is the section area
+# times the length, its side area the integral over the boundary of sqrt(|p'|^2 + w^2 (p.p')^2), with w the
+# twist per length. The wing terms only depend on the ThreadSpec and get computed once.
+#
+# Like export.exportMesh the part of a fitting is its body, or the cut for types that only remove material.
+# Lengths are in cm, densities in g/cm^3 and masses in g.
+#
+# With NumPy installed properties evaluates all variants of a fitting type at once as arrays,
+# without it fitting by fitting.
+
+import argparse
+import math
+import numbers
+from functools import lru_cache
+
+from . import mesh, spec
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Densities of common printing materials in g/cm^3
+DENSITIES = {
+    "PLA": 1.24,
+    "PETG": 1.27,
+    "ABS": 1.04,
+    "Resin": 1.18,
+}
+
+# Points per arc of the wing crosssection the side area gets integrated over
+WING_SECTION_POINTS = 256
+
+
+class Properties(spec.Record):
+    __slots__ = ("volume", "area", "mass")
+
+
+# Volume of a closed (r, z) loop revolved around the z axis
+def revolvedVolume(loop):
+    total = 0
+    for (r0, z0), (r1, z1) in zip(loop, loop[1:] + loop[:1]):
+        total += (r0 + r1) * (r0 * z1 - r1 * z0)
+    return abs(total) * math.pi / 3
+
+
+# Surface area of a closed (r, z) loop revolved around the z axis, every edge sweeps a frustum
+# For loops holding arrays of coordinates hypot is numpy.hypot.
+def revolvedArea(loop, hypot=math.hypot):
+    total = 0
+    for (r0, z0), (r1, z1) in zip(loop, loop[1:] + loop[:1]):
+        total += (r0 + r1) * hypot(r1 - r0, z1 - z0)
+    return total * math.pi
+
+
+# Returns (section area, side area, contact area) of one wing over the full thread length.
+# The contact area is the strip the wing shares with the tube at ringRadius, included in the side area.
+@lru_cache(maxsize=None)
+def wingProperties(thread):
+    section = mesh.threadSection(thread, WING_SECTION_POINTS)
+    w = thread.twist / thread.length
+
+    side = 0
+    contact = 0
+    for (x0, y0), (x1, y1) in zip(section, section[1:] + section[:1]):
+        dx, dy = x1 - x0, y1 - y0
+        dd = dx * dx + dy * dy
+
+        # Simpson's rule over the straight edge p(t) = p0 + t d, where p.p' = p0.d + t |d|^2
+        pd = x0 * dx + y0 * dy
+        f = [math.sqrt(dd + (w * (pd + t * dd)) ** 2) for t in (0, 0.5, 1)]
+        length = (f[0] + 4 * f[1] + f[2]) / 6 * thread.length
+        side += length
+
+        if(abs(math.hypot(x0, y0) - thread.ringRadius) < 1e-9 and abs(math.hypot(x1, y1) - thread.ringRadius) < 1e-9):
+            contact += length
+
+    return abs(mesh.signedArea(section)), side, contact
+
+
+# Returns the (loops, wings, ring radius the wings share a surface with or None) of the fitting's part
+def partGeometry(fittingType, clearance, hole):
+    geometry = mesh.fittingGeometry(fittingType, clearance, hole)
+    if(not geometry.body):
+        return geometry.cut, [], None
+
+    ring = None
+    for thread, z0, z1 in geometry.wings:
+        for loop in geometry.body:
+            if(sum(1 for r, z in loop if abs(r - thread.ringRadius) < 1e-9) >= 2):
+                ring = thread.ringRadius
+    return geometry.body, geometry.wings, ring
+
+
+# Returns (volume, area) of the part given by partGeometry
+def partVolumeArea(loops, wings, ring, hypot=math.hypot):
+    volume = sum(revolvedVolume(loop) for loop in loops)
+    area = sum(revolvedArea(loop, hypot) for loop in loops)
+    for thread, z0, z1 in wings:
+        sectionArea, sideArea, contactArea = wingProperties(thread)
+        # Two wings, each with two end caps
+        volume += 2 * sectionArea * thread.length
+        area += 2 * (2 * sectionArea + sideArea)
+        if(ring is not None):
+            # Neither the wing nor the tube show on the strip they share
+            area -= 4 * contactArea
+    return volume, area
+
+
+def fittingProperties(fittingType, clearance, hole, density=1.0):
+    volume, area = partVolumeArea(*partGeometry(fittingType, clearance, hole))
+    return Properties(volume, area, volume * density)
+
+
+# True for a single type, clearance or hole, including NumPy scalars and zero dimensional arrays
+def isScalar(values):
+    return isinstance(values, (str, numbers.Number)) or (numpy is not None and numpy.ndim(values) == 0)
+
+
+# Returns the Properties of every (type, clearance, hole), given as equally long sequences.
+# Scalars are used for every fitting, with nothing but scalars that's a single one.
+def properties(fittingTypes, clearances, holes, density=1.0):
+    count = max((len(values) for values in (fittingTypes, clearances, holes) if not isScalar(values)), default=1)
+    if(numpy is not None):
+        return _propertiesArrays(fittingTypes, clearances, holes, density, count)
+
+    def sequence(values):
+        return [values] * count if isScalar(values) else values
+    return [
+        fittingProperties(fittingType, clearance, hole, density)
+        for fittingType, clearance, hole in zip(sequence(fittingTypes), sequence(clearances), sequence(holes))
+    ]
+
+
+# Same as properties, with all fittings of one type evaluated as arrays of dimensions
+# The loops and wings only change in their dimensions with clearance and hole, not in their shape.
+def _propertiesArrays(fittingTypes, clearances, holes, density, count):
+    types = numpy.broadcast_to(numpy.asarray(fittingTypes, dtype=str), (count,))
+    clearances = numpy.round(numpy.broadcast_to(numpy.asarray(clearances, dtype=float), (count,)), 9)
+    holes = numpy.round(numpy.broadcast_to(numpy.asarray(holes, dtype=float), (count,)), 9)
+
+    volumes = numpy.empty(count)
+    areas = numpy.empty(count)
+    for fittingType in numpy.unique(types).tolist():
+        chosen = types == fittingType
+        c, h = clearances[chosen], holes[chosen]
+        geometry = mesh.dimsGeometry(spec.computeDims(fittingType, c, h))
+        loops, wings, ring = partGeometry(fittingType, float(c[0]), float(h[0]))
+        volumes[chosen], areas[chosen] = partVolumeArea(geometry.body or geometry.cut, wings, ring, numpy.hypot)
+
+    return [Properties(volume, area, volume * density) for volume, area in zip(volumes.tolist(), areas.tolist())]
+
+
+# Returns (volume, area) of a closed mesh
+# The area is the sum of all triangles, including faces parts share with each other.
+def meshVolumeArea(fittingMesh):
+    c = fittingMesh.coords
+    volume = 0
+    area = 0
+    for a, b, d in zip(fittingMesh.indices[0::3], fittingMesh.indices[1::3], fittingMesh.indices[2::3]):
+        ax, ay, az = c[3*a], c[3*a+1], c[3*a+2]
+        bx, by, bz = c[3*b], c[3*b+1], c[3*b+2]
+        dx, dy, dz = c[3*d], c[3*d+1], c[3*d+2]
+        volume += ax * (by * dz - bz * dy) + ay * (bz * dx - bx * dz) + az * (bx * dy - by * dx)
+        ux, uy, uz = bx - ax, by - ay, bz - az
+        vx, vy, vz = dx - ax, dy - ay, dz - az
+        area += math.sqrt((uy*vz - uz*vy) ** 2 + (uz*vx - ux*vz) ** 2 + (ux*vy - uy*vx) ** 2)
+    return abs(volume) / 6, area / 2
+
+
+# Returns the relative (volume, area) differences between the closed form and the export mesh
+def checkAgainstMesh(fittingType, clearance, hole, segments=192):
+    from . import export
+
+    analytic = fittingProperties(fittingType, clearance, hole)
+    volume, area = meshVolumeArea(export.exportMesh(fittingType, clearance, hole, segments))
+
+    # The mesh keeps the faces wings and tube share, see fittingProperties
+    loops, wings, ring = partGeometry(fittingType, clearance, hole)
+    if(ring is not None):
+        area -= sum(4 * wingProperties(thread)[2] for thread, z0, z1 in wings)
+
+    return (volume - analytic.volume) / analytic.volume, (area - analytic.area) / analytic.area
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prints volume, surface area and mass of luer fittings.")
+    parser.add_argument("--types", nargs="+", choices=spec.FITTING_TYPES, default=spec.FITTING_TYPES, metavar="TYPE")
+    parser.add_argument("--clearance", type=float, default=0.0, help="diametral clearance in mm")
+    parser.add_argument("--hole", type=float, default=2.25, help="hole diameter of male fittings in mm")
+    parser.add_argument("--density", default="PLA", help="g/cm^3 or one of " + ", ".join(DENSITIES))
+    parser.add_argument("--check", action="store_true", help="compare against the export mesh")
+    args = parser.parse_args()
+
+    density = DENSITIES[args.density] if args.density in DENSITIES else float(args.density)
+    clearance = args.clearance / 10
+    hole = args.hole / 10
+
+    header = "{:<24}{:>12}{:>12}{:>10}".format("type", "volume mm3", "area mm2", "mass g")
+    if(args.check):
+        header += "{:>14}{:>14}".format("volume error", "area error")
+    print(header)
+
+    for fittingType, result in zip(args.types, properties(args.types, clearance, hole, density)):
+        line = "{:<24}{:>12.2f}{:>12.2f}{:>10.3f}".format(fittingType, result.volume * 1000, result.area * 100, result.mass)
+        if(args.check):
+            line += "{:>14.3%}{:>14.3%}".format(*checkAgainstMesh(fittingType, clearance, hole))
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
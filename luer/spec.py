@@ -0,0 +1,147 @@
+# Dimensions of the luer fittings.
+#
+# Every fitting type is a FittingSpec in SPECS, derived dimensions for a given clearance and hole
+# are computed by fittingDims. Lengths are in cm and angles in radians, Fusion's internal units.
+#
+# The builders of the add-in and the mesh generator are picked by FittingSpec.kind:
+#     male            taper on the plane, optional threaded collar around it
+#     maleInternal    taper sunk into the plane, with the threaded collar recessed into the body
+#     female          socket on the plane, optional thread wings around it
+#     femaleInternal  socket cut into the body below the plane
+# Adding a connector variant of one of those kinds only needs a new entry in SPECS.
+
+import math
+from functools import lru_cache
+
+
+# Half angle of the 6% luer taper
+TAPER_HALF_ANGLE = math.radians(1.72)
+TAN_TAPER_HALF_ANGLE = math.tan(TAPER_HALF_ANGLE)
+TAN_TAPER_ANGLE = math.tan(math.radians(3.44))
+
+
+# Immutable record with __slots__, the base of all spec tables
+class Record:
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        values = dict(zip(self.__slots__, args))
+        values.update(kwargs)
+        for name in self.__slots__:
+            object.__setattr__(self, name, values.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    # Pickles by the constructor arguments, e.g. for worker processes, as restoring slots would set them
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, ", ".join("{}={!r}".format(name, getattr(self, name)) for name in self.__slots__))
+
+
+# Crosssection and sweep of a pair of thread wings
+# The offsets are 2D vectors from the fitting center, the second wing is the first one mirrored through it.
+# ringRadius is the radius of the tube surface the wings sit on.
+class ThreadSpec(Record):
+    __slots__ = ("odArcOffset", "csa1Offset", "csa2Offset", "odArcSweep", "csaSweep", "ringRadius", "length", "twist")
+
+
+class FittingSpec(Record):
+    __slots__ = (
+        "name",
+        "kind",
+        # Nominal taper diameter, at the tip for male and at the opening for female fittings
+        "taperDiameter",
+        "taperLength",
+        # Outside diameter of female sockets
+        "outerDiameter",
+        # Threaded collar of male lock fittings
+        "collarInnerRadius",
+        "collarOuterRadius",
+        "thread",
+    )
+
+
+MALE_THREAD = ThreadSpec(
+    odArcOffset=(0.142, 0.3207),
+    csa1Offset=(0.1417, -0.0159),
+    csa2Offset=(-0.1332, -0.0506),
+    odArcSweep=math.radians(42.4),
+    csaSweep=math.radians(23),
+    ringRadius=0.4,
+    length=0.55,
+    twist=math.radians(396),
+)
+
+FEMALE_THREAD = ThreadSpec(
+    odArcOffset=(-0.124, 0.3695),
+    csa1Offset=(-0.1487, 0.0435),
+    csa2Offset=(-0.0156, 0.1534),
+    odArcSweep=math.radians(42.4),
+    csaSweep=math.radians(22.8),
+    ringRadius=0.335,
+    length=0.9,
+    twist=math.radians(648),
+)
+
+# All fitting types, in the order they are listed in the command dialog
+SPECS = {spec.name: spec for spec in [
+    FittingSpec("Male Slip", "male", 0.4, 0.75),
+    FittingSpec("Male Lock", "male", 0.4, 0.75, None, 0.4, 0.5, MALE_THREAD),
+    FittingSpec("Male Lock (internal)", "maleInternal", 0.4, 0.75, None, 0.4, 0.5, MALE_THREAD),
+    FittingSpec("Female Slip", "female", 0.43, 0.9, 0.65),
+    FittingSpec("Female Slip (internal)", "femaleInternal", 0.43, 0.9),
+    FittingSpec("Female Lock", "female", 0.43, 0.9, 0.67, thread=FEMALE_THREAD),
+]}
+
+FITTING_TYPES = tuple(SPECS)
+
+
+# Dimensions of one fitting type for a given clearance and hole diameter
+# The taper runs from taperStart (radius at the sketch plane) to taperEnd, taperZ0 to taperZ1 along the axis.
+# taperExtrudeAngle is the signed taper angle of the extrude building it.
+class FittingDims(Record):
+    __slots__ = (
+        "spec",
+        "clearance",
+        "hole",
+        "holeRadius",
+        "taperStartRadius",
+        "taperEndRadius",
+        "taperZ0",
+        "taperZ1",
+        "taperExtrudeAngle",
+        "outerRadius",
+    )
+
+
+# Returns the memoized FittingDims of the fitting type
+def fittingDims(fittingType, clearance, hole):
+    return _fittingDims(fittingType, round(clearance, 9), round(hole, 9))
+
+
+# Returns the FittingDims without memoizing them.
+# The dimensions are plain arithmetic, so clearance and hole may also be NumPy arrays, giving arrays of dimensions.
+def computeDims(fittingType, clearance, hole):
+    spec = SPECS[fittingType]
+    length = spec.taperLength
+
+    if(spec.kind in ["male", "maleInternal"]):
+        start = (spec.taperDiameter + TAN_TAPER_ANGLE * length - clearance) / 2
+        end = start - TAN_TAPER_HALF_ANGLE * length
+        z0 = -spec.thread.length if spec.kind == "maleInternal" else 0
+        return FittingDims(spec, clearance, hole, hole / 2, start, end, z0, z0 + length, -TAPER_HALF_ANGLE)
+
+    if(spec.kind == "femaleInternal"):
+        start = (spec.taperDiameter + clearance) / 2
+        end = start - TAN_TAPER_HALF_ANGLE * length
+        return FittingDims(spec, clearance, hole, hole / 2, start, end, 0, -length, -TAPER_HALF_ANGLE)
+
+    start = (spec.taperDiameter - TAN_TAPER_ANGLE * length + clearance) / 2
+    end = start + TAN_TAPER_HALF_ANGLE * length
+    return FittingDims(spec, clearance, hole, hole / 2, start, end, 0, length, TAPER_HALF_ANGLE, spec.outerDiameter / 2)
+
+
+_fittingDims = lru_cache(maxsize=256)(computeDims)
@@ -0,0 +1,310 @@
+# Settings, presets and cached meshes kept on disk across sessions.
+#
+# Usage: python -m luer.store [--directory DIR] list | save NAME TYPE [--clearance MM] [--hole MM] | delete NAME | clear-cache
+#
+# DIRECTORY/settings.json holds the last used dialog settings and the named presets, DIRECTORY/cache the
+# content addressed cache: every entry is a file named after the hash of the parameters it was computed from,
+# e.g. the preview mesh of a fitting. The cache is bounded in bytes, least recently used entries go first.
+#
+# Every file is written to a temporary file and renamed over the old one, so a crash never leaves half a file.
+# Cache entries are only kept in memory when put, flush() writes them, e.g. once the command closes.
+# Cache keys include luer.mesh.GEOMETRY_VERSION, so meshes of an older generator are never used.
+# Both JSON files carry SCHEMA_VERSION. Settings of older versions get migrated by MIGRATIONS, the cache
+# of any other version is simply dropped, as everything in it can be computed again.
+# Lengths are in cm like everything else in luer, the command line takes and prints mm.
+
+import argparse
+import array
+import hashlib
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+
+from . import mesh, spec
+
+
+SCHEMA_VERSION = 1
+
+# Upgrades settings of version n to n + 1, by n
+MIGRATIONS = {}
+
+# Bytes of cached data kept on disk
+CACHE_BYTES = 64 * 2 ** 20
+
+# Bytes of cache entries waiting for flush(), beyond that the oldest of them are dropped
+PENDING_BYTES = 8 * 2 ** 20
+
+# Directory used if none is given, can be overridden with this environment variable
+DIRECTORY_ENV = "LUER_FITTINGS_STORE"
+DEFAULT_DIRECTORY = os.path.join("~", ".luerFittings")
+
+
+# A named set of dialog values, clearance and hole in cm
+class Preset(spec.Record):
+    __slots__ = ("type", "clearance", "hole")
+
+
+def defaultDirectory():
+    return os.path.expanduser(os.environ.get(DIRECTORY_ENV) or DEFAULT_DIRECTORY)
+
+
+# Replaces the file with data in one step
+def atomicWrite(path, data):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temporary = tempfile.mkstemp(dir=directory, prefix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+# Returns the JSON file as dict, None if it's missing or broken
+def _readJson(path):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+# Returns the hash of the parameters, the key of a cache entry
+def cacheKey(kind, *params):
+    return hashlib.sha256(json.dumps([SCHEMA_VERSION, mesh.GEOMETRY_VERSION, kind, params]).encode("utf-8")).hexdigest()
+
+
+# Returns the Preset of values read from the settings, None if they aren't one, e.g. after editing by hand
+def _preset(values):
+    if(not isinstance(values, dict) or values.get("type") not in spec.FITTING_TYPES):
+        return None
+    try:
+        return Preset(values["type"], float(values["clearance"]), float(values["hole"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+# Packs meshes into bytes, each as vertex count, index count, float64 coords and uint32 indices
+def packMeshes(meshes):
+    parts = [struct.pack("<I", len(meshes))]
+    for m in meshes:
+        coords = array.array("d", m.coords)
+        indices = array.array("I", m.indices)
+        if(sys.byteorder != "little"):
+            coords.byteswap()
+            indices.byteswap()
+        parts.append(struct.pack("<II", len(coords), len(indices)))
+        parts.append(coords.tobytes())
+        parts.append(indices.tobytes())
+    return b"".join(parts)
+
+
+def unpackMeshes(data):
+    (count,), offset = struct.unpack_from("<I", data), 4
+    meshes = []
+    for _ in range(count):
+        coordCount, indexCount = struct.unpack_from("<II", data, offset)
+        offset += 8
+        coords = array.array("d", data[offset:offset + 8 * coordCount])
+        offset += 8 * coordCount
+        indices = array.array("I", data[offset:offset + 4 * indexCount])
+        offset += 4 * indexCount
+        if(sys.byteorder != "little"):
+            coords.byteswap()
+            indices.byteswap()
+        m = mesh.Mesh()
+        m.coords = coords.tolist()
+        m.indices = indices.tolist()
+        meshes.append(m)
+    return meshes
+
+
+class Store:
+    def __init__(self, directory=None, maxCacheBytes=CACHE_BYTES):
+        self.directory = directory or defaultDirectory()
+        self.maxCacheBytes = maxCacheBytes
+        self.settingsPath = os.path.join(self.directory, "settings.json")
+        self.cacheDirectory = os.path.join(self.directory, "cache")
+        self.indexPath = os.path.join(self.cacheDirectory, "index.json")
+
+        self._settings = self._loadSettings()
+        # Size and time of last use of every cache entry by key
+        self._index = self._loadIndex()
+        self._indexChanged = False
+        # Data of the entries put since the last flush, oldest first
+        self._pending = {}
+
+    def _loadSettings(self):
+        settings = _readJson(self.settingsPath) or {}
+        version = settings.get("version", SCHEMA_VERSION)
+        while(version < SCHEMA_VERSION and version in MIGRATIONS):
+            settings = MIGRATIONS[version](settings)
+            version += 1
+        if(version != SCHEMA_VERSION):
+            settings = {}
+        settings["version"] = SCHEMA_VERSION
+        for key in ["last", "presets"]:
+            if(not isinstance(settings.get(key), dict)):
+                settings[key] = {}
+        return settings
+
+    def _loadIndex(self):
+        index = _readJson(self.indexPath)
+        if(index is None or index.get("version") != SCHEMA_VERSION):
+            return {}
+        return {key: entry for key, entry in index["entries"].items() if os.path.exists(self._entryPath(key))}
+
+    def _saveSettings(self):
+        atomicWrite(self.settingsPath, json.dumps(self._settings, indent=4, sort_keys=True).encode("utf-8"))
+
+    # Writes the entries put since the last flush and the cache index if it changed,
+    # the times of last use are only kept in memory until then
+    def flush(self):
+        if(self._pending):
+            for key, data in self._pending.items():
+                atomicWrite(self._entryPath(key), data)
+                self._index[key] = [len(data), time.time()]
+            self._pending.clear()
+            self._indexChanged = True
+            self._evict()
+        if(self._indexChanged):
+            atomicWrite(self.indexPath, json.dumps({"version": SCHEMA_VERSION, "entries": self._index}).encode("utf-8"))
+            self._indexChanged = False
+
+    # Dialog settings
+
+    def lastSettings(self):
+        return dict(self._settings["last"])
+
+    def setLastSettings(self, values):
+        if(values != self._settings["last"]):
+            self._settings["last"] = dict(values)
+            self._saveSettings()
+
+    # Presets
+
+    # Returns the Presets by name, sorted by name, leaving out entries that aren't valid presets
+    def presets(self):
+        presets = {}
+        for name, values in sorted(self._settings["presets"].items()):
+            preset = _preset(values)
+            if(preset is not None):
+                presets[name] = preset
+        return presets
+
+    def savePreset(self, name, preset):
+        self._settings["presets"][name] = {"type": preset.type, "clearance": preset.clearance, "hole": preset.hole}
+        self._saveSettings()
+
+    # Returns False if there's no preset of that name
+    def deletePreset(self, name):
+        if(self._settings["presets"].pop(name, None) is None):
+            return False
+        self._saveSettings()
+        return True
+
+    # Cache
+
+    def _entryPath(self, key):
+        return os.path.join(self.cacheDirectory, key + ".bin")
+
+    # Returns the cached bytes, None if there are none
+    def get(self, key):
+        data = self._pending.get(key)
+        if(data is not None):
+            return data
+        if(key not in self._index):
+            return None
+        try:
+            with open(self._entryPath(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            self._index.pop(key)
+            self._indexChanged = True
+            return None
+        self._index[key][1] = time.time()
+        self._indexChanged = True
+        return data
+
+    # Keeps the data until flush() writes it, so putting costs no disk access
+    def put(self, key, data):
+        self._pending.pop(key, None)
+        self._pending[key] = data
+        size = sum(len(pending) for pending in self._pending.values())
+        while(size > PENDING_BYTES and len(self._pending) > 1):
+            size -= len(self._pending.pop(next(iter(self._pending))))
+
+    # Deletes least recently used entries until the cache fits into maxCacheBytes
+    def _evict(self):
+        size = sum(entry[0] for entry in self._index.values())
+        for key in sorted(self._index, key=lambda key: self._index[key][1]):
+            if(size <= self.maxCacheBytes):
+                break
+            size -= self._index.pop(key)[0]
+            try:
+                os.unlink(self._entryPath(key))
+            except OSError:
+                pass
+
+    def getMeshes(self, key):
+        data = self.get(key)
+        return None if data is None else unpackMeshes(data)
+
+    def putMeshes(self, key, meshes):
+        self.put(key, packMeshes(meshes))
+
+    def clearCache(self):
+        self._pending.clear()
+        for key in list(self._index):
+            try:
+                os.unlink(self._entryPath(key))
+            except OSError:
+                pass
+        self._index.clear()
+        self._indexChanged = True
+        self.flush()
+
+    # Returns entries and bytes of the cache
+    def cacheStats(self):
+        return {"entries": len(self._index), "bytes": sum(entry[0] for entry in self._index.values()), "maxBytes": self.maxCacheBytes}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m luer.store", description="Manages the presets and cache of the luer fitting add-in")
+    parser.add_argument("--directory", help="store directory, defaults to ${} or {}".format(DIRECTORY_ENV, DEFAULT_DIRECTORY))
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="lists the presets and the cache size")
+    save = commands.add_parser("save", help="saves a preset")
+    save.add_argument("name")
+    save.add_argument("type", choices=spec.FITTING_TYPES)
+    save.add_argument("--clearance", type=float, default=0, help="diametral clearance in mm")
+    save.add_argument("--hole", type=float, default=2.25, help="hole diameter in mm")
+    delete = commands.add_parser("delete", help="deletes a preset")
+    delete.add_argument("name")
+    commands.add_parser("clear-cache", help="deletes all cached data")
+    args = parser.parse_args(argv)
+
+    store = Store(args.directory)
+    if(args.command == "save"):
+        store.savePreset(args.name, Preset(args.type, args.clearance / 10, args.hole / 10))
+    elif(args.command == "delete"):
+        if(not store.deletePreset(args.name)):
+            parser.error("no preset named {!r}".format(args.name))
+    elif(args.command == "clear-cache"):
+        store.clearCache()
+    else:
+        for name, preset in store.presets().items():
+            print("{:<24}{:<24}clearance {:.3f} mm, hole {:.3f} mm".format(name, preset.type, preset.clearance * 10, preset.hole * 10))
+        print("cache: {entries} entries, {bytes} of {maxBytes} bytes".format(**store.cacheStats()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+# Writes meshes given as a stream of chunks, e.g. one fitting per chunk of a whole manifold.
+#
+# Only one chunk is held at a time, so peak memory doesn't grow with the number of fittings:
+#     STL      triangles are packed into a preallocated file through a memory map of just the chunk's
+#              range, which gets flushed and unmapped before the next chunk
+#     3MF/PLY  vertices get welded by a hash index and written as they come, the triangles
+#              are spooled to a temporary file and appended once all vertices are known
+#
+# The weld index is cleared after every chunk unless it's shared, separate fittings never share vertices.
+# Meshes are in cm like everything else in luer, files are written in mm.
+
+import mmap
+import shutil
+import struct
+import tempfile
+import zipfile
+
+from . import mesh
+from .export import CONTENT_TYPES_3MF, MM_PER_CM, RELS_3MF, fileExtension
+
+
+STL_HEADER_SIZE = 84
+STL_TRIANGLE_SIZE = 50
+
+# Coordinates closer than this (in cm) become the same vertex
+WELD_TOLERANCE = 1e-6
+
+# Triangles an STL file grows by when more arrive than were preallocated
+STL_GROWTH = 65536
+
+
+# Yields a copy of the mesh translated by every (x, y, z) offset
+def placedMeshes(fittingMesh, offsets):
+    for dx, dy, dz in offsets:
+        placed = mesh.Mesh()
+        c = fittingMesh.coords
+        placed.coords = [v + d for v, d in zip(c, (dx, dy, dz) * (len(c) // 3))]
+        placed.indices = fittingMesh.indices
+        yield placed
+
+
+# Offsets of a grid of columns times rows fittings, pitch apart (in cm) on the XY plane
+def gridOffsets(columns, rows, pitch):
+    return [(pitch * i, pitch * j, 0.0) for j in range(rows) for i in range(columns)]
+
+
+# Merges coincident vertices of a stream of meshes into one global numbering
+class Welder:
+    def __init__(self, tolerance=WELD_TOLERANCE, shared=False):
+        self.scale = 1 / tolerance
+        self.shared = shared
+        self.vertexCount = 0
+        self._index = {}
+
+    # Returns (x, y, z list of the chunk's new vertices, chunk indices mapped to global vertex indices)
+    def weld(self, chunk):
+        if(not self.shared):
+            self._index.clear()
+        index = self._index
+        scale = self.scale
+        c = chunk.coords
+
+        coords = []
+        remap = []
+        for i in range(0, len(c), 3):
+            key = (round(c[i] * scale), round(c[i+1] * scale), round(c[i+2] * scale))
+            vertex = index.get(key)
+            if(vertex is None):
+                vertex = index[key] = self.vertexCount
+                self.vertexCount += 1
+                coords.extend(c[i:i+3])
+            remap.append(vertex)
+
+        # Drops triangles that collapsed to an edge or a point
+        indices = []
+        for a, b, d in zip(chunk.indices[0::3], chunk.indices[1::3], chunk.indices[2::3]):
+            a, b, d = remap[a], remap[b], remap[d]
+            if(a != b and b != d and d != a):
+                indices.extend((a, b, d))
+        return coords, indices
+
+
+# Packs the triangles of the chunk into the file at the triangle index, through a map of only that range
+def _packStl(f, chunk, index, scale):
+    n = chunk.triangleCount
+    if(not n):
+        return
+    c = [v * scale for v in chunk.coords]
+    normals = chunk.faceNormals()
+    indices = chunk.indices
+    values = []
+    for t in range(n):
+        a, b, d = 3 * indices[3*t], 3 * indices[3*t+1], 3 * indices[3*t+2]
+        values.extend(normals[3*t:3*t+3])
+        values.extend(c[a:a+3])
+        values.extend(c[b:b+3])
+        values.extend(c[d:d+3])
+        values.append(0)
+
+    # Maps have to start at a multiple of the allocation granularity
+    start = STL_HEADER_SIZE + STL_TRIANGLE_SIZE * index
+    offset = start - start % mmap.ALLOCATIONGRANULARITY
+    mm = mmap.mmap(f.fileno(), start - offset + STL_TRIANGLE_SIZE * n, offset=offset)
+    try:
+        struct.pack_into("<" + "12fH" * n, mm, start - offset, *values)
+        mm.flush()
+    finally:
+        mm.close()
+
+
+# Writes the chunks as binary STL into a preallocated file, returns the number of triangles.
+# With triangleCount the file is preallocated to its final size, otherwise it grows by STL_GROWTH triangles.
+# Only the range of the current chunk is mapped, so memory stays flat however many chunks there are.
+def writeStl(path, chunks, triangleCount=None, scale=MM_PER_CM):
+    capacity = triangleCount if triangleCount is not None else STL_GROWTH
+    count = 0
+
+    with open(path, "w+b") as f:
+        f.truncate(STL_HEADER_SIZE + STL_TRIANGLE_SIZE * max(capacity, 1))
+        for chunk in chunks:
+            n = chunk.triangleCount
+            if(count + n > capacity):
+                capacity = max(count + n, capacity + STL_GROWTH)
+                f.truncate(STL_HEADER_SIZE + STL_TRIANGLE_SIZE * capacity)
+            _packStl(f, chunk, count, scale)
+            count += n
+
+        f.truncate(STL_HEADER_SIZE + STL_TRIANGLE_SIZE * count)
+        f.seek(0)
+        f.write(b"Luer Fitting".ljust(80, b"\0"))
+        f.write(struct.pack("<I", count))
+    return count
+
+
+# Welds the chunks, passing the new vertices of each to writeVertices and spooling the triangles.
+# Returns (vertex count, triangle count, spool file with three little endian uint32 per triangle).
+def _spool(chunks, writeVertices, welder):
+    spool = tempfile.TemporaryFile()
+    triangles = 0
+    for chunk in chunks:
+        coords, indices = welder.weld(chunk)
+        writeVertices(coords)
+        spool.write(struct.pack("<{}I".format(len(indices)), *indices))
+        triangles += len(indices) // 3
+    spool.seek(0)
+    return welder.vertexCount, triangles, spool
+
+
+# Yields the triangles of a spool file in blocks
+def _readSpool(spool, blockTriangles=16384):
+    while True:
+        data = spool.read(12 * blockTriangles)
+        if(not data):
+            return
+        yield struct.unpack("<{}I".format(len(data) // 4), data)
+
+
+# Writes the chunks as 3MF with welded vertices, returns (vertex count, triangle count)
+def write3mf(path, chunks, scale=MM_PER_CM, welder=None):
+    welder = welder or Welder()
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml", CONTENT_TYPES_3MF)
+        z.writestr("_rels/.rels", RELS_3MF)
+        with z.open("3D/3dmodel.model", "w", force_zip64=True) as model:
+            def write(text):
+                model.write(text.encode("utf-8"))
+
+            def writeVertices(coords):
+                write("".join(
+                    '<vertex x="{:.5f}" y="{:.5f}" z="{:.5f}"/>'.format(coords[i] * scale, coords[i+1] * scale, coords[i+2] * scale)
+                    for i in range(0, len(coords), 3)
+                ))
+
+            write(
+                '<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<model unit="millimeter" xml:lang="en-US" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">'
+                '<resources><object id="1" type="model"><mesh><vertices>'
+            )
+            vertices, triangles, spool = _spool(chunks, writeVertices, welder)
+            with spool:
+                write('</vertices><triangles>')
+                for indices in _readSpool(spool):
+                    write("".join(
+                        '<triangle v1="{}" v2="{}" v3="{}"/>'.format(indices[i], indices[i+1], indices[i+2])
+                        for i in range(0, len(indices), 3)
+                    ))
+            write('</triangles></mesh></object></resources><build><item objectid="1"/></build></model>')
+    return vertices, triangles
+
+
+# Writes the chunks as binary PLY with welded vertices, returns (vertex count, triangle count)
+# The header needs both counts, so the vertices get spooled as well.
+def writePly(path, chunks, scale=MM_PER_CM, welder=None):
+    welder = welder or Welder()
+    with tempfile.TemporaryFile() as vertexSpool:
+        def writeVertices(coords):
+            vertexSpool.write(struct.pack("<{}f".format(len(coords)), *(v * scale for v in coords)))
+
+        vertices, triangles, spool = _spool(chunks, writeVertices, welder)
+        with spool, open(path, "wb") as f:
+            f.write((
+                "ply\nformat binary_little_endian 1.0\ncomment Luer Fitting\n"
+                "element vertex {}\nproperty float x\nproperty float y\nproperty float z\n"
+                "element face {}\nproperty list uchar uint vertex_indices\nend_header\n"
+            ).format(vertices, triangles).encode("ascii"))
+            vertexSpool.seek(0)
+            shutil.copyfileobj(vertexSpool, f)
+            for indices in _readSpool(spool):
+                f.write(b"".join(struct.pack("<B3I", 3, *indices[i:i+3]) for i in range(0, len(indices), 3)))
+    return vertices, triangles
+
+
+# Writes the chunks in the format given by the file extension, returns the number of triangles
+# Raises ValueError for extensions other than luer.export.EXTENSIONS.
+def writeChunks(path, chunks, triangleCount=None, scale=MM_PER_CM):
+    extension = fileExtension(path)
+    if(extension == ".3mf"):
+        return write3mf(path, chunks, scale)[1]
+    if(extension == ".ply"):
+        return writePly(path, chunks, scale)[1]
+    return writeStl(path, chunks, triangleCount, scale)
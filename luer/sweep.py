@@ -0,0 +1,111 @@
+# Exports a whole grid of fittings in parallel, e.g. clearance variants for printer calibration.
+#
+# Usage: python -m luer.sweep OUTPUT_DIR [--types TYPE ...] [--clearance MM ...] [--hole MM ...]
+#                             [--format stl|3mf] [--segments N] [--workers N]
+#
+# Clearances and holes are lists of values in mm or START:STOP:STEP ranges (STOP included).
+# Every combination is written to OUTPUT_DIR, together with a manifest.csv listing them.
+# The hole diameter only affects male fittings, female fittings get exported once per clearance.
+
+import argparse
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from . import export, spec
+
+
+# Parses "0.1" or "0:0.3:0.05" into a list of floats
+def parseValues(text):
+    if(":" not in text):
+        return [float(text)]
+    start, stop, step = (float(v) for v in text.split(":"))
+    count = int(round((stop - start) / step)) + 1
+    return [round(start + i * step, 6) for i in range(count)]
+
+
+# Returns all (type, clearance, hole) jobs of the grid, values in mm
+def sweepJobs(fittingTypes, clearances, holes):
+    jobs = []
+    for fittingType in fittingTypes:
+        usesHole = spec.SPECS[fittingType].kind in ["male", "maleInternal"]
+        for clearance, hole in itertools.product(clearances, holes if usesHole else holes[:1]):
+            jobs.append((fittingType, clearance, hole if usesHole else None))
+    return jobs
+
+
+def fileName(fittingType, clearance, hole, fileFormat):
+    name = fittingType.lower().replace(" (internal)", "_internal").replace(" ", "_")
+    name += "_c{:.3f}".format(clearance)
+    if(hole is not None):
+        name += "_h{:.3f}".format(hole)
+    return name + "." + fileFormat
+
+
+# Exports a single job, runs in the worker processes
+def exportJob(job):
+    fittingType, clearance, hole, directory, fileFormat, segments = job
+    path = os.path.join(directory, fileName(fittingType, clearance, hole, fileFormat))
+    fittingMesh = export.exportMesh(
+        fittingType,
+        clearance / export.MM_PER_CM,
+        (hole or 0) / export.MM_PER_CM,
+        segments
+    )
+    export.writeMesh(path, fittingMesh)
+    return {
+        "file": os.path.basename(path),
+        "type": fittingType,
+        "clearance_mm": clearance,
+        "hole_mm": "" if hole is None else hole,
+        "triangles": fittingMesh.triangleCount,
+        "bytes": os.path.getsize(path),
+    }
+
+
+# Exports every job with a pool of worker processes and streams the manifest while results come in.
+# Returns the number of exported files.
+def runSweep(directory, jobs, fileFormat="stl", segments=96, workers=None):
+    os.makedirs(directory, exist_ok=True)
+    tasks = [job + (directory, fileFormat, segments) for job in jobs]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (workers * 4))
+
+    count = 0
+    with open(os.path.join(directory, "manifest.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, ["file", "type", "clearance_mm", "hole_mm", "triangles", "bytes"])
+        writer.writeheader()
+        if(workers == 1):
+            for row in map(exportJob, tasks):
+                writer.writerow(row)
+                count += 1
+        else:
+            with ProcessPoolExecutor(workers) as executor:
+                for row in executor.map(exportJob, tasks, chunksize=chunksize):
+                    writer.writerow(row)
+                    count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m luer.sweep", description="Exports a grid of luer fittings")
+    parser.add_argument("output", help="output directory")
+    parser.add_argument("--types", nargs="+", choices=spec.FITTING_TYPES, default=list(spec.FITTING_TYPES))
+    parser.add_argument("--clearance", nargs="+", default=["0"], help="diametral clearances in mm, values or START:STOP:STEP")
+    parser.add_argument("--hole", nargs="+", default=["2.25"], help="hole diameters in mm, values or START:STOP:STEP")
+    parser.add_argument("--format", choices=["stl", "3mf"], default="stl")
+    parser.add_argument("--segments", type=int, default=96, help="segments per full turn")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, defaults to the number of cores")
+    args = parser.parse_args(argv)
+
+    clearances = [v for text in args.clearance for v in parseValues(text)]
+    holes = [v for text in args.hole for v in parseValues(text)]
+    jobs = sweepJobs(args.types, clearances, holes)
+
+    count = runSweep(args.output, jobs, args.format, args.segments, args.workers)
+    print("{} files written to {}".format(count, args.output))
+
+
+if __name__ == "__main__":
+    main()
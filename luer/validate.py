@@ -0,0 +1,75 @@
+# Rejects parameter sets no fitting can be built from, before any geometry is made.
+#
+# Every constraint is a dimension of the fitting that has to stay above MIN_SIZE, e.g. the wall between
+# hole and taper tip. All FittingDims are linear in clearance and hole, so each constraint is sampled once
+# per fitting type into g0 + gc * clearance + gh * hole, and checking a parameter set is a few multiplications.
+
+import math
+from functools import lru_cache
+
+from . import mesh, spec
+
+
+# Smallest wall or radius (in cm) Fusion is asked to build
+MIN_SIZE = 0.001
+
+
+# Innermost radius of thread wings sitting inside a tube, the taper has to stay below it
+@lru_cache(maxsize=None)
+def threadInnerRadius(thread):
+    return min(math.hypot(x, y) for x, y in mesh.threadSection(thread))
+
+
+# Constraints of every kind as (input blamed for it, description, function of FittingDims that has to be > MIN_SIZE)
+# A function returning None doesn't apply to the fitting type. The first violated constraint is reported,
+# so ones depending on a single input come before those depending on both.
+CONSTRAINTS = {
+    "male": [
+        ("VIHole", "Hole diameter", lambda d: d.holeRadius),
+        ("VIDiametralClearance", "Clearance", lambda d: d.taperEndRadius),
+        ("VIDiametralClearance", "Clearance", lambda d: threadInnerRadius(d.spec.thread) - d.taperStartRadius if d.spec.thread else None),
+        ("VIHole", "Hole diameter", lambda d: d.taperEndRadius - d.holeRadius),
+    ],
+    "female": [
+        ("VIDiametralClearance", "Clearance", lambda d: d.taperStartRadius),
+        ("VIDiametralClearance", "Clearance", lambda d: d.outerRadius - d.taperEndRadius),
+    ],
+    "femaleInternal": [
+        ("VIDiametralClearance", "Clearance", lambda d: d.taperEndRadius),
+    ],
+}
+CONSTRAINTS["maleInternal"] = CONSTRAINTS["male"]
+
+
+# Returns the constraints of the fitting type as (inputId, name, g0, gc, gh) with g0 + gc * c + gh * h > MIN_SIZE
+@lru_cache(maxsize=None)
+def linearConstraints(fittingType):
+    kind = spec.SPECS[fittingType].kind
+    result = []
+    for inputId, name, function in CONSTRAINTS[kind]:
+        g0 = function(spec.fittingDims(fittingType, 0, 0))
+        if(g0 is None):
+            continue
+        gc = function(spec.fittingDims(fittingType, 1, 0)) - g0
+        gh = function(spec.fittingDims(fittingType, 0, 1)) - g0
+        result.append((inputId, name, g0, gc, gh))
+    return tuple(result)
+
+
+# Returns None if the fitting can be built, otherwise the reason
+# clearance and hole are in cm, the reason gives the limit of the blamed input in mm.
+def check(fittingType, clearance, hole):
+    for inputId, name, g0, gc, gh in linearConstraints(fittingType):
+        if(g0 + gc * clearance + gh * hole > MIN_SIZE):
+            continue
+
+        # Solves for the limit of the blamed input, with the other one as given
+        if(inputId == "VIHole"):
+            slope, rest = gh, g0 + gc * clearance
+        else:
+            slope, rest = gc, g0 + gh * hole
+        if(not slope):
+            return "{} can't be built".format(name)
+        limit = (MIN_SIZE - rest) / slope * 10
+        return "{} must be {} {:.3f} mm".format(name, "above" if slope > 0 else "below", limit)
+    return None
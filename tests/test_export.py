@@ -0,0 +1,60 @@
+# Tests of luer.mesh and luer.export, run with: python -m unittest discover tests
+
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from luer import export, mesh, spec
+
+
+# Runs fn once with NumPy and once with the pure Python fallback
+def bothPaths(fn):
+    arrays = fn()
+    with mock.patch.object(export, "numpy", None):
+        loop = fn()
+    return arrays, loop
+
+
+@unittest.skipIf(export.numpy is None, "needs NumPy")
+class LoopMatchesArraysTest(unittest.TestCase):
+    def test_tessellation(self):
+        for fittingType in spec.FITTING_TYPES:
+            arrays = mesh.fittingMesh(fittingType, 0.01, 0.225, segments=24, arrays=True)
+            loop = mesh.fittingMesh(fittingType, 0.01, 0.225, segments=24)
+            for a, b in zip(arrays, loop):
+                self.assertEqual(a.indices, b.indices, fittingType)
+                self.assertEqual(len(a.coords), len(b.coords), fittingType)
+                self.assertLess(max((abs(u - v) for u, v in zip(a.coords, b.coords)), default=0), 1e-12, fittingType)
+
+    def test_faceNormals(self):
+        fittingMesh = export.exportMesh("Male Lock", 0, 0.225, segments=24)
+        arrays, loop = fittingMesh.faceNormals(arrays=True), fittingMesh.faceNormals()
+        self.assertEqual(len(arrays), 3 * fittingMesh.triangleCount)
+        self.assertLess(max(abs(u - v) for u, v in zip(arrays, loop)), 1e-12)
+
+    def test_files(self):
+        fittingMesh = export.exportMesh("Female Lock", 0, 0.225, segments=24)
+        with tempfile.TemporaryDirectory() as folder:
+            def write(extension):
+                path = os.path.join(folder, "fitting" + extension)
+                export.writeMesh(path, fittingMesh)
+                if(extension == ".3mf"):
+                    with zipfile.ZipFile(path) as z:
+                        return z.read("3D/3dmodel.model")
+                with open(path, "rb") as f:
+                    return f.read()
+
+            arrays, loop = bothPaths(lambda: write(".stl"))
+            self.assertEqual(len(arrays), 84 + 50 * fittingMesh.triangleCount)
+            self.assertEqual(arrays, loop)
+            arrays, loop = bothPaths(lambda: write(".3mf"))
+            self.assertEqual(arrays, loop)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+# Tests of luer.fit, run with: python -m unittest discover tests
+
+import os
+import pickle
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from luer import fit, spec
+
+
+class RecordPickleTest(unittest.TestCase):
+    def test_roundTrip(self):
+        dims = spec.fittingDims("Male Lock", 0.01, 0.2)
+        copy = pickle.loads(pickle.dumps(dims))
+        self.assertEqual(repr(copy), repr(dims))
+        with self.assertRaises(AttributeError):
+            copy.hole = 0
+
+
+class SweepFitTest(unittest.TestCase):
+    def test_workersMatchSerial(self):
+        clearances = [0, 0.005, 0.01]
+        serial = fit.sweepFit("Male Lock", "Female Lock", clearances, samples=2000, workers=1, seed=3)
+        parallel = fit.sweepFit("Male Lock", "Female Lock", clearances, samples=2000, workers=2, seed=3)
+        self.assertEqual([repr(r) for r in parallel], [repr(r) for r in serial])
+
+    @unittest.skipIf(fit.numpy is None, "needs NumPy")
+    def test_loopMatchesArrays(self):
+        pair = fit.pairOf("Male Lock", "Female Lock", 0.005, 0.005)
+        arrays = fit._sampleArrays(pair, fit.DEFAULT_TOLERANCES, 20000, 1)
+        loop = fit._sampleLoop(pair, fit.DEFAULT_TOLERANCES, 20000, 1)
+        for a, b in zip(arrays[:3], loop[:3]):
+            a, b = fit.distribution(a), fit.distribution(b)
+            self.assertAlmostEqual(a.p50, b.p50, delta=0.01)
+            self.assertAlmostEqual(a.std, b.std, delta=0.01)
+        self.assertAlmostEqual(arrays[3] / 20000, loop[3] / 20000, delta=0.02)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+# Tests of luer.properties, run with: python -m unittest discover tests
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from luer import properties, spec
+
+
+# Largest relative differences between the closed form and the export mesh, as printed by --check
+VOLUME_ERROR = 0.001
+AREA_ERROR = 0.0035
+
+
+class CheckAgainstMeshTest(unittest.TestCase):
+    def test_everyType(self):
+        for clearance in (0, 0.01):
+            for fittingType in spec.FITTING_TYPES:
+                volumeError, areaError = properties.checkAgainstMesh(fittingType, clearance, 0.225)
+                self.assertLess(abs(volumeError), VOLUME_ERROR, fittingType)
+                self.assertLess(abs(areaError), AREA_ERROR, fittingType)
+
+
+class PropertiesTest(unittest.TestCase):
+    def test_scalars(self):
+        result = properties.properties("Male Lock", 0.0, 0.2)
+        self.assertEqual(len(result), 1)
+        self.assertEqual(repr(result[0]), repr(properties.fittingProperties("Male Lock", 0.0, 0.2)))
+
+    @unittest.skipIf(properties.numpy is None, "needs NumPy")
+    def test_loopMatchesArrays(self):
+        numpy = properties.numpy
+        self.assertEqual(len(properties.properties("Male Lock", numpy.float32(0.01), numpy.array(0.2))), 1)
+
+        fittingTypes = list(spec.FITTING_TYPES) * 3
+        clearances = numpy.linspace(0, 0.02, len(fittingTypes))
+        arrays = properties.properties(fittingTypes, clearances, 0.225, 1.24)
+        with mock.patch.object(properties, "numpy", None):
+            loop = properties.properties(fittingTypes, clearances.tolist(), 0.225, 1.24)
+        self.assertEqual(len(arrays), len(fittingTypes))
+        for a, b in zip(arrays, loop):
+            self.assertAlmostEqual(a.volume, b.volume, places=12)
+            self.assertAlmostEqual(a.area, b.area, places=12)
+            self.assertAlmostEqual(a.mass, b.mass, places=12)
+
+
+if __name__ == "__main__":
+    unittest.main()
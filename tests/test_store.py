@@ -0,0 +1,112 @@
+# Tests of luer.store, run with: python -m unittest discover tests
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from luer import mesh, store
+
+
+class StoreTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.directory = self.folder.name
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def writeSettings(self, settings):
+        with open(os.path.join(self.directory, "settings.json"), "w") as f:
+            json.dump(settings, f)
+
+    def test_atomicWrite(self):
+        path = os.path.join(self.directory, "settings.json")
+        store.atomicWrite(path, b"old")
+        with mock.patch.object(store.os, "replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                store.atomicWrite(path, b"new")
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"old")
+        self.assertEqual(os.listdir(self.directory), ["settings.json"])
+
+    def test_migrations(self):
+        self.writeSettings({"version": 1, "presets": {"old": {"type": "Male Lock", "clearance": 0.01, "hole": 0.2}}})
+        def migrate(settings):
+            settings["presets"]["old"]["hole"] = 0.25
+            return settings
+
+        with mock.patch.object(store, "SCHEMA_VERSION", 2), mock.patch.dict(store.MIGRATIONS, {1: migrate}):
+            presets = store.Store(self.directory).presets()
+        self.assertEqual(presets["old"].hole, 0.25)
+
+        # Settings of a newer version than this one knows are dropped
+        self.writeSettings({"version": store.SCHEMA_VERSION + 1, "last": {"type": "Male Lock"}})
+        self.assertEqual(store.Store(self.directory).lastSettings(), {})
+
+    def test_presetsMissingFields(self):
+        self.writeSettings({"version": store.SCHEMA_VERSION, "presets": {
+            "good": {"type": "Female Lock", "clearance": 0.01, "hole": 0.2},
+            "noHole": {"type": "Female Lock", "clearance": 0.01},
+            "unknownType": {"type": "Bayonet", "clearance": 0.01, "hole": 0.2},
+            "text": {"type": "Male Slip", "clearance": "wide", "hole": 0.2},
+            "notADict": 3,
+        }})
+        self.assertEqual(list(store.Store(self.directory).presets()), ["good"])
+
+    def test_geometryVersionInKey(self):
+        key = store.cacheKey("preview", "Male Lock", 0.0, 0.225)
+        cache = store.Store(self.directory)
+        cache.put(key, b"mesh")
+        cache.flush()
+
+        with mock.patch.object(mesh, "GEOMETRY_VERSION", mesh.GEOMETRY_VERSION + 1):
+            newKey = store.cacheKey("preview", "Male Lock", 0.0, 0.225)
+        self.assertNotEqual(newKey, key)
+        cache = store.Store(self.directory)
+        self.assertIsNone(cache.get(newKey))
+        self.assertEqual(cache.get(key), b"mesh")
+
+    def test_eviction(self):
+        cache = store.Store(self.directory, maxCacheBytes=300)
+        with mock.patch.object(store.time, "time", side_effect=range(100, 200)):
+            for key in "abc":
+                cache.put(key, key.encode() * 100)
+                cache.flush()
+            # Using a makes b the least recently used entry
+            cache.get("a")
+            cache.put("d", b"d" * 100)
+            cache.flush()
+
+        self.assertEqual(sorted(cache._index), ["a", "c", "d"])
+        self.assertEqual(cache.cacheStats()["bytes"], 300)
+        self.assertFalse(os.path.exists(cache._entryPath("b")))
+
+        # The index survives and only lists entries still on disk
+        reopened = store.Store(self.directory, maxCacheBytes=300)
+        self.assertEqual(reopened.get("a"), b"a" * 100)
+        self.assertIsNone(reopened.get("b"))
+
+    def test_pendingBounded(self):
+        cache = store.Store(self.directory)
+        with mock.patch.object(store, "PENDING_BYTES", 250):
+            for key in "abc":
+                cache.put(key, key.encode() * 100)
+        self.assertEqual(list(cache._pending), ["b", "c"])
+        self.assertFalse(os.path.exists(cache.cacheDirectory))
+
+    def test_meshesRoundTrip(self):
+        body, cut = mesh.fittingMesh("Male Lock (internal)", 0.01, 0.225, segments=12)
+        cache = store.Store(self.directory)
+        cache.putMeshes("key", [body, cut])
+        cache.flush()
+        meshes = store.Store(self.directory).getMeshes("key")
+        self.assertEqual([(m.coords, m.indices) for m in meshes], [(body.coords, body.indices), (cut.coords, cut.indices)])
+
+
+if __name__ == "__main__":
+    unittest.main()
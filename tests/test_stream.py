@@ -0,0 +1,130 @@
+# Tests of luer.stream, run with: python -m unittest discover tests
+
+import mmap
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from luer import export, mesh, stream
+
+
+# Returns a single mesh holding all chunks, the way export.writeMesh would get them
+def joined(chunks):
+    result = mesh.Mesh()
+    for chunk in chunks:
+        result.extend(chunk)
+    return result
+
+
+class StreamTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.fitting = export.exportMesh("Male Lock", 0, 0.225, segments=24)
+        self.offsets = stream.gridOffsets(3, 2, 1.0)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.folder.name, name)
+
+    def read(self, name):
+        with open(self.path(name), "rb") as f:
+            return f.read()
+
+    def test_stlMatchesExport(self):
+        export.writeStl(self.path("joined.stl"), joined(stream.placedMeshes(self.fitting, self.offsets)))
+        total = self.fitting.triangleCount * len(self.offsets)
+        count = stream.writeStl(self.path("chunks.stl"), stream.placedMeshes(self.fitting, self.offsets), total)
+        self.assertEqual(count, total)
+        self.assertEqual(self.read("chunks.stl"), self.read("joined.stl"))
+
+    def test_stlGrows(self):
+        # Without a count the file grows, here by fewer triangles than a chunk has, crossing many map offsets
+        with mock.patch.object(stream, "STL_GROWTH", 100):
+            stream.writeStl(self.path("chunks.stl"), stream.placedMeshes(self.fitting, self.offsets))
+        stream.writeStl(self.path("preallocated.stl"), stream.placedMeshes(self.fitting, self.offsets), self.fitting.triangleCount * len(self.offsets))
+        self.assertEqual(self.read("chunks.stl"), self.read("preallocated.stl"))
+
+    def test_stlMapsWindows(self):
+        lengths = []
+        realMmap = mmap.mmap
+
+        def recordingMmap(fileno, length, **kwargs):
+            lengths.append(length)
+            return realMmap(fileno, length, **kwargs)
+
+        offsets = stream.gridOffsets(10, 10, 1.0)
+        total = self.fitting.triangleCount * len(offsets)
+        with mock.patch.object(stream.mmap, "mmap", recordingMmap):
+            stream.writeStl(self.path("chunks.stl"), stream.placedMeshes(self.fitting, offsets), total)
+        window = stream.STL_TRIANGLE_SIZE * self.fitting.triangleCount + mmap.ALLOCATIONGRANULARITY
+        self.assertEqual(len(lengths), len(offsets))
+        self.assertLessEqual(max(lengths), window)
+        self.assertLess(max(lengths), os.path.getsize(self.path("chunks.stl")))
+
+    def test_weld(self):
+        chunk = mesh.Mesh()
+        chunk.coords = [0, 0, 0, 1, 0, 0, 0, 1, 0, 1e-8, 0, 0, 1, 1, 0]
+        chunk.indices = [0, 1, 2, 3, 1, 4, 0, 3, 1]
+        coords, indices = stream.Welder().weld(chunk)
+        # The fourth vertex is the first one, so the last triangle collapsed
+        self.assertEqual(coords, [0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 1, 0])
+        self.assertEqual(indices, [0, 1, 2, 0, 1, 3])
+
+    def test_weldShared(self):
+        separate = stream.Welder()
+        shared = stream.Welder(shared=True)
+        for welder in (separate, shared):
+            for chunk in stream.placedMeshes(self.fitting, [(0, 0, 0), (0, 0, 0)]):
+                welder.weld(chunk)
+        self.assertEqual(shared.vertexCount * 2, separate.vertexCount)
+        self.assertLessEqual(shared.vertexCount, self.fitting.vertexCount)
+
+    def test_spool(self):
+        chunks = list(stream.placedMeshes(self.fitting, self.offsets))
+        welder = stream.Welder()
+        vertices = []
+        count, triangles, spool = stream._spool(chunks, vertices.extend, welder)
+        with spool:
+            spooled = [i for block in stream._readSpool(spool, blockTriangles=7) for i in block]
+        self.assertEqual(count * 3, len(vertices))
+        self.assertEqual(triangles * 3, len(spooled))
+        self.assertEqual(triangles, self.fitting.triangleCount * len(self.offsets))
+        self.assertLess(max(spooled), count)
+
+    def test_plyAnd3mf(self):
+        vertices, triangles = stream.writePly(self.path("chunks.ply"), stream.placedMeshes(self.fitting, self.offsets))
+        data = self.read("chunks.ply")
+        header, body = data.split(b"end_header\n", 1)
+        self.assertIn("element vertex {}\n".format(vertices).encode(), header)
+        self.assertIn("element face {}\n".format(triangles).encode(), header)
+        self.assertEqual(len(body), 12 * vertices + 13 * triangles)
+
+        counts = stream.write3mf(self.path("chunks.3mf"), stream.placedMeshes(self.fitting, self.offsets))
+        self.assertEqual(counts, (vertices, triangles))
+        with zipfile.ZipFile(self.path("chunks.3mf")) as z:
+            model = z.read("3D/3dmodel.model").decode()
+        self.assertEqual(model.count("<vertex "), vertices)
+        self.assertEqual(model.count("<triangle "), triangles)
+
+    def test_extensions(self):
+        with mock.patch.object(stream, "writeStl", side_effect=AssertionError("STL writer used")):
+            stream.writeChunks(self.path("chunks.ply"), stream.placedMeshes(self.fitting, self.offsets))
+            stream.writeChunks(self.path("chunks.3mf"), stream.placedMeshes(self.fitting, self.offsets))
+            for name in ("chunks.obj", "chunks", "chunks.stl.bak"):
+                with self.assertRaises(ValueError):
+                    stream.writeChunks(self.path(name), stream.placedMeshes(self.fitting, self.offsets))
+                with self.assertRaises(ValueError):
+                    export.writeMesh(self.path(name), self.fitting)
+                self.assertFalse(os.path.exists(self.path(name)))
+        self.assertEqual(stream.writeChunks(self.path("chunks.STL"), [self.fitting]), self.fitting.triangleCount)
+
+
+if __name__ == "__main__":
+    unittest.main()
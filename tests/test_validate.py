@@ -0,0 +1,56 @@
+# Tests of luer.validate, run with: python -m unittest discover tests
+
+import os
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from luer import spec, validate
+
+
+class LinearConstraintsTest(unittest.TestCase):
+    def test_matchConstraints(self):
+        for fittingType in spec.FITTING_TYPES:
+            constraints = [c for c in validate.CONSTRAINTS[spec.SPECS[fittingType].kind] if c[2](spec.fittingDims(fittingType, 0, 0)) is not None]
+            linear = validate.linearConstraints(fittingType)
+            self.assertEqual(len(linear), len(constraints), fittingType)
+            for (inputId, name, function), (linearId, linearName, g0, gc, gh) in zip(constraints, linear):
+                self.assertEqual((linearId, linearName), (inputId, name))
+                for clearance, hole in [(0, 0.225), (0.02, 0.1), (-0.01, 0.3)]:
+                    exact = function(spec.fittingDims(fittingType, clearance, hole))
+                    self.assertAlmostEqual(g0 + gc * clearance + gh * hole, exact, places=9, msg=fittingType)
+
+
+class CheckTest(unittest.TestCase):
+    def test_buildable(self):
+        for fittingType in spec.FITTING_TYPES:
+            self.assertIsNone(validate.check(fittingType, 0, 0.225), fittingType)
+
+    # Returns the limit in cm given by the reason, which is a plain string
+    def limit(self, reason):
+        self.assertIsInstance(reason, str)
+        return float(re.search(r"(above|below) (-?[\d.]+) mm$", reason).group(2)) / 10
+
+    def test_holeLimit(self):
+        reason = validate.check("Male Lock", 0, 1.0)
+        self.assertTrue(reason.startswith("Hole diameter must be below"), reason)
+        limit = self.limit(reason)
+        self.assertIsNone(validate.check("Male Lock", 0, limit - 1e-4))
+        self.assertIsNotNone(validate.check("Male Lock", 0, limit + 1e-4))
+
+    def test_clearanceLimit(self):
+        for fittingType in spec.FITTING_TYPES:
+            reasons = [reason for reason in (validate.check(fittingType, c, 0.225) for c in (-1.0, 1.0)) if reason is not None]
+            self.assertTrue(reasons, fittingType)
+            for reason in reasons:
+                self.assertTrue(reason.startswith("Clearance must be"), reason)
+                limit = self.limit(reason)
+                step = 1e-4 if "above" in reason else -1e-4
+                # Within the limit another constraint may still fail, but not this one
+                self.assertNotEqual(validate.check(fittingType, limit + step, 0.225), reason, fittingType)
+                self.assertEqual(validate.check(fittingType, limit - step, 0.225), reason, fittingType)
+
+if __name__ == "__main__":
+    unittest.main()